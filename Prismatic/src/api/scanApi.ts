@@ -0,0 +1,44 @@
+const BASE = import.meta.env.VITE_API_URL ?? ''
+
+export type ScanSource = 'mongo' | 'gmail'
+
+export interface ScanEvent {
+  event: 'findings' | 'error' | 'done'
+  source: ScanSource
+  findings?: Record<string, unknown>[]
+  message?: string
+  total?: number
+}
+
+// Reads the NDJSON stream and hands each event to onEvent as it arrives
+export async function streamScan(
+  source: ScanSource,
+  onEvent: (event: ScanEvent) => void,
+  sessionId?: string,
+  signal?: AbortSignal,
+): Promise<void> {
+  const query = sessionId ? `?session_id=${encodeURIComponent(sessionId)}` : ''
+  const res = await fetch(`${BASE}/scan/${source}/stream${query}`, {
+    credentials: 'include',
+    signal,
+  })
+  if (!res.ok || !res.body) {
+    const err = await res.json().catch(() => ({}))
+    throw new Error(err?.detail ?? err?.message ?? 'Failed to start scan')
+  }
+
+  const reader = res.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    const lines = buffer.split('\n')
+    buffer = lines.pop() ?? ''
+    for (const line of lines) {
+      if (line.trim()) onEvent(JSON.parse(line) as ScanEvent)
+    }
+  }
+  if (buffer.trim()) onEvent(JSON.parse(buffer) as ScanEvent)
+}
@@ -2,12 +2,34 @@ import { jsx as _jsx, jsxs as _jsxs } from "react/jsx-runtime";
 import { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { fetchFindings } from '../api/findingsApi';
+import { streamScan } from '../api/scanApi';
 import '../styles/findings.css';
 /* ── Palette for charts ─────────────────────────── */
 const PALETTE = ['#b0e4cc', '#408a71', '#285a48', '#7ecfb0', '#5ab090', '#a0d4bc', '#2a7060', '#c8eedd'];
 /* ── Label helpers ──────────────────────────────── */
 const fmt = (s) => s.replace(/_/g, ' ').replace(/\b\w/g, c => c.toUpperCase());
 const topKey = (dist) => Object.entries(dist).sort((a, b) => b[1] - a[1])[0]?.[0] ?? '—';
+const EMPTY_TOTALS = { count: 0, confidence: 0, pii: {}, field: {}, law: {} };
+const bump = (dist, key) => { dist[key] = (dist[key] ?? 0) + 1; };
+function addFindings(prev, findings) {
+    const next = { ...prev, pii: { ...prev.pii }, field: { ...prev.field }, law: { ...prev.law } };
+    for (const f of findings) {
+        next.count += 1;
+        next.confidence += f.confidence ?? 0;
+        bump(next.pii, f.type ?? 'unknown');
+        bump(next.field, f.field_path ?? 'unknown');
+        for (const law of f.mapped_laws ?? [])
+            bump(next.law, law);
+    }
+    return next;
+}
+const toFindingsData = (t) => ({
+    total_findings: t.count,
+    avg_confidence: t.count ? Math.round((t.confidence / t.count) * 100) : 0,
+    pii_distribution: t.pii,
+    field_distribution: t.field,
+    law_distribution: t.law,
+});
 /* ── Icons ──────────────────────────────────────── */
 const FindingsIcon = () => (_jsxs("svg", { width: "28", height: "28", viewBox: "0 0 24 24", fill: "none", stroke: "currentColor", strokeWidth: "1.6", strokeLinecap: "round", strokeLinejoin: "round", children: [_jsx("circle", { cx: "11", cy: "11", r: "8" }), _jsx("line", { x1: "21", y1: "21", x2: "16.65", y2: "16.65" }), _jsx("line", { x1: "11", y1: "8", x2: "11", y2: "14" }), _jsx("line", { x1: "8", y1: "11", x2: "14", y2: "11" })] }));
 const ArrowRightIcon = () => (_jsxs("svg", { width: "14", height: "14", viewBox: "0 0 24 24", fill: "none", stroke: "currentColor", strokeWidth: "2.5", strokeLinecap: "round", strokeLinejoin: "round", children: [_jsx("line", { x1: "5", y1: "12", x2: "19", y2: "12" }), _jsx("polyline", { points: "12 5 19 12 12 19" })] }));
@@ -60,6 +82,9 @@ export default function FindingsPage() {
     const [isEmpty, setIsEmpty] = useState(false);
     const [pageStatus, setPageStatus] = useState('loading');
     const [errorMsg, setErrorMsg] = useState('');
+    const [live, setLive] = useState(null);
+    const [scanning, setScanning] = useState(null);
+    const [scanNote, setScanNote] = useState('');
     async function loadFindings() {
         if (!sessionId) {
             setIsEmpty(true);
@@ -85,6 +110,33 @@ export default function FindingsPage() {
         }
     }
     useEffect(() => { loadFindings(); }, []);
+    // Streams a scan, updating the page as each collection / email batch arrives
+    async function runScan(source) {
+        setScanning(source);
+        setScanNote('');
+        setLive(EMPTY_TOTALS);
+        try {
+            await streamScan(source, event => {
+                if (event.event === 'findings')
+                    setLive(prev => addFindings(prev ?? EMPTY_TOTALS, event.findings ?? []));
+                else if (event.event === 'error')
+                    setScanNote(event.message ?? 'Scan failed.');
+            }, sessionId || undefined);
+        }
+        catch (err) {
+            setScanNote(err?.message ?? 'Scan failed.');
+        }
+        setScanning(null);
+        // Findings were stored in the session: show the session-wide analytics
+        if (sessionId) {
+            await loadFindings();
+            setLive(null);
+        }
+    }
+    const subtitle = scanning
+        ? `Scanning ${scanning === 'mongo' ? 'MongoDB' : 'Gmail'}\u2026 ${live?.count ?? 0} findings so far`
+        : scanNote || 'Insights from your latest scan session';
+    const scanControls = (_jsx("div", { className: "findings-scan-controls", children: ['mongo', 'gmail'].map(source => (_jsx("button", { className: "findings-retry-btn", disabled: scanning !== null, onClick: () => runScan(source), children: scanning === source ? 'Scanning\u2026' : source === 'mongo' ? 'Scan MongoDB' : 'Scan Gmail' }, source))) }));
     /* ── Skeleton ── */
     if (pageStatus === 'loading') {
         return (_jsxs("div", { className: "findings-page", children: [_jsx("div", { className: "findings-header", children: _jsxs("div", { children: [_jsx("h1", { className: "findings-header__title", children: "Findings" }), _jsx("p", { className: "findings-header__sub", children: "Loading scan insights\u2026" })] }) }), _jsx("div", { className: "findings-stats", children: [1, 2, 3, 4].map(i => _jsx("div", { className: "findings-skeleton", style: { height: 100 } }, i)) }), _jsx("div", { className: "findings-charts", children: [1, 2, 3].map(i => _jsx("div", { className: "findings-skeleton", style: { height: 200 } }, i)) }), _jsx("div", { className: "findings-insights", children: [1, 2, 3].map(i => _jsx("div", { className: "findings-skeleton", style: { height: 80 } }, i)) })] }));
@@ -94,14 +146,15 @@ export default function FindingsPage() {
         return (_jsxs("div", { className: "findings-page", children: [_jsx("div", { className: "findings-header", children: _jsx("div", { children: _jsx("h1", { className: "findings-header__title", children: "Findings" }) }) }), _jsx("div", { style: { background: 'var(--c-surface-1, #0f1f1c)', border: '1px solid var(--c-border, #1e3530)', borderRadius: 14 }, children: _jsxs("div", { className: "findings-error", children: [_jsx("p", { className: "findings-error__title", children: "Failed to load findings" }), _jsx("p", { className: "findings-error__sub", children: errorMsg }), _jsx("button", { className: "findings-retry-btn", onClick: loadFindings, children: "Retry" })] }) })] }));
     }
     /* ── Empty State ── */
-    if (isEmpty || !data) {
-        return (_jsxs("div", { className: "findings-page", children: [_jsx("div", { className: "findings-header", children: _jsxs("div", { children: [_jsx("h1", { className: "findings-header__title", children: "Findings" }), _jsx("p", { className: "findings-header__sub", children: "Insights from your latest scan session" })] }) }), _jsxs("div", { className: "findings-empty", children: [_jsx("div", { className: "findings-empty__icon-wrap", children: _jsx(FindingsIcon, {}) }), _jsx("p", { className: "findings-empty__title", children: "No findings yet" }), _jsx("p", { className: "findings-empty__sub", children: "Run a scan using the AI agent to detect PII, map regulations, and view compliance insights here." }), _jsxs("button", { className: "findings-empty__cta", onClick: () => navigate('/dashboard/ai-workspace'), children: ["Go to AI Workspace ", _jsx(ArrowRightIcon, {})] })] })] }));
+    const view = live ? toFindingsData(live) : data;
+    if (!view || (isEmpty && !live)) {
+        return (_jsxs("div", { className: "findings-page", children: [_jsxs("div", { className: "findings-header", children: [_jsxs("div", { children: [_jsx("h1", { className: "findings-header__title", children: "Findings" }), _jsx("p", { className: "findings-header__sub", children: subtitle })] }), scanControls] }), _jsxs("div", { className: "findings-empty", children: [_jsx("div", { className: "findings-empty__icon-wrap", children: _jsx(FindingsIcon, {}) }), _jsx("p", { className: "findings-empty__title", children: "No findings yet" }), _jsx("p", { className: "findings-empty__sub", children: "Run a scan using the AI agent to detect PII, map regulations, and view compliance insights here." }), _jsxs("button", { className: "findings-empty__cta", onClick: () => navigate('/dashboard/ai-workspace'), children: ["Go to AI Workspace ", _jsx(ArrowRightIcon, {})] })] })] }));
     }
     /* ── Derived insights ── */
-    const mostCommonPii = topKey(data.pii_distribution);
-    const topField = topKey(data.field_distribution);
-    const topLaw = topKey(data.law_distribution);
-    const uniquePiiTypes = Object.keys(data.pii_distribution).length;
-    const confidenceLevel = data.avg_confidence >= 80 ? 'High' : data.avg_confidence >= 50 ? 'Moderate' : 'Low';
-    return (_jsxs("div", { className: "findings-page", children: [_jsxs("div", { className: "findings-header", children: [_jsxs("div", { className: "findings-header__left", children: [_jsx("h1", { className: "findings-header__title", children: "Findings" }), _jsx("p", { className: "findings-header__sub", children: "Insights from your latest scan session" })] }), sessionId && (_jsxs("div", { className: "findings-session-badge", children: [_jsx("span", { className: "findings-session-badge__dot" }), sessionId.slice(0, 24), "\u2026"] }))] }), _jsx("p", { className: "findings-section-label", children: "Overview" }), _jsxs("div", { className: "findings-stats", children: [_jsxs("div", { className: "findings-stat-card", children: [_jsx("div", { className: "findings-stat-card__icon", children: _jsx(TotalIcon, {}) }), _jsx("div", { className: "findings-stat-card__label", children: "Total Findings" }), _jsx("div", { className: "findings-stat-card__value", children: data.total_findings.toLocaleString() }), _jsx("div", { className: "findings-stat-card__sub", children: "detected across all sources" })] }), _jsxs("div", { className: "findings-stat-card", children: [_jsx("div", { className: "findings-stat-card__icon", children: _jsx(PiiIcon, {}) }), _jsx("div", { className: "findings-stat-card__label", children: "Unique PII Types" }), _jsx("div", { className: "findings-stat-card__value", children: uniquePiiTypes }), _jsx("div", { className: "findings-stat-card__sub", children: "distinct data categories" })] }), _jsxs("div", { className: "findings-stat-card", children: [_jsx("div", { className: "findings-stat-card__icon", children: _jsx(ConfIcon, {}) }), _jsx("div", { className: "findings-stat-card__label", children: "Avg Confidence" }), _jsxs("div", { className: "findings-stat-card__value", children: [data.avg_confidence, "%"] }), _jsxs("div", { className: "findings-stat-card__sub", children: [confidenceLevel.toLowerCase(), " confidence detections"] })] }), _jsxs("div", { className: "findings-stat-card", children: [_jsx("div", { className: "findings-stat-card__icon", children: _jsx(MostCommonIcon, {}) }), _jsx("div", { className: "findings-stat-card__label", children: "Most Common PII" }), _jsx("div", { className: `findings-stat-card__value ${mostCommonPii.length > 10 ? 'findings-stat-card__value--sm' : ''}`, children: fmt(mostCommonPii) }), _jsx("div", { className: "findings-stat-card__sub", children: "highest frequency type" })] })] }), _jsx("p", { className: "findings-section-label", children: "Distributions" }), _jsxs("div", { className: "findings-charts", children: [_jsxs("div", { className: "findings-chart-card", children: [_jsx("p", { className: "findings-chart-card__title", children: "PII Type Breakdown" }), _jsx(BarChart, { dist: data.pii_distribution })] }), _jsxs("div", { className: "findings-chart-card", children: [_jsx("p", { className: "findings-chart-card__title", children: "Regulatory Exposure" }), _jsx(PieChart, { dist: data.law_distribution })] }), _jsxs("div", { className: "findings-chart-card", children: [_jsx("p", { className: "findings-chart-card__title", children: "Top Risk Fields" }), _jsx(BarChart, { dist: data.field_distribution })] })] }), _jsx("p", { className: "findings-section-label", children: "Key Insights" }), _jsxs("div", { className: "findings-insights", children: [_jsxs("div", { className: "findings-insight-card", children: [_jsx("div", { className: "findings-insight-card__icon findings-insight-card__icon--warn", children: _jsx(WarnIcon, {}) }), _jsxs("div", { className: "findings-insight-card__body", children: [_jsx("div", { className: "findings-insight-card__label", children: "Most Sensitive Data" }), _jsxs("div", { className: "findings-insight-card__value", children: [fmt(mostCommonPii), " detected most frequently \u2014 prioritise protection of this type."] })] })] }), _jsxs("div", { className: "findings-insight-card", children: [_jsx("div", { className: "findings-insight-card__icon findings-insight-card__icon--blue", children: _jsx(FieldIcon, {}) }), _jsxs("div", { className: "findings-insight-card__body", children: [_jsx("div", { className: "findings-insight-card__label", children: "Top Risk Field" }), _jsxs("div", { className: "findings-insight-card__value", children: [_jsx("code", { style: { fontSize: '0.82rem', color: '#90caff' }, children: topField }), " has the highest concentration of sensitive data."] })] })] }), _jsxs("div", { className: "findings-insight-card", children: [_jsx("div", { className: "findings-insight-card__icon findings-insight-card__icon--green", children: _jsx(LawIcon, {}) }), _jsxs("div", { className: "findings-insight-card__body", children: [_jsx("div", { className: "findings-insight-card__label", children: "Primary Regulation" }), _jsxs("div", { className: "findings-insight-card__value", children: [topLaw.toUpperCase(), " governs the majority of detected findings \u2014 review obligations immediately."] })] })] })] })] }));
+    const mostCommonPii = topKey(view.pii_distribution);
+    const topField = topKey(view.field_distribution);
+    const topLaw = topKey(view.law_distribution);
+    const uniquePiiTypes = Object.keys(view.pii_distribution).length;
+    const confidenceLevel = view.avg_confidence >= 80 ? 'High' : view.avg_confidence >= 50 ? 'Moderate' : 'Low';
+    return (_jsxs("div", { className: "findings-page", children: [_jsxs("div", { className: "findings-header", children: [_jsxs("div", { className: "findings-header__left", children: [_jsx("h1", { className: "findings-header__title", children: "Findings" }), _jsx("p", { className: "findings-header__sub", children: subtitle })] }), scanControls, sessionId && (_jsxs("div", { className: "findings-session-badge", children: [_jsx("span", { className: "findings-session-badge__dot" }), sessionId.slice(0, 24), "\u2026"] }))] }), _jsx("p", { className: "findings-section-label", children: "Overview" }), _jsxs("div", { className: "findings-stats", children: [_jsxs("div", { className: "findings-stat-card", children: [_jsx("div", { className: "findings-stat-card__icon", children: _jsx(TotalIcon, {}) }), _jsx("div", { className: "findings-stat-card__label", children: "Total Findings" }), _jsx("div", { className: "findings-stat-card__value", children: view.total_findings.toLocaleString() }), _jsx("div", { className: "findings-stat-card__sub", children: "detected across all sources" })] }), _jsxs("div", { className: "findings-stat-card", children: [_jsx("div", { className: "findings-stat-card__icon", children: _jsx(PiiIcon, {}) }), _jsx("div", { className: "findings-stat-card__label", children: "Unique PII Types" }), _jsx("div", { className: "findings-stat-card__value", children: uniquePiiTypes }), _jsx("div", { className: "findings-stat-card__sub", children: "distinct data categories" })] }), _jsxs("div", { className: "findings-stat-card", children: [_jsx("div", { className: "findings-stat-card__icon", children: _jsx(ConfIcon, {}) }), _jsx("div", { className: "findings-stat-card__label", children: "Avg Confidence" }), _jsxs("div", { className: "findings-stat-card__value", children: [view.avg_confidence, "%"] }), _jsxs("div", { className: "findings-stat-card__sub", children: [confidenceLevel.toLowerCase(), " confidence detections"] })] }), _jsxs("div", { className: "findings-stat-card", children: [_jsx("div", { className: "findings-stat-card__icon", children: _jsx(MostCommonIcon, {}) }), _jsx("div", { className: "findings-stat-card__label", children: "Most Common PII" }), _jsx("div", { className: `findings-stat-card__value ${mostCommonPii.length > 10 ? 'findings-stat-card__value--sm' : ''}`, children: fmt(mostCommonPii) }), _jsx("div", { className: "findings-stat-card__sub", children: "highest frequency type" })] })] }), _jsx("p", { className: "findings-section-label", children: "Distributions" }), _jsxs("div", { className: "findings-charts", children: [_jsxs("div", { className: "findings-chart-card", children: [_jsx("p", { className: "findings-chart-card__title", children: "PII Type Breakdown" }), _jsx(BarChart, { dist: view.pii_distribution })] }), _jsxs("div", { className: "findings-chart-card", children: [_jsx("p", { className: "findings-chart-card__title", children: "Regulatory Exposure" }), _jsx(PieChart, { dist: view.law_distribution })] }), _jsxs("div", { className: "findings-chart-card", children: [_jsx("p", { className: "findings-chart-card__title", children: "Top Risk Fields" }), _jsx(BarChart, { dist: view.field_distribution })] })] }), _jsx("p", { className: "findings-section-label", children: "Key Insights" }), _jsxs("div", { className: "findings-insights", children: [_jsxs("div", { className: "findings-insight-card", children: [_jsx("div", { className: "findings-insight-card__icon findings-insight-card__icon--warn", children: _jsx(WarnIcon, {}) }), _jsxs("div", { className: "findings-insight-card__body", children: [_jsx("div", { className: "findings-insight-card__label", children: "Most Sensitive Data" }), _jsxs("div", { className: "findings-insight-card__value", children: [fmt(mostCommonPii), " detected most frequently \u2014 prioritise protection of this type."] })] })] }), _jsxs("div", { className: "findings-insight-card", children: [_jsx("div", { className: "findings-insight-card__icon findings-insight-card__icon--blue", children: _jsx(FieldIcon, {}) }), _jsxs("div", { className: "findings-insight-card__body", children: [_jsx("div", { className: "findings-insight-card__label", children: "Top Risk Field" }), _jsxs("div", { className: "findings-insight-card__value", children: [_jsx("code", { style: { fontSize: '0.82rem', color: '#90caff' }, children: topField }), " has the highest concentration of sensitive view."] })] })] }), _jsxs("div", { className: "findings-insight-card", children: [_jsx("div", { className: "findings-insight-card__icon findings-insight-card__icon--green", children: _jsx(LawIcon, {}) }), _jsxs("div", { className: "findings-insight-card__body", children: [_jsx("div", { className: "findings-insight-card__label", children: "Primary Regulation" }), _jsxs("div", { className: "findings-insight-card__value", children: [topLaw.toUpperCase(), " governs the majority of detected findings \u2014 review obligations immediately."] })] })] })] })] }));
 }
@@ -1,6 +1,7 @@
 import { useEffect, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { fetchFindings, type FindingsData } from '../api/findingsApi'
+import { streamScan, type ScanSource } from '../api/scanApi'
 import '../styles/findings.css'
 
 /* ── Palette for charts ─────────────────────────── */
@@ -13,6 +14,38 @@ const fmt = (s: string) =>
 const topKey = (dist: Record<string, number>) =>
   Object.entries(dist).sort((a, b) => b[1] - a[1])[0]?.[0] ?? '—'
 
+/* ── Live scan totals (same analytics as /findings/latest) ── */
+interface LiveTotals {
+  count: number
+  confidence: number
+  pii: Record<string, number>
+  field: Record<string, number>
+  law: Record<string, number>
+}
+const EMPTY_TOTALS: LiveTotals = { count: 0, confidence: 0, pii: {}, field: {}, law: {} }
+
+const bump = (dist: Record<string, number>, key: string) => { dist[key] = (dist[key] ?? 0) + 1 }
+
+function addFindings(prev: LiveTotals, findings: Record<string, any>[]): LiveTotals {
+  const next = { ...prev, pii: { ...prev.pii }, field: { ...prev.field }, law: { ...prev.law } }
+  for (const f of findings) {
+    next.count += 1
+    next.confidence += f.confidence ?? 0
+    bump(next.pii, f.type ?? 'unknown')
+    bump(next.field, f.field_path ?? 'unknown')
+    for (const law of f.mapped_laws ?? []) bump(next.law, law)
+  }
+  return next
+}
+
+const toFindingsData = (t: LiveTotals): FindingsData => ({
+  total_findings: t.count,
+  avg_confidence: t.count ? Math.round((t.confidence / t.count) * 100) : 0,
+  pii_distribution: t.pii,
+  field_distribution: t.field,
+  law_distribution: t.law,
+})
+
 /* ── Icons ──────────────────────────────────────── */
 const FindingsIcon = () => (
   <svg width="28" height="28" viewBox="0 0 24 24" fill="none" stroke="currentColor" strokeWidth="1.6" strokeLinecap="round" strokeLinejoin="round">
@@ -143,6 +176,9 @@ export default function FindingsPage() {
   const [isEmpty, setIsEmpty] = useState(false)
   const [pageStatus, setPageStatus] = useState<'loading' | 'ready' | 'error'>('loading')
   const [errorMsg, setErrorMsg] = useState('')
+  const [live, setLive] = useState<LiveTotals | null>(null)
+  const [scanning, setScanning] = useState<ScanSource | null>(null)
+  const [scanNote, setScanNote] = useState('')
 
   async function loadFindings() {
     if (!sessionId) {
@@ -169,6 +205,41 @@ export default function FindingsPage() {
 
   useEffect(() => { loadFindings() }, [])
 
+  // Streams a scan, updating the page as each collection / email batch arrives
+  async function runScan(source: ScanSource) {
+    setScanning(source)
+    setScanNote('')
+    setLive(EMPTY_TOTALS)
+    try {
+      await streamScan(source, event => {
+        if (event.event === 'findings') setLive(prev => addFindings(prev ?? EMPTY_TOTALS, event.findings ?? []))
+        else if (event.event === 'error') setScanNote(event.message ?? 'Scan failed.')
+      }, sessionId || undefined)
+    } catch (err: any) {
+      setScanNote(err?.message ?? 'Scan failed.')
+    }
+    setScanning(null)
+    // Findings were stored in the session: show the session-wide analytics
+    if (sessionId) {
+      await loadFindings()
+      setLive(null)
+    }
+  }
+
+  const subtitle = scanning
+    ? `Scanning ${scanning === 'mongo' ? 'MongoDB' : 'Gmail'}… ${live?.count ?? 0} findings so far`
+    : scanNote || 'Insights from your latest scan session'
+
+  const scanControls = (
+    <div className="findings-scan-controls">
+      {(['mongo', 'gmail'] as ScanSource[]).map(source => (
+        <button key={source} className="findings-retry-btn" disabled={scanning !== null} onClick={() => runScan(source)}>
+          {scanning === source ? 'Scanning…' : source === 'mongo' ? 'Scan MongoDB' : 'Scan Gmail'}
+        </button>
+      ))}
+    </div>
+  )
+
   /* ── Skeleton ── */
   if (pageStatus === 'loading') {
     return (
@@ -213,14 +284,16 @@ export default function FindingsPage() {
   }
 
   /* ── Empty State ── */
-  if (isEmpty || !data) {
+  const view = live ? toFindingsData(live) : data
+  if (!view || (isEmpty && !live)) {
     return (
       <div className="findings-page">
         <div className="findings-header">
           <div>
             <h1 className="findings-header__title">Findings</h1>
-            <p className="findings-header__sub">Insights from your latest scan session</p>
+            <p className="findings-header__sub">{subtitle}</p>
           </div>
+          {scanControls}
         </div>
         <div className="findings-empty">
           <div className="findings-empty__icon-wrap">
@@ -239,11 +312,11 @@ export default function FindingsPage() {
   }
 
   /* ── Derived insights ── */
-  const mostCommonPii = topKey(data.pii_distribution)
-  const topField = topKey(data.field_distribution)
-  const topLaw = topKey(data.law_distribution)
-  const uniquePiiTypes = Object.keys(data.pii_distribution).length
-  const confidenceLevel = data.avg_confidence >= 80 ? 'High' : data.avg_confidence >= 50 ? 'Moderate' : 'Low'
+  const mostCommonPii = topKey(view.pii_distribution)
+  const topField = topKey(view.field_distribution)
+  const topLaw = topKey(view.law_distribution)
+  const uniquePiiTypes = Object.keys(view.pii_distribution).length
+  const confidenceLevel = view.avg_confidence >= 80 ? 'High' : view.avg_confidence >= 50 ? 'Moderate' : 'Low'
 
   return (
     <div className="findings-page">
@@ -252,8 +325,9 @@ export default function FindingsPage() {
       <div className="findings-header">
         <div className="findings-header__left">
           <h1 className="findings-header__title">Findings</h1>
-          <p className="findings-header__sub">Insights from your latest scan session</p>
+          <p className="findings-header__sub">{subtitle}</p>
         </div>
+        {scanControls}
         {sessionId && (
           <div className="findings-session-badge">
             <span className="findings-session-badge__dot" />
@@ -268,7 +342,7 @@ export default function FindingsPage() {
         <div className="findings-stat-card">
           <div className="findings-stat-card__icon"><TotalIcon /></div>
           <div className="findings-stat-card__label">Total Findings</div>
-          <div className="findings-stat-card__value">{data.total_findings.toLocaleString()}</div>
+          <div className="findings-stat-card__value">{view.total_findings.toLocaleString()}</div>
           <div className="findings-stat-card__sub">detected across all sources</div>
         </div>
 
@@ -282,7 +356,7 @@ export default function FindingsPage() {
         <div className="findings-stat-card">
           <div className="findings-stat-card__icon"><ConfIcon /></div>
           <div className="findings-stat-card__label">Avg Confidence</div>
-          <div className="findings-stat-card__value">{data.avg_confidence}%</div>
+          <div className="findings-stat-card__value">{view.avg_confidence}%</div>
           <div className="findings-stat-card__sub">{confidenceLevel.toLowerCase()} confidence detections</div>
         </div>
 
@@ -301,17 +375,17 @@ export default function FindingsPage() {
       <div className="findings-charts">
         <div className="findings-chart-card">
           <p className="findings-chart-card__title">PII Type Breakdown</p>
-          <BarChart dist={data.pii_distribution} />
+          <BarChart dist={view.pii_distribution} />
         </div>
 
         <div className="findings-chart-card">
           <p className="findings-chart-card__title">Regulatory Exposure</p>
-          <PieChart dist={data.law_distribution} />
+          <PieChart dist={view.law_distribution} />
         </div>
 
         <div className="findings-chart-card">
           <p className="findings-chart-card__title">Top Risk Fields</p>
-          <BarChart dist={data.field_distribution} />
+          <BarChart dist={view.field_distribution} />
         </div>
       </div>
 
@@ -337,7 +411,7 @@ export default function FindingsPage() {
           <div className="findings-insight-card__body">
             <div className="findings-insight-card__label">Top Risk Field</div>
             <div className="findings-insight-card__value">
-              <code style={{ fontSize: '0.82rem', color: '#90caff' }}>{topField}</code> has the highest concentration of sensitive data.
+              <code style={{ fontSize: '0.82rem', color: '#90caff' }}>{topField}</code> has the highest concentration of sensitive view.
             </div>
           </div>
         </div>
@@ -20,6 +20,7 @@ export default defineConfig({
       '/chat':     { target: 'http://localhost:8000', changeOrigin: true, secure: false },
       '/findings': { target: 'http://localhost:8000', changeOrigin: true, secure: false },
       '/audits':   { target: 'http://localhost:8000', changeOrigin: true, secure: false },
+      '/scan':     { target: 'http://localhost:8000', changeOrigin: true, secure: false },
       '/api':      { target: 'http://localhost:8000', changeOrigin: true, secure: false },
     },
   },
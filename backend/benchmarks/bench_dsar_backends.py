@@ -0,0 +1,69 @@
+"""
+Benchmark and parity check: DSAR classifier backends on the fixture corpus.
+PyTorch fp32 (transformers) vs. ONNX Runtime dynamic int8 (onnx).
+
+Parity is judged on what scans act on: the set of labels scoring above the
+finding threshold per email, plus the top label. Exits non-zero if the
+onnx backend agrees on fewer than PARITY_MIN of the emails.
+Needs transformers and optimum[onnxruntime]; the first run exports the model.
+
+Run from the backend directory:
+    python -m benchmarks.bench_dsar_backends
+"""
+
+import sys
+import time
+import statistics
+from benchmarks.dsar_corpus import DSAR_CORPUS, corpus_texts
+from transformation_and_enforcement.dsar_classifier import BatchClassifier, get_dsar_pipeline
+from transformation_and_enforcement.onnx_backend import ONNX_AVAILABLE
+
+THRESHOLD = 0.7      # scan_email_content's zero-shot finding threshold
+PARITY_MIN = 0.95
+REPEAT = 4
+
+def decisions(result):
+    return {label for label, score in zip(result["labels"], result["scores"]) if score > THRESHOLD}
+
+def measure(name, pipe):
+    batcher = BatchClassifier(pipe)
+    texts = [text for text, _ in DSAR_CORPUS]
+    batcher.classify_many(texts[:2])  # warm-up
+
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        pipe(text, candidate_labels=batcher.labels)
+        latencies.append(time.perf_counter() - start)
+
+    bulk = corpus_texts(REPEAT)
+    start = time.perf_counter()
+    batcher.classify_many(bulk)
+    elapsed = time.perf_counter() - start
+
+    p95 = statistics.quantiles(latencies, n=20)[-1]
+    print(f"{name:<14} p50 {statistics.median(latencies) * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms   "
+          f"batched {len(bulk) / elapsed:6.1f} emails/s")
+    return batcher.classify_many(texts)
+
+def main():
+    if not ONNX_AVAILABLE:
+        print("optimum[onnxruntime] not installed; nothing to compare")
+        return 0
+    reference = measure("transformers", get_dsar_pipeline("transformers"))
+    candidate = measure("onnx int8", get_dsar_pipeline("onnx"))
+
+    same_decisions = sum(decisions(a) == decisions(b) for a, b in zip(reference, candidate))
+    same_top = sum(a["labels"][0] == b["labels"][0] for a, b in zip(reference, candidate))
+    max_delta = max(abs(dict(zip(a["labels"], a["scores"]))[label] - score)
+                    for a, b in zip(reference, candidate) for label, score in zip(b["labels"], b["scores"]))
+    n = len(DSAR_CORPUS)
+    print(f"threshold decisions agree {same_decisions}/{n}   top label agrees {same_top}/{n}   "
+          f"max score delta {max_delta:.3f}")
+    for (text, _), a, b in zip(DSAR_CORPUS, reference, candidate):
+        if decisions(a) != decisions(b):
+            print(f"  differs: {text[:60]!r} {sorted(decisions(a))} vs {sorted(decisions(b))}")
+    return 0 if same_decisions / n >= PARITY_MIN else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
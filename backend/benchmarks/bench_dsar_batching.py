@@ -0,0 +1,49 @@
+"""
+Benchmark: zero-shot DSAR classification of a mailbox-sized corpus.
+One pipeline call per email through asyncio.to_thread (old path) vs.
+micro-batches through BatchClassifier. Needs transformers and the model.
+
+Run from the backend directory:
+    python -m benchmarks.bench_dsar_batching
+"""
+
+import time
+import asyncio
+from transformers import pipeline
+from benchmarks.stub_gmail import BODIES
+from transformation_and_enforcement.patterns import DSAR_LABELS
+from transformation_and_enforcement.dsar_classifier import BatchClassifier
+
+EMAILS = 128
+texts = [f"user{i}@example.com Message {i} {BODIES[i % len(BODIES)]}" for i in range(EMAILS)]
+
+async def per_email(pipe):
+    return await asyncio.gather(*(
+        asyncio.to_thread(pipe, text, candidate_labels=DSAR_LABELS) for text in texts
+    ))
+
+async def batched(batcher):
+    return await asyncio.gather(*(batcher.classify(text) for text in texts))
+
+async def run(name, coro):
+    start = time.perf_counter()
+    results = await coro
+    elapsed = time.perf_counter() - start
+    print(f"{name:<36} {elapsed * 1000:9.1f} ms   {EMAILS / elapsed:6.1f} emails/s")
+    return results
+
+def top(result):
+    return result["labels"][0]
+
+async def main():
+    pipe = pipeline("zero-shot-classification", model="typeform/distilbert-base-uncased-mnli")
+    pipe(texts[0], candidate_labels=DSAR_LABELS)  # warm-up
+    base = await run("per-email to_thread (batch size 1)", per_email(pipe))
+    batcher = BatchClassifier(pipe)
+    fast = await run(f"micro-batches ({batcher.max_batch} emails)", batched(batcher))
+    print(f"{'':<36} {batcher.stats()}")
+    agree = sum(top(a) == top(b) for a, b in zip(base, fast))
+    print(f"top label agreement: {agree}/{EMAILS}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+"""
+Benchmark: how far emails travel through the DSAR detection cascade
+(regex -> vocabulary prefilter -> zero-shot model) on the fixture corpus,
+and the classification time with and without it when transformers and the
+model are available.
+
+Run from the backend directory:
+    python -m benchmarks.bench_dsar_cascade
+"""
+
+import time
+import asyncio
+from benchmarks.dsar_corpus import DSAR_CORPUS, corpus_texts
+from transformation_and_enforcement.patterns import DSAR_PATTERNS
+from transformation_and_enforcement.dsar_classifier import BatchClassifier, DSARCascade
+
+try:
+    from transformers import pipeline
+except ImportError:
+    pipeline = None
+
+REPEAT = 4
+
+def regex_hit(text: str) -> bool:
+    return any(p.search(text) for p in DSAR_PATTERNS.values())
+
+def tiers():
+    cascade = DSARCascade(classifier=None)
+    missed = [text for text, label in DSAR_CORPUS
+              if label and cascade.tier(text, regex_hit(text)) == "prefilter"]
+    for text, _ in DSAR_CORPUS:
+        cascade.counts[cascade.tier(text, regex_hit(text))] += 1
+    stats = cascade.stats()
+    print(f"emails {stats['emails']}   " + "   ".join(
+        f"{tier} {stats['tiers'][tier]} ({stats['fractions'][tier]:.0%})" for tier in stats["tiers"]))
+    print(f"labelled DSARs dropped by the prefilter: {len(missed)}")
+    for text in missed:
+        print(f"  {text}")
+
+async def timed(name, cascade, texts):
+    start = time.perf_counter()
+    await asyncio.gather(*(cascade.classify(t, regex_hit(t)) for t in texts))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed * 1000:9.1f} ms   model calls {cascade.counts['model']:4d}")
+
+async def main():
+    tiers()
+    if pipeline is None:
+        print("transformers not installed; skipping timings")
+        return
+    pipe = pipeline("zero-shot-classification", model="typeform/distilbert-base-uncased-mnli")
+    batcher = BatchClassifier(pipe)
+    texts = corpus_texts(REPEAT)
+    await timed("model for every email", DSARCascade(batcher, enabled=False), texts)
+    await timed("cascade", DSARCascade(batcher, enabled=True), texts)
+
+if __name__ == "__main__":
+    asyncio.run(main())
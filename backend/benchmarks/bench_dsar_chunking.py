@@ -0,0 +1,89 @@
+"""
+Benchmark: classifier input size before and after text preparation on long
+emails built from the fixture corpus (request sentence + filler paragraphs +
+signature + quoted reply history; for some the request sits deep in the body).
+
+Reports estimated tokens per email, worst case, and how often the request
+sentence survives whole in some chunk. With transformers installed it also
+compares DSAR recall (a label above the finding threshold) with the whole
+text vs. the prepared chunks, and times both.
+
+Run from the backend directory:
+    python -m benchmarks.bench_dsar_chunking
+"""
+
+import time
+import random
+import statistics
+from benchmarks.dsar_corpus import DSAR_CORPUS
+from transformation_and_enforcement.text_prep import TextPreparer, count_tokens, merge_max
+from transformation_and_enforcement.dsar_classifier import BatchClassifier, DSARCascade
+
+try:
+    import transformers  # noqa: F401
+    MODEL_AVAILABLE = True
+except ImportError:
+    MODEL_AVAILABLE = False
+
+THRESHOLD = 0.7      # scan_email_content's zero-shot finding threshold
+MODEL_LIMIT = 512    # what the tokenizer kept of the whole text before
+FILLER = ("Following up on the points from last week, the team reviewed the schedule, the budget "
+          "and the open items on the vendor list, and we will circulate the revised plan shortly. ")
+SIGNATURE = "\n--\nJane Doe\nSenior Analyst, Example Corp\n+1 555 0100\n"
+DISCLAIMER = "\nCONFIDENTIALITY NOTICE: This email and any attachments are confidential. " + FILLER * 3
+
+def long_email(i, text, rng):
+    paragraphs = [FILLER * rng.randint(1, 6) for _ in range(rng.randint(2, 12))]
+    paragraphs.insert(rng.randint(0, len(paragraphs)) if i % 3 == 0 else 0, text)
+    quoted = "\n".join("> " + FILLER for _ in range(rng.randint(5, 40)))
+    body = ("\n\n".join(paragraphs) + SIGNATURE + DISCLAIMER
+            + f"\n\nOn Mon, 3 Mar 2025 at 10:02, Support <support@example.com> wrote:\n{quoted}")
+    return {"message_id": str(i), "thread_id": str(i), "from": f"user{i}@example.com",
+            "subject": f"Re: ticket {i}", "body": body}
+
+def main():
+    rng = random.Random(3)
+    emails = [(long_email(i, text, rng), label) for i, (text, label) in enumerate(DSAR_CORPUS * 3)]
+    preparer = TextPreparer()
+
+    before, after, chunk_counts, covered, covered_before = [], [], [], 0, 0
+    for (email, _), (text, _) in zip(emails, DSAR_CORPUS * 3):
+        content = f"{email['from']} {email['subject']} {email['body']}"
+        before.append(count_tokens(content))
+        covered_before += count_tokens(content[:content.index(text) + len(text)]) <= MODEL_LIMIT
+        chunks = preparer.email_chunks(email)
+        after.append(sum(count_tokens(c) for c in chunks))
+        chunk_counts.append(len(chunks))
+        covered += any(text in chunk for chunk in chunks)
+
+    print(f"tokens/email  whole text: median {statistics.median(before):6.0f}  max {max(before):6d}")
+    print(f"tokens/email  prepared:   median {statistics.median(after):6.0f}  max {max(after):6d}  "
+          f"(budget {preparer.max_tokens} x {preparer.max_chunks} chunks)")
+    print(f"chunks/email  median {statistics.median(chunk_counts)}  max {max(chunk_counts)}   "
+          f"request sentence kept whole in {covered}/{len(emails)} "
+          f"(whole text truncated at {MODEL_LIMIT}: {covered_before}/{len(emails)})   {preparer.stats()}")
+
+    if not MODEL_AVAILABLE:
+        print("transformers not installed; recall and latency not measured")
+        return
+
+    def detected(result):
+        return result is not None and any(score > THRESHOLD for score in result["scores"])
+
+    expected = [email for email, label in emails if label]
+    for name, use_email in (("whole text", False), ("prepared", True)):
+        cascade = DSARCascade(BatchClassifier(), enabled=False)
+        start = time.perf_counter()
+        hits = 0
+        for email in expected:
+            content = f"{email['from']} {email['subject']} {email['body']}"
+            if use_email:
+                result = merge_max(cascade.classifier.classify_many(cascade.preparer.email_chunks(email)))
+            else:
+                result = cascade.classifier.classify_many([content])[0]
+            hits += detected(result)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<11} DSAR recall {hits}/{len(expected)}   {elapsed * 1000 / len(expected):7.1f} ms/email")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: message fetches against the local stub Gmail server.
+Per-message requests on a fresh client each (old path) vs. the shared
+keep-alive client vs. the multipart batch endpoint.
+
+Run from the backend directory:
+    python -m benchmarks.bench_gmail_fetch
+"""
+
+import os
+import time
+import asyncio
+import httpx
+from benchmarks import stub_gmail
+
+MESSAGES = 400
+server, box, BASE = stub_gmail.start(messages=MESSAGES, latency=0.002)
+os.environ["GMAIL_API_BASE"] = BASE
+
+from config import GMAIL_BATCH_SIZE  # noqa: E402  (reads GMAIL_API_BASE set above)
+from integrations.gmail_client import gmail_get, close_http_client, parse_message, fetch_messages  # noqa: E402
+
+async def fresh_client_per_message(ids):
+    async def one(mid):
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            resp = await client.get(f"{BASE}/gmail/v1/users/me/messages/{mid}?format=full",
+                                    headers={"Authorization": "Bearer stub"})
+            resp.raise_for_status()
+            return parse_message(resp.json(), mid)
+    sem = asyncio.Semaphore(5)
+    async def limited(mid):
+        async with sem:
+            return await one(mid)
+    return await asyncio.gather(*(limited(m) for m in ids))
+
+async def shared_client_per_message(ids):
+    sem = asyncio.Semaphore(5)
+    async def limited(mid):
+        async with sem:
+            data = await gmail_get("stub", f"/gmail/v1/users/me/messages/{mid}", {"format": "full"})
+            return parse_message(data, mid)
+    return await asyncio.gather(*(limited(m) for m in ids))
+
+async def batched(ids):
+    chunks = [ids[i:i + GMAIL_BATCH_SIZE] for i in range(0, len(ids), GMAIL_BATCH_SIZE)]
+    results = await asyncio.gather(*(fetch_messages("stub", c) for c in chunks))
+    return [email for chunk in results for email in chunk]
+
+async def run(name, fn, ids):
+    before = (box.requests, box.connections)
+    start = time.perf_counter()
+    emails = await fn(ids)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<30} {elapsed * 1000:8.1f} ms   "
+          f"http requests {box.requests - before[0]:5d}   connections {box.connections - before[1]:5d}")
+    return emails
+
+async def main():
+    ids = box.ids[:MESSAGES]
+    base = await run("fresh client per message", fresh_client_per_message, ids)
+    shared = await run("shared client per message", shared_client_per_message, ids)
+    batch = await run(f"batch endpoint ({GMAIL_BATCH_SIZE}/call)", batched, ids)
+    assert base == shared == batch, "fetched emails differ"
+    await close_http_client()
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    server.shutdown()
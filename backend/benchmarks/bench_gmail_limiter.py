@@ -0,0 +1,72 @@
+"""
+Benchmark: per-message fetches against a stub Gmail server that answers 429
+above a fixed number of concurrent requests (its "quota ceiling").
+The old fixed Semaphore(5) vs. a fixed window above the ceiling vs. the
+adaptive AIMD limiter, all with the same jittered retries.
+
+Run from the backend directory:
+    python -m benchmarks.bench_gmail_limiter
+"""
+
+import os
+import time
+import asyncio
+import httpx
+from benchmarks import stub_gmail
+
+MESSAGES = 300
+CEILING = 12
+server, box, BASE = stub_gmail.start(messages=MESSAGES, latency=0.1)
+box.max_concurrent = CEILING
+os.environ["GMAIL_API_BASE"] = BASE
+os.environ.setdefault("GMAIL_RETRY_BASE_DELAY", "0.05")
+
+from integrations.gmail_client import close_http_client, fetch_message  # noqa: E402  (reads GMAIL_API_BASE set above)
+from integrations.rate_limiter import AdaptiveLimiter  # noqa: E402
+
+async def fixed(ids, size):
+    sem = asyncio.Semaphore(size)
+    async def one(mid):
+        async with sem:
+            return await fetch_message("stub", mid)
+    try:
+        # A TaskGroup cancels the remaining fetches once one fails
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(one(m)) for m in ids]
+    except* httpx.HTTPStatusError as e:
+        raise e.exceptions[0]
+    return [t.result() for t in tasks]
+
+async def adaptive(ids, limiter):
+    return await asyncio.gather(*(fetch_message("stub", m, limiter) for m in ids))
+
+async def run(name, coro):
+    before = (box.requests, box.throttled)
+    start = time.perf_counter()
+    try:
+        emails = await coro
+        outcome = "ok"
+    except httpx.HTTPStatusError as e:
+        emails, outcome = None, f"failed ({e.response.status_code} after retries)"
+    elapsed = time.perf_counter() - start
+    print(f"{name:<34} {elapsed * 1000:8.1f} ms   "
+          f"http requests {box.requests - before[0]:5d}   429s {box.throttled - before[1]:4d}   {outcome}")
+    return emails
+
+async def main():
+    ids = box.ids[:MESSAGES]
+    print(f"stub quota ceiling: {CEILING} concurrent requests")
+    base = await run("fixed Semaphore(5)", fixed(ids, 5))
+    over = await run("fixed Semaphore(40)", fixed(ids, 40))
+    limiter = AdaptiveLimiter(initial=5, maximum=40)
+    tuned = await run("adaptive AIMD (cold)", adaptive(ids, limiter))
+    print(f"{'':<34} window {limiter.stats()}")
+    warm = await run("adaptive AIMD (warm)", adaptive(ids, limiter))
+    print(f"{'':<34} window {limiter.stats()}")
+    assert base == tuned == warm, "fetched emails differ"
+    assert over in (None, base), "fetched emails differ"
+    await close_http_client()
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    server.shutdown()
@@ -0,0 +1,48 @@
+"""
+Benchmark: message ids a Gmail scan has to fetch, first run vs. recurring runs.
+The old scan listed a single page of 5 messages every time; the sync engine
+pages through the whole mailbox once and then reads only the history API.
+
+Run from the backend directory:
+    python -m benchmarks.bench_gmail_sync
+"""
+
+import os
+import time
+import asyncio
+from benchmarks import stub_gmail
+
+MESSAGES = 20000
+NEW_MESSAGES = 25
+server, box, BASE = stub_gmail.start(messages=MESSAGES, latency=0.002)
+os.environ["GMAIL_API_BASE"] = BASE
+
+from integrations.gmail_client import close_http_client  # noqa: E402  (reads GMAIL_API_BASE set above)
+from integrations.gmail_sync import GmailSync  # noqa: E402
+
+async def run(name, history_id):
+    sync = GmailSync("stub", history_id)
+    before = box.requests
+    start = time.perf_counter()
+    ids = [mid async for page in sync.pages() for mid in page]
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {sync.mode:<8} {elapsed * 1000:8.1f} ms   "
+          f"ids {len(ids):6d}   http requests {box.requests - before:4d}")
+    return sync.history_id, ids
+
+async def main():
+    cursor, ids = await run("first run", None)
+    assert len(ids) == MESSAGES
+    cursor, ids = await run("recurring, no new mail", cursor)
+    assert ids == []
+    added = [box.add_message() for _ in range(NEW_MESSAGES)]
+    cursor, ids = await run(f"recurring, {NEW_MESSAGES} new messages", cursor)
+    assert ids == added
+    box.history_floor = int(cursor) + 1
+    _, ids = await run("expired cursor", cursor)
+    assert len(ids) == MESSAGES + NEW_MESSAGES
+    await close_http_client()
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    server.shutdown()
@@ -0,0 +1,99 @@
+"""
+Benchmark: per-pattern regex loop vs. the combined single-pass detector,
+with and without the character-signature prefilters.
+
+Run from the backend directory:
+    python -m benchmarks.bench_pii_detector
+"""
+
+import random
+import string
+import time
+from transformation_and_enforcement.patterns import PII_PATTERNS, HEALTH_KEYWORDS
+from transformation_and_enforcement.detectors import CombinedDetector, pii_detector
+
+unfiltered_detector = CombinedDetector({**PII_PATTERNS, "health": HEALTH_KEYWORDS})
+
+SAMPLES = [
+    "ravi.kumar@example.com",
+    "9876543210",
+    "ABCDE1234F",
+    "2345 6789 0123",
+    "4111 1111 1111 1111",
+    "123-45-6789",
+    "192.168.1.10",
+    "12/05/1990",
+    "A1234567",
+    "prescription",
+]
+
+def build_values(n: int, words: int, pii_rate: float, seed: int = 7):
+    """Field values of roughly `words` words with sparse embedded PII."""
+    rng = random.Random(seed)
+    values = []
+    for _ in range(n):
+        tokens = []
+        for _ in range(rng.randint(1, words)):
+            if rng.random() < pii_rate:
+                tokens.append(rng.choice(SAMPLES))
+            else:
+                tokens.append("".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))))
+        values.append(" ".join(tokens))
+    return values
+
+def per_pattern(values):
+    out = []
+    for val in values:
+        hits = {}
+        for p_type, pattern in PII_PATTERNS.items():
+            m = pattern.search(val)
+            if m:
+                hits[p_type] = m.group(0)
+        m = HEALTH_KEYWORDS.search(val)
+        if m:
+            hits["health"] = m.group(0)
+        out.append(hits)
+    return out
+
+def combined(values):
+    return [unfiltered_detector.search(val) for val in values]
+
+def prefiltered(values):
+    return [pii_detector.search(val) for val in values]
+
+def timed(fn, values, repeat: int = 5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(values)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+WORKLOADS = {
+    "short fields (1-5 words)": dict(n=20000, words=5, pii_rate=0.03),
+    "text fields (1-20 words)": dict(n=10000, words=20, pii_rate=0.03),
+    "notes (1-60 words)": dict(n=3000, words=60, pii_rate=0.03),
+    "PII-dense short fields": dict(n=20000, words=3, pii_rate=0.5),
+}
+
+NUMERIC_VALUES = [str(n) for n in range(0, 2000000, 100)] + ["2024-03-18T10:22:31", "true", "3.75"] * 2000
+
+
+def report(name, values):
+    base_t, base = timed(per_pattern, values)
+    comb_t, comb = timed(combined, values)
+    pre_t, pre = timed(prefiltered, values)
+
+    assert base == comb == pre, f"detector findings differ from per-pattern loop ({name})"
+
+    print(
+        f"{name:<28} per-pattern {base_t * 1000:8.1f} ms   "
+        f"combined {comb_t * 1000:8.1f} ms ({base_t / comb_t:.2f}x)   "
+        f"prefiltered {pre_t * 1000:8.1f} ms ({base_t / pre_t:.2f}x)"
+    )
+
+if __name__ == "__main__":
+    for name, params in WORKLOADS.items():
+        report(name, build_values(**params))
+    report("numeric / date / flag fields", NUMERIC_VALUES)
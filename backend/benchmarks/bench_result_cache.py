@@ -0,0 +1,79 @@
+"""
+Benchmark: content-hash result cache on a mailbox where reply chains and
+newsletters repeat the same bodies. Regex detection with and without the
+cache, and zero-shot inferences needed with and without it (timed when
+transformers and the model are available).
+
+Run from the backend directory:
+    python -m benchmarks.bench_result_cache
+"""
+
+import time
+import random
+from benchmarks.dsar_corpus import DSAR_CORPUS
+from transformation_and_enforcement.detectors import pii_detector
+from transformation_and_enforcement.result_cache import ResultCache, patterns_version, version_of, exact
+from transformation_and_enforcement.dsar_classifier import BatchClassifier
+
+try:
+    from transformers import pipeline
+except ImportError:
+    pipeline = None
+
+EMAILS = 2000
+UNIQUE_SHARE = 0.3   # the rest repeat an earlier body (quoted replies, newsletters)
+
+def mailbox():
+    rng = random.Random(7)
+    quoted = "\n".join(f"> {text}" for text, _ in DSAR_CORPUS) * 3
+    bodies = []
+    for i in range(EMAILS):
+        if bodies and rng.random() > UNIQUE_SHARE:
+            bodies.append(rng.choice(bodies))
+        else:
+            text, _ = rng.choice(DSAR_CORPUS)
+            bodies.append(f"user{i}@example.com Re: thread {i}\n{text}\n\nOn Monday someone wrote:\n{quoted}")
+    return bodies
+
+def detect_cached(cache, text):
+    key = cache.key(text)
+    hits = cache.get(text, key)
+    if hits is None:
+        hits = pii_detector.findall(text)
+        cache.put(text, hits, key)
+    return {p_type: list(values) for p_type, values in hits.items()}
+
+def main():
+    bodies = mailbox()
+
+    start = time.perf_counter()
+    base = [pii_detector.findall(b) for b in bodies]
+    plain = time.perf_counter() - start
+
+    cache = ResultCache("pii_detector", patterns_version(pii_detector.patterns), 10000, normalize=exact)
+    start = time.perf_counter()
+    cached = [detect_cached(cache, b) for b in bodies]
+    elapsed = time.perf_counter() - start
+    assert cached == base, "cached regex findings differ"
+    print(f"regex detection         uncached {plain * 1000:8.1f} ms   cached {elapsed * 1000:8.1f} ms   "
+          f"{cache.stats()}")
+
+    if pipeline is None:
+        print(f"zero-shot inferences    uncached {EMAILS}   cached {len(set(bodies))}   "
+              "(transformers not installed; not timed)")
+        return
+    pipe = pipeline("zero-shot-classification", model="typeform/distilbert-base-uncased-mnli")
+    sample = bodies[:200]
+    for name, batcher in (
+        ("uncached", BatchClassifier(pipe)),
+        ("cached", BatchClassifier(pipe, cache=ResultCache("zero_shot", version_of("bench"), 10000))),
+    ):
+        start = time.perf_counter()
+        for i in range(0, len(sample), batcher.max_batch):
+            batcher.classify_many(sample[i:i + batcher.max_batch])
+        elapsed = time.perf_counter() - start
+        print(f"zero-shot {name:<13} {elapsed * 1000:9.1f} ms   inferred {batcher.inferred:4d}   "
+              f"cache {batcher.cache.stats() if batcher.cache else None}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: cold import time of the API, the MCP server and the scanner
+module, each in a fresh interpreter, and whether importing them loaded the
+DSAR model (it must not; the model loads on warm-up or first use).
+Optionally times the warm-up itself when transformers is installed.
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup
+"""
+
+import sys
+import json
+import statistics
+import subprocess
+
+RUNS = 3
+MODULES = ["transformation_and_enforcement.core", "server", "main"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+from transformation_and_enforcement import dsar_classifier
+print(json.dumps({{"seconds": elapsed, "model_loaded": dsar_classifier.is_loaded(),
+                   "torch_imported": "torch" in sys.modules}}))
+"""
+
+def probe(module: str):
+    proc = subprocess.run([sys.executable, "-c", PROBE.format(module=module)],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None, proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"
+    return json.loads(proc.stdout.strip().splitlines()[-1]), None
+
+def main():
+    for module in MODULES:
+        results, error = [], None
+        for _ in range(RUNS):
+            result, error = probe(module)
+            if result is None:
+                break
+            results.append(result)
+        if not results:
+            print(f"{module:<40} import failed: {error}")
+            continue
+        median = statistics.median(r["seconds"] for r in results)
+        print(f"{module:<40} {median * 1000:8.1f} ms   "
+              f"model loaded {any(r['model_loaded'] for r in results)}   "
+              f"torch imported {any(r['torch_imported'] for r in results)}")
+
+    warm = subprocess.run(
+        [sys.executable, "-c",
+         "from transformation_and_enforcement.dsar_classifier import warm_up; print(warm_up())"],
+        capture_output=True, text=True)
+    if warm.returncode == 0:
+        print(f"{'warm_up() (model load + first inference)':<40} {float(warm.stdout.split()[-1]) * 1000:8.1f} ms")
+    else:
+        print(f"{'warm_up()':<40} unavailable: {warm.stderr.strip().splitlines()[-1]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Fixture corpus of email texts for DSAR classifier benchmarks and parity
+checks: (text, expected DSAR label or None for ordinary mail).
+"""
+
+DSAR_CORPUS = [
+    # Explicit requests (DSAR_PATTERNS phrases)
+    ("Hello, this is a data subject access request. Please send me everything you hold.", "access"),
+    ("Please delete all my personal data from your systems.", "delete"),
+    ("I invoke my right to be forgotten, erase my data.", "delete"),
+    ("Please correct my data, my surname is misspelled in your records.", "rectify"),
+    ("I would like to export my data in a machine readable format.", "portability"),
+    ("I withdraw consent for any processing of my details.", "withdraw_consent"),
+    ("Please stop processing my information for profiling.", "object"),
+    ("Do not sell my data to third parties.", "object"),
+    ("I want to opt out of your marketing emails.", "marketing_opt_out"),
+    ("Account deletion request for the user jdoe.", "delete"),
+    # Paraphrased requests (no regex phrase, model needed)
+    ("Can you send me a copy of the data you hold about me?", "access"),
+    ("I'd like to know which of my personal details your company keeps on file.", "access"),
+    ("Please wipe every trace of me from your customer database.", "delete"),
+    ("My address in your records is outdated, kindly fix it to 12 High Street.", "rectify"),
+    ("I'm moving to another provider and need my history handed over to them.", "portability"),
+    ("I no longer agree to you using my information for research.", "withdraw_consent"),
+    ("Please limit how you use my details until my dispute is resolved.", "restrict_processing"),
+    ("I'm filing a complaint about how you handled my personal information.", "complaint"),
+    ("How exactly do you use the information I gave you at sign up?", "transparency"),
+    ("Please unsubscribe me from this newsletter.", "unsubscribe"),
+    ("Where can I read your privacy policy?", "privacy_policy_info"),
+    ("Take me off your mailing list, I never signed up.", "unsubscribe"),
+    ("I object to my data being used for targeted advertising.", "object"),
+    # Ordinary mail
+    ("Meeting notes attached, nothing sensitive here.", None),
+    ("Lunch tomorrow at 1? The new place on 5th street.", None),
+    ("The quarterly report is ready for review, see the shared folder.", None),
+    ("Your order #4821 has shipped and will arrive on Thursday.", None),
+    ("Reminder: team offsite next Friday, bring a laptop.", None),
+    ("Patient has diabetes, PAN ABCDE1234F, contact ravi.kumar@example.com", None),
+    ("Thanks for the quick turnaround on the invoice!", None),
+    ("Can we move our call to 3pm? Something came up.", None),
+    ("Happy birthday! Hope you have a great day.", None),
+    ("The build is green again after the dependency bump.", None),
+    ("Please find the signed contract attached.", None),
+    ("Flight UA 881 is delayed by two hours.", None),
+    ("We updated the data pipeline dashboard with last week's numbers.", None),
+    ("Could you share the information pack for new hires?", None),
+    ("The conference room projector is broken again.", None),
+    ("Your password was changed successfully.", None),
+    ("Weekly digest: 12 new posts in your groups.", None),
+]
+
+def corpus_texts(repeat: int = 1):
+    """Corpus texts repeated to mailbox-like sizes, in a stable order."""
+    return [text for _ in range(repeat) for text, _ in DSAR_CORPUS]
@@ -0,0 +1,190 @@
+"""
+Local stub of the Google OAuth token endpoint and the Gmail API endpoints the
+scanner uses, for benchmarks and manual runs without a real mailbox.
+
+    python -m benchmarks.stub_gmail 8765
+    GMAIL_API_BASE=http://127.0.0.1:8765 GOOGLE_TOKEN_URL=http://127.0.0.1:8765/token ...
+"""
+
+import re
+import sys
+import json
+import time
+import base64
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+BODIES = [
+    "Hi, please delete all my personal data. My phone is 9876543210.",
+    "Meeting notes attached, nothing sensitive here.",
+    "Patient has diabetes, PAN ABCDE1234F, contact ravi.kumar@example.com",
+    "Can you send me a copy of the data you hold about me?",
+]
+
+class StubMailbox:
+    def __init__(self, messages: int = 500, latency: float = 0.0):
+        self.latency = latency
+        self.ids = [f"m{i:06d}" for i in range(messages)]
+        self.history_id = 1000
+        self.history = []            # (history_id, message_id) for messages added later
+        self.history_floor = 1000    # oldest startHistoryId still answered (older -> 404)
+        self.requests = 0
+        self.connections = 0
+        self.throttle_every = 0      # answer every Nth request with 429 (0 = never)
+        self.max_concurrent = 0      # answer 429 above this many concurrent requests (0 = no limit)
+        self.part_failures = {}      # message id -> status its next batch part fails with
+        self.in_flight = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def add_message(self) -> str:
+        with self.lock:
+            mid = f"m{len(self.ids):06d}"
+            self.ids.append(mid)
+            self.history_id += 1
+            self.history.append((self.history_id, mid))
+            return mid
+
+    def message(self, mid: str):
+        body = BODIES[int(mid[1:]) % len(BODIES)]
+        return {
+            "id": mid,
+            "threadId": f"t{mid[1:]}",
+            "historyId": str(self.history_id),
+            "payload": {
+                "headers": [
+                    {"name": "From", "value": f"User {mid} <user{mid}@example.com>"},
+                    {"name": "Subject", "value": f"Message {mid}"},
+                ],
+                "parts": [{"mimeType": "text/plain",
+                           "body": {"data": base64.urlsafe_b64encode(body.encode()).decode()}}],
+            },
+        }
+
+def make_handler(box: StubMailbox):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with box.lock:
+                box.connections += 1
+
+        def log_message(self, *args):
+            pass
+
+        def handle(self):
+            try:
+                super().handle()
+            except (BrokenPipeError, ConnectionResetError):
+                # The client gave up on the connection (e.g. a cancelled scan)
+                with box.lock:
+                    box.in_flight -= 1
+
+        def _send(self, status: int, payload, content_type: str = "application/json"):
+            body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            with box.lock:
+                box.in_flight -= 1
+
+        def _throttled(self) -> bool:
+            with box.lock:
+                box.requests += 1
+                box.in_flight += 1
+                n = box.requests
+                over = box.max_concurrent and box.in_flight > box.max_concurrent
+            if box.latency:
+                time.sleep(box.latency)
+            if over or (box.throttle_every and n % box.throttle_every == 0):
+                with box.lock:
+                    box.throttled += 1
+                self._send(429, {"error": {"code": 429, "message": "Rate Limit Exceeded"}})
+                return True
+            return False
+
+        def _get(self, path: str, query: dict):
+            if path == "/gmail/v1/users/me/messages":
+                size = int(query.get("maxResults", ["100"])[0])
+                start = int(query.get("pageToken", ["0"])[0])
+                page = box.ids[start:start + size]
+                data = {"messages": [{"id": m, "threadId": f"t{m[1:]}"} for m in page]}
+                if start + size < len(box.ids):
+                    data["nextPageToken"] = str(start + size)
+                return 200, data
+            if path == "/gmail/v1/users/me/profile":
+                return 200, {"emailAddress": "stub@example.com", "historyId": str(box.history_id)}
+            if path == "/gmail/v1/users/me/history":
+                since = query["startHistoryId"][0]
+                if not since.isdigit() or int(since) < box.history_floor:
+                    return 404, {"error": {"code": 404, "message": "Requested entity was not found."}}
+                since = int(since)
+                added = [{"id": str(h), "messagesAdded": [{"message": {"id": m}}]}
+                         for h, m in box.history if h > since]
+                return 200, {"history": added, "historyId": str(box.history_id)}
+            m = re.fullmatch(r"/gmail/v1/users/me/messages/([^/]+)", path)
+            if m and m.group(1) in box.ids:
+                return 200, box.message(m.group(1))
+            return 404, {"error": {"code": 404, "message": "Not Found"}}
+
+        def do_GET(self):
+            if self._throttled():
+                return
+            url = urlparse(self.path)
+            self._send(*self._get(url.path, parse_qs(url.query)))
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length).decode()
+            if self._throttled():
+                return
+            if self.path == "/token":
+                return self._send(200, {"access_token": f"stub-{time.time()}", "expires_in": 3599,
+                                        "token_type": "Bearer"})
+            if self.path == "/batch/gmail/v1":
+                boundary = re.search(r"boundary=([^;\s]+)", self.headers["Content-Type"]).group(1)
+                out = []
+                for part in raw.split(f"--{boundary}"):
+                    cid = re.search(r"Content-ID:\s*<([^>]+)>", part)
+                    req = re.search(r"GET (\S+)", part)
+                    if not cid or not req:
+                        continue
+                    url = urlparse(req.group(1))
+                    with box.lock:
+                        failure = box.part_failures.pop(url.path.rsplit("/", 1)[-1], None)
+                    if failure:
+                        status, data = failure, {"error": {"code": failure}}
+                    else:
+                        status, data = self._get(url.path, parse_qs(url.query))
+                    out.append(
+                        f"--resp_boundary\r\nContent-Type: application/http\r\n"
+                        f"Content-ID: <response-{cid.group(1)}>\r\n\r\n"
+                        f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n\r\n"
+                        f"{json.dumps(data)}\r\n"
+                    )
+                out.append("--resp_boundary--\r\n")
+                return self._send(200, "".join(out).encode(), "multipart/mixed; boundary=resp_boundary")
+            self._send(404, {"error": {"code": 404}})
+
+    return Handler
+
+def start(port: int = 0, messages: int = 500, latency: float = 0.0):
+    """Start the stub in a background thread; returns (server, mailbox, base_url)."""
+    box = StubMailbox(messages, latency)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(box))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, box, f"http://127.0.0.1:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    server, box, base = start(int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"stub Gmail API on {base}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
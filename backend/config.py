@@ -19,12 +19,33 @@ DB = Client['PRISMATIC']
 Users = DB['USERS']
 Audits = DB['Audits']
 Integrations = DB['Integrations']
+ScanState = DB['ScanState']
 
 # google oauth (integrations)
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI") 
 SCOPES = "https://www.googleapis.com/auth/gmail.readonly"
+GOOGLE_TOKEN_URL = os.getenv("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+GMAIL_API_BASE = os.getenv("GMAIL_API_BASE", "https://gmail.googleapis.com")
+# Messages per Gmail batch request (API maximum is 100)
+GMAIL_BATCH_SIZE = min(int(os.getenv("GMAIL_BATCH_SIZE", "50")), 100)
+GMAIL_HTTP_MAX_CONNECTIONS = int(os.getenv("GMAIL_HTTP_MAX_CONNECTIONS", "20"))
+GMAIL_HTTP_TIMEOUT = float(os.getenv("GMAIL_HTTP_TIMEOUT", "30"))
+# Adaptive per-tenant request concurrency (AIMD) and retries on 429/5xx
+GMAIL_CONCURRENCY_INITIAL = float(os.getenv("GMAIL_CONCURRENCY_INITIAL", "5"))
+GMAIL_CONCURRENCY_MIN = float(os.getenv("GMAIL_CONCURRENCY_MIN", "1"))
+GMAIL_CONCURRENCY_MAX = float(os.getenv("GMAIL_CONCURRENCY_MAX", str(GMAIL_HTTP_MAX_CONNECTIONS)))
+GMAIL_LATENCY_TARGET = float(os.getenv("GMAIL_LATENCY_TARGET", "2.0"))
+GMAIL_MAX_RETRIES = int(os.getenv("GMAIL_MAX_RETRIES", "5"))
+GMAIL_RETRY_BASE_DELAY = float(os.getenv("GMAIL_RETRY_BASE_DELAY", "0.5"))
+GMAIL_RETRY_MAX_DELAY = float(os.getenv("GMAIL_RETRY_MAX_DELAY", "32"))
+# Refresh cached access tokens this many seconds before they expire
+GMAIL_TOKEN_REFRESH_MARGIN = float(os.getenv("GMAIL_TOKEN_REFRESH_MARGIN", "300"))
+# Message ids per list/history page (API maximum is 500)
+GMAIL_PAGE_SIZE = min(int(os.getenv("GMAIL_PAGE_SIZE", "500")), 500)
+# Batch fetches kept in flight ahead of the scan consumer
+GMAIL_FETCH_AHEAD = int(os.getenv("GMAIL_FETCH_AHEAD", "8"))
 
 # Encription Setup
 cipher = Fernet(Fernet_Key.encode())
@@ -36,6 +57,96 @@ SENDER_EMAIL = os.getenv("SENDER_EMAIL")
 # Groq API Key
 Groq_API_Key = os.getenv("Groq_API_Key")
 
+# Mongo scan concurrency
+SCAN_MAX_WORKERS = int(os.getenv("SCAN_MAX_WORKERS", "8"))
+SCAN_USE_PROCESSES = os.getenv("SCAN_USE_PROCESSES", "false").lower() == "true"
+SCAN_PROCESS_WORKERS = int(os.getenv("SCAN_PROCESS_WORKERS", str(os.cpu_count() or 1)))
+
+# Incremental Mongo scans: per-collection cap per run, and the field holding last-modified time.
+# Each scanned collection needs an index on {SCAN_MODIFIED_FIELD: 1, _id: 1}, or every run
+# scans and sorts it in full (a warning is logged once per collection)
+SCAN_INCREMENTAL_LIMIT = int(os.getenv("SCAN_INCREMENTAL_LIMIT", "1000"))
+SCAN_MODIFIED_FIELD = os.getenv("SCAN_MODIFIED_FIELD", "updatedAt")
+
+# Schema-inference field pruning: profile a small sample per collection, then
+# project away fields whose PII likelihood is below the threshold
+# (untargeted scans only: DSAR lookups always read every field)
+SCAN_FIELD_PRUNING = os.getenv("SCAN_FIELD_PRUNING", "true").lower() == "true"
+SCAN_PROFILE_SAMPLE = int(os.getenv("SCAN_PROFILE_SAMPLE", "20"))
+SCAN_PROFILE_TTL_HOURS = float(os.getenv("SCAN_PROFILE_TTL_HOURS", "24"))
+SCAN_FIELD_MIN_LIKELIHOOD = float(os.getenv("SCAN_FIELD_MIN_LIKELIHOOD", "0.05"))
+SCAN_BLOB_CHARS = int(os.getenv("SCAN_BLOB_CHARS", "4096"))
+
+# Targeted (DSAR) scans: push subject lookups down to Mongo as filters (see
+# query_planner). Indexed fields are matched by equality or case-sensitive prefix,
+# so a subject mentioned mid-value or in mixed case in an indexed field is missed;
+# INDEXED_ONLY also skips the residual collection scan of unindexed/unprofiled fields
+SCAN_PUSHDOWN = os.getenv("SCAN_PUSHDOWN", "true").lower() == "true"
+SCAN_PUSHDOWN_INDEXED_ONLY = os.getenv("SCAN_PUSHDOWN_INDEXED_ONLY", "false").lower() == "true"
+SCAN_PUSHDOWN_LIMIT = int(os.getenv("SCAN_PUSHDOWN_LIMIT", "1000"))
+
+# Per-tenant MongoClient pool (scans and enforcement)
+MONGO_POOL_MAX_CLIENTS = int(os.getenv("MONGO_POOL_MAX_CLIENTS", "32"))
+MONGO_POOL_TTL_SECONDS = float(os.getenv("MONGO_POOL_TTL_SECONDS", "600"))
+MONGO_POOL_HEALTH_INTERVAL = float(os.getenv("MONGO_POOL_HEALTH_INTERVAL", "30"))
+MONGO_POOL_MAX_POOL_SIZE = int(os.getenv("MONGO_POOL_MAX_POOL_SIZE", "20"))
+
+# Zero-shot DSAR classifier model, and whether to load it in the background at
+# startup (otherwise on the first scan)
+DSAR_MODEL = os.getenv("DSAR_MODEL", "typeform/distilbert-base-uncased-mnli")
+DSAR_WARM_UP = os.getenv("DSAR_WARM_UP", "true").lower() == "true"
+# Inference backend: "transformers" (PyTorch fp32) or "onnx" (ONNX Runtime,
+# dynamic int8, exported once into DSAR_ONNX_DIR; needs optimum[onnxruntime])
+DSAR_BACKEND = os.getenv("DSAR_BACKEND", "transformers").lower()
+DSAR_ONNX_DIR = os.getenv("DSAR_ONNX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "prismatic", "onnx"))
+# Emails per micro-batch, how long a batch may wait to fill, and
+# (premise, hypothesis) pairs per model forward pass
+DSAR_MICRO_BATCH = int(os.getenv("DSAR_MICRO_BATCH", "16"))
+DSAR_BATCH_WAIT_MS = float(os.getenv("DSAR_BATCH_WAIT_MS", "10"))
+DSAR_FORWARD_BATCH = int(os.getenv("DSAR_FORWARD_BATCH", "32"))
+# Skip the model for emails without privacy vocabulary or with a DSAR regex hit
+DSAR_CASCADE = os.getenv("DSAR_CASCADE", "true").lower() == "true"
+# Classifier input budget: quoted replies and signatures are stripped, and the
+# rest is classified in at most DSAR_MAX_CHUNKS chunks of DSAR_MAX_TOKENS
+# (estimated) tokens, overlapping by DSAR_CHUNK_OVERLAP
+DSAR_MAX_TOKENS = int(os.getenv("DSAR_MAX_TOKENS", "256"))
+DSAR_MAX_CHUNKS = int(os.getenv("DSAR_MAX_CHUNKS", "4"))
+DSAR_CHUNK_OVERLAP = int(os.getenv("DSAR_CHUNK_OVERLAP", "32"))
+
+# Content-hash cache of zero-shot outputs and regex findings for repeated email
+# text. Zero-shot outputs (labels and scores only) can also be kept in SQLite
+# across restarts by setting RESULT_CACHE_SQLITE to a database path; regex
+# findings contain raw values and are kept in memory only.
+RESULT_CACHE = os.getenv("RESULT_CACHE", "true").lower() == "true"
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))
+RESULT_CACHE_SQLITE = os.getenv("RESULT_CACHE_SQLITE", "")
+RESULT_CACHE_SQLITE_MAX_ROWS = int(os.getenv("RESULT_CACHE_SQLITE_MAX_ROWS", "100000"))
+
+# Memo of deterministic transformation outputs (masking, aggregation, anonymization)
+# per (transformation, PII type, keyed digest of the value); in memory only, 0 disables
+TRANSFORM_MEMO_MAX_ENTRIES = int(os.getenv("TRANSFORM_MEMO_MAX_ENTRIES", "50000"))
+
+# Thread pool for large encryption/hashing groups in transform_batch (one thread
+# per core, at most 8; 1 disables it). A group is split across the pool only when
+# its values add up to TRANSFORM_PARALLEL_MIN_BYTES and average at least
+# TRANSFORM_PARALLEL_MIN_VALUE_BYTES: hashlib and OpenSSL only release the GIL for
+# large inputs, so many short values run faster serially
+TRANSFORM_WORKERS = int(os.getenv("TRANSFORM_WORKERS", str(min(8, os.cpu_count() or 1))))
+TRANSFORM_PARALLEL_MIN_BYTES = int(os.getenv("TRANSFORM_PARALLEL_MIN_BYTES", "1048576"))
+TRANSFORM_PARALLEL_MIN_VALUE_BYTES = int(os.getenv("TRANSFORM_PARALLEL_MIN_VALUE_BYTES", "2048"))
+
+# Pseudonym vault shared by all workers: SQLite file keyed by an HMAC of each
+# value (secret defaults to the Fernet key), with an LRU of recent mappings
+PSEUDONYM_VAULT_PATH = os.getenv("PSEUDONYM_VAULT_PATH", "pseudonym_vault.db")
+PSEUDONYM_VAULT_SECRET = os.getenv("PSEUDONYM_VAULT_SECRET", Fernet_Key or "")
+PSEUDONYM_CACHE_MAX_ENTRIES = int(os.getenv("PSEUDONYM_CACHE_MAX_ENTRIES", "50000"))
+
+# Token vault: deterministic per-tenant tokens (HMAC, secret defaults to the
+# Fernet key), originals stored Fernet-encrypted once per distinct value
+TOKEN_VAULT_PATH = os.getenv("TOKEN_VAULT_PATH", "token_vault.db")
+TOKEN_VAULT_SECRET = os.getenv("TOKEN_VAULT_SECRET", Fernet_Key or "")
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "50000"))
+
 def create_db_indexes():
     """
     Create all MongoDB indexes. Called once on app startup from main.py.
@@ -44,3 +155,4 @@ def create_db_indexes():
     """
     Audits.create_index([("admin", 1), ("ts", -1)])
     Audits.create_index([("dsar_id", 1)])
+    ScanState.create_index([("admin_email", 1), ("namespace", 1)], unique=True)
@@ -1,5 +1,7 @@
 from pymongo import MongoClient
 from config import Integrations
+from integrations.mongo_pool import mongo_pool
+from integrations.token_cache import gmail_tokens
 import requests
 import urllib.parse
 from config import GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, REDIRECT_URI, SCOPES, cipher
@@ -35,10 +37,14 @@ def MongoConnection(mongo_uri: str, admin_email: str):
             },
             upsert=True
         )
+
+        # The verified client becomes the tenant's pooled client for scans/enforcement
+        mongo_pool.adopt(admin_email, mongo_uri, client)
         
         return {"success": True, "message": f"MongoDB connected successfully for {admin_email}", "client": client}
         
     except Exception as e:
+        mongo_pool.evict(admin_email)
         # Encrypt MongoDB URI before storing (even on failure)
         encrypted_mongo_uri = cipher.encrypt(mongo_uri.encode()).decode()
         
@@ -137,9 +143,16 @@ def GmailCallback(code: str, admin_email: str):
             upsert=True
         )
         
+        # The exchange also returned a fresh access token; scans can start with it
+        if tokens.get("access_token"):
+            gmail_tokens.put(admin_email, tokens["access_token"], tokens.get("expires_in", 0))
+        else:
+            gmail_tokens.invalidate(admin_email)
+        
         return {"success": True, "message": "Gmail connected successfully!"}
         
     except Exception as e:
+        gmail_tokens.invalidate(admin_email)
         # Mark Gmail connection as failed
         Integrations.update_one(
             {"admin_email": admin_email}, 
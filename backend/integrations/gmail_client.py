@@ -0,0 +1,252 @@
+import re
+import json
+import time
+import base64
+import uuid
+import random
+import asyncio
+import weakref
+import httpx
+from typing import List, Dict, Any, Tuple, Callable, Awaitable, Optional
+from config import GMAIL_API_BASE, GMAIL_HTTP_MAX_CONNECTIONS, GMAIL_HTTP_TIMEOUT
+from config import GMAIL_MAX_RETRIES, GMAIL_RETRY_BASE_DELAY, GMAIL_RETRY_MAX_DELAY
+from integrations.rate_limiter import AdaptiveLimiter
+
+# Gmail API transport: one keep-alive client per event loop plus the
+# multipart batch endpoint for message fetches.
+
+try:
+    import h2  # noqa: F401  (optional, enables HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# httpx clients are bound to the loop they were first used on (FastAPI and the
+# MCP server each run their own), so one client is kept per running loop
+_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+def get_http_client() -> httpx.AsyncClient:
+    """Long-lived pooled client for Google APIs on the current event loop."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=GMAIL_HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=GMAIL_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=GMAIL_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=60.0,
+            ),
+        )
+        _http_clients[loop] = client
+    return client
+
+async def close_http_client():
+    """Close the current loop's client. Called on application shutdown."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    client = _http_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+# Statuses Gmail uses for quota and transient failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def is_throttled(status: int, body: str = "") -> bool:
+    # Gmail also reports per-user quota as 403 rateLimitExceeded/userRateLimitExceeded
+    return status in RETRY_STATUSES or (status == 403 and "ateLimitExceeded" in body)
+
+def _retry_delay(attempt: int, resp: Optional[httpx.Response]) -> float:
+    """Full-jitter exponential backoff, never shorter than a Retry-After header."""
+    delay = random.uniform(0, min(GMAIL_RETRY_MAX_DELAY, GMAIL_RETRY_BASE_DELAY * 2 ** attempt))
+    retry_after = resp.headers.get("retry-after") if resp is not None else None
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, min(float(retry_after), GMAIL_RETRY_MAX_DELAY))
+    return delay
+
+async def send_with_retries(send: Callable[[], Awaitable[httpx.Response]],
+                            limiter: AdaptiveLimiter = None) -> httpx.Response:
+    """
+    Run send() inside the tenant's limiter, retrying throttled (429/5xx/403
+    rate limit) responses and transport errors with jittered backoff.
+    Returns the first successful response; raises for anything else.
+    """
+    for attempt in range(GMAIL_MAX_RETRIES + 1):
+        started = await limiter.acquire() if limiter else time.monotonic()
+        resp, error = None, None
+        try:
+            resp = await send()
+        except httpx.TransportError as e:
+            error = e
+        except BaseException:
+            if limiter:
+                limiter.release(started, None)
+            raise
+        # Only a 403 needs its body read (rate-limit reason); batch payloads are large
+        throttled = error is not None or is_throttled(
+            resp.status_code, resp.text if resp.status_code == 403 else "")
+        if limiter:
+            limiter.release(started, throttled)
+        if not throttled:
+            resp.raise_for_status()
+            return resp
+        if attempt == GMAIL_MAX_RETRIES:
+            break
+        if limiter:
+            limiter.retries += 1
+        await asyncio.sleep(_retry_delay(attempt, resp))
+    if error is not None:
+        raise error
+    resp.raise_for_status()
+    return resp
+
+async def gmail_get(access_token: str, path: str, params: Dict[str, Any] = None,
+                    limiter: AdaptiveLimiter = None) -> Dict[str, Any]:
+    """GET a Gmail API path (e.g. "/gmail/v1/users/me/messages") and return its JSON."""
+    resp = await send_with_retries(lambda: get_http_client().get(
+        f"{GMAIL_API_BASE}{path}",
+        params=params,
+        headers={"Authorization": f"Bearer {access_token}"},
+    ), limiter)
+    return resp.json()
+
+# Gmail batch API (multipart/mixed)
+def _split_head(block: str) -> Tuple[str, str]:
+    """Split an HTTP-style block into (headers, body) at the first blank line."""
+    for sep in ("\r\n\r\n", "\n\n"):
+        head, found, body = block.partition(sep)
+        if found:
+            return head, body
+    return block, ""
+
+def build_batch_body(paths: List[str], boundary: str) -> str:
+    parts = []
+    for i, path in enumerate(paths):
+        parts.append(
+            f"--{boundary}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <item-{i}>\r\n\r\n"
+            f"GET {path}\r\n\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n")
+    return "".join(parts)
+
+def parse_batch_response(content_type: str, body: str) -> Dict[int, Tuple[int, Dict[str, Any]]]:
+    """Map each part's item index to (HTTP status, JSON payload)."""
+    match = re.search(r'boundary="?([^";\s]+)"?', content_type)
+    if not match:
+        raise Exception(f"Gmail batch response has no multipart boundary: {content_type}")
+    boundary = match.group(1)
+
+    results = {}
+    for part in body.split(f"--{boundary}"):
+        part = part.strip()
+        if not part or part == "--":
+            continue
+        part_headers, http_response = _split_head(part)
+        cid = re.search(r"Content-ID:\s*<?response-item-(\d+)>?", part_headers, re.IGNORECASE)
+        if not cid:
+            continue
+        status_and_headers, payload = _split_head(http_response.lstrip())
+        status = int(status_and_headers.split(None, 2)[1])
+        try:
+            data = json.loads(payload) if payload.strip() else {}
+        except ValueError:
+            data = {"error": payload.strip()}
+        results[int(cid.group(1))] = (status, data)
+    return results
+
+async def batch_get_messages(access_token: str, message_ids: List[str], fmt: str = "full",
+                             limiter: AdaptiveLimiter = None) -> Dict[str, Tuple[int, Dict[str, Any]]]:
+    """
+    Fetch up to 100 messages in one HTTP call through Gmail's batch endpoint.
+    Returns message_id -> (status, message JSON); failed parts keep their status
+    so callers can retry them individually.
+    """
+    if not message_ids:
+        return {}
+    boundary = f"batch_{uuid.uuid4().hex}"
+    paths = [f"/gmail/v1/users/me/messages/{mid}?format={fmt}" for mid in message_ids]
+    body = build_batch_body(paths, boundary).encode()
+    resp = await send_with_retries(lambda: get_http_client().post(
+        f"{GMAIL_API_BASE}/batch/gmail/v1",
+        content=body,
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": f"multipart/mixed; boundary={boundary}",
+        },
+    ), limiter)
+    parsed = parse_batch_response(resp.headers.get("content-type", ""), resp.text)
+    return {
+        mid: parsed.get(i, (0, {"error": "missing from batch response"}))
+        for i, mid in enumerate(message_ids)
+    }
+
+# Message fetches
+def parse_message(data: Dict[str, Any], message_id: str) -> Dict[str, Any]:
+    """Extract sender, subject and plain-text body from a Gmail message resource."""
+    # Extract headers
+    headers_data = {h['name']: h.get('value', '') for h in data.get('payload', {}).get('headers', [])}
+    
+    # Extract body (plain text if available)
+    body = ""
+    for part in data.get('payload', {}).get('parts', []):
+        if part.get('mimeType') == "text/plain":
+            body_data = part.get('body', {}).get('data', "")
+            if body_data:
+                body += base64.urlsafe_b64decode(body_data.encode()).decode()
+    
+    return {
+        "message_id": message_id,
+        "thread_id": data.get("threadId"),
+        "from": headers_data.get("From", ""),
+        "subject": headers_data.get("Subject", ""),
+        "body": body
+    }
+
+async def fetch_message(access_token: str, message_id: str,
+                        limiter: AdaptiveLimiter = None) -> Dict[str, Any]:
+    """Fetch and parse a single message."""
+    data = await gmail_get(access_token, f"/gmail/v1/users/me/messages/{message_id}", {"format": "full"}, limiter)
+    return parse_message(data, message_id)
+
+async def fetch_messages(access_token: str, message_ids: List[str],
+                         limiter: AdaptiveLimiter = None) -> List[Dict[str, Any]]:
+    """
+    Fetch and parse messages with one batch call (up to 100 ids).
+    Parts that failed inside the batch are refetched individually and
+    concurrently (with retries, bounded by the limiter); messages deleted
+    since they were listed (404) are skipped.
+    Returns messages in message_ids order.
+    """
+    started = time.monotonic()
+    results = await batch_get_messages(access_token, message_ids, limiter=limiter)
+    if limiter and any(is_throttled(status) for status, _ in results.values()):
+        # Throttled parts shrink the window like a throttled request
+        limiter.throttle(started)
+
+    failed = [mid for mid in message_ids if results[mid][0] not in (200, 404)]
+    refetched = dict(zip(failed, await asyncio.gather(
+        *(_refetch_message(access_token, mid, limiter) for mid in failed)
+    )))
+    messages = []
+    for message_id in message_ids:
+        status, data = results[message_id]
+        if status == 200:
+            messages.append(parse_message(data, message_id))
+        elif refetched.get(message_id) is not None:
+            messages.append(refetched[message_id])
+    return messages
+
+async def _refetch_message(access_token: str, message_id: str,
+                           limiter: AdaptiveLimiter = None) -> Optional[Dict[str, Any]]:
+    """fetch_message for a failed batch part; None if it was deleted in the meantime."""
+    try:
+        return await fetch_message(access_token, message_id, limiter)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            return None
+        raise
@@ -0,0 +1,116 @@
+import httpx
+from typing import List, Dict, Any, Optional, AsyncIterator
+from config import GMAIL_PAGE_SIZE
+from integrations.gmail_client import gmail_get
+from integrations.rate_limiter import AdaptiveLimiter
+
+# Mailbox sync: which message ids a Gmail scan has to fetch.
+#
+# The first run (or one without a usable cursor) pages through the whole
+# mailbox with nextPageToken. The mailbox historyId read before listing
+# becomes the cursor, so later runs ask the history API only for messages
+# added since then. Gmail keeps history for about a week; an expired cursor
+# answers 404 and the run falls back to a full listing.
+
+class HistoryExpired(Exception):
+    pass
+
+async def get_history_id(access_token: str, limiter: AdaptiveLimiter = None) -> str:
+    """Current mailbox historyId."""
+    profile = await gmail_get(access_token, "/gmail/v1/users/me/profile", limiter=limiter)
+    return str(profile["historyId"])
+
+async def iter_message_pages(access_token: str, page_size: int = GMAIL_PAGE_SIZE,
+                             query: str = None, limiter: AdaptiveLimiter = None) -> AsyncIterator[List[str]]:
+    """Message ids of the whole mailbox, one page at a time."""
+    params: Dict[str, Any] = {"maxResults": page_size}
+    if query:
+        params["q"] = query
+    while True:
+        data = await gmail_get(access_token, "/gmail/v1/users/me/messages", params, limiter)
+        ids = [m["id"] for m in data.get("messages", [])]
+        if ids:
+            yield ids
+        token = data.get("nextPageToken")
+        if not token:
+            return
+        params["pageToken"] = token
+
+async def iter_history_pages(access_token: str, start_history_id: str,
+                             page_size: int = GMAIL_PAGE_SIZE, cursor: Dict[str, str] = None,
+                             limiter: AdaptiveLimiter = None) -> AsyncIterator[List[str]]:
+    """
+    Ids of messages added since start_history_id, one page at a time.
+    The latest historyId reported by the API is written to cursor["history_id"].
+    Raises HistoryExpired if Gmail no longer has history that far back.
+    """
+    params: Dict[str, Any] = {
+        "startHistoryId": start_history_id,
+        "historyTypes": "messageAdded",
+        "maxResults": page_size,
+    }
+    seen = set()
+    while True:
+        try:
+            data = await gmail_get(access_token, "/gmail/v1/users/me/history", params, limiter)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                raise HistoryExpired(start_history_id) from e
+            raise
+        if cursor is not None and data.get("historyId"):
+            cursor["history_id"] = str(data["historyId"])
+        ids = []
+        for record in data.get("history", []):
+            for added in record.get("messagesAdded", []):
+                mid = added.get("message", {}).get("id")
+                if mid and mid not in seen:
+                    seen.add(mid)
+                    ids.append(mid)
+        if ids:
+            yield ids
+        token = data.get("nextPageToken")
+        if not token:
+            return
+        params["pageToken"] = token
+
+class GmailSync:
+    """
+    One sync pass over a mailbox. Iterate pages() for the message ids to
+    scan; once it is exhausted, history_id is the cursor to store for the
+    next pass and mode says whether the pass was "full" or "history".
+    """
+
+    def __init__(self, access_token: str, history_id: Optional[str] = None,
+                 page_size: int = GMAIL_PAGE_SIZE, limiter: AdaptiveLimiter = None):
+        self.access_token = access_token
+        self.limiter = limiter
+        self.start_history_id = history_id
+        self.page_size = page_size
+        self.history_id: Optional[str] = None
+        self.mode: Optional[str] = None
+        self.messages = 0
+
+    async def pages(self) -> AsyncIterator[List[str]]:
+        if self.start_history_id:
+            cursor = {"history_id": self.start_history_id}
+            try:
+                async for ids in iter_history_pages(self.access_token, self.start_history_id,
+                                                    self.page_size, cursor, self.limiter):
+                    self.mode = "history"
+                    self.messages += len(ids)
+                    yield ids
+                self.mode = "history"
+                self.history_id = cursor["history_id"]
+                return
+            except HistoryExpired:
+                # Only the first page can report an expired cursor
+                if self.messages:
+                    raise
+
+        self.mode = "full"
+        # Read the cursor before listing so mail arriving mid-listing is picked up next time
+        history_id = await get_history_id(self.access_token, self.limiter)
+        async for ids in iter_message_pages(self.access_token, self.page_size, limiter=self.limiter):
+            self.messages += len(ids)
+            yield ids
+        self.history_id = history_id
@@ -0,0 +1,167 @@
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator
+from pymongo import MongoClient
+from config import (MONGO_POOL_MAX_CLIENTS, MONGO_POOL_TTL_SECONDS,
+                    MONGO_POOL_HEALTH_INTERVAL, MONGO_POOL_MAX_POOL_SIZE)
+
+logger = logging.getLogger(__name__)
+
+class _PooledClient:
+    def __init__(self, client: MongoClient, uri_hash: str):
+        self.client = client
+        self.uri_hash = uri_hash
+        self.last_used = time.monotonic()
+        self.last_checked = time.monotonic()
+        self.leases = 0
+        self.retired = False
+
+class MongoClientPool:
+    """
+    One MongoClient per tenant, shared by scans and enforcement.
+
+    Clients are keyed by admin_email and replaced when the tenant's URI
+    changes. Idle clients expire after ttl_seconds and the least recently
+    used one is evicted beyond max_clients. A client is pinged again when
+    leased after health_interval seconds; a failed ping rebuilds it. Evicted
+    clients still leased by a running scan are closed on their last release.
+    """
+
+    def __init__(self, max_clients: int = MONGO_POOL_MAX_CLIENTS,
+                 ttl_seconds: float = MONGO_POOL_TTL_SECONDS,
+                 health_interval: float = MONGO_POOL_HEALTH_INTERVAL,
+                 max_pool_size: int = MONGO_POOL_MAX_POOL_SIZE):
+        self.max_clients = max_clients
+        self.ttl_seconds = ttl_seconds
+        self.health_interval = health_interval
+        self.max_pool_size = max_pool_size
+        self._clients: "OrderedDict[str, _PooledClient]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _hash(mongo_uri: str) -> str:
+        # Only a digest of the URI is kept alongside the client
+        return hashlib.sha256(mongo_uri.encode()).hexdigest()
+
+    def _new_client(self, mongo_uri: str) -> MongoClient:
+        client = MongoClient(mongo_uri, serverSelectionTimeoutMS=2000, maxPoolSize=self.max_pool_size)
+        client.admin.command("ping")
+        return client
+
+    def _retire(self, entry: _PooledClient):
+        """Close now, or on last release if a caller still holds it. Caller holds the lock."""
+        entry.retired = True
+        if entry.leases == 0:
+            entry.client.close()
+
+    def _evict_locked(self):
+        now = time.monotonic()
+        for key in [k for k, e in self._clients.items()
+                    if e.leases == 0 and now - e.last_used > self.ttl_seconds]:
+            self._retire(self._clients.pop(key))
+        while len(self._clients) > self.max_clients:
+            _, entry = self._clients.popitem(last=False)
+            self._retire(entry)
+
+    def adopt(self, admin_email: str, mongo_uri: str, client: MongoClient):
+        """Register an already verified client (e.g. from the Integrations connect flow)."""
+        with self._lock:
+            old = self._clients.pop(admin_email, None)
+            if old is not None:
+                self._retire(old)
+            self._clients[admin_email] = _PooledClient(client, self._hash(mongo_uri))
+            self._evict_locked()
+
+    def _acquire(self, admin_email: str, mongo_uri: str) -> _PooledClient:
+        uri_hash = self._hash(mongo_uri)
+        with self._lock:
+            self._evict_locked()
+            entry = self._clients.get(admin_email)
+            if entry is not None and entry.uri_hash != uri_hash:
+                self._retire(self._clients.pop(admin_email))
+                entry = None
+            if entry is not None:
+                self._clients.move_to_end(admin_email)
+                entry.leases += 1
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is not None:
+            if time.monotonic() - entry.last_checked < self.health_interval:
+                return entry
+            try:
+                entry.client.admin.command("ping")
+                entry.last_checked = time.monotonic()
+                return entry
+            except Exception as e:
+                logger.warning(f"Pooled Mongo client for {admin_email} failed health check: {e}")
+                with self._lock:
+                    entry.leases -= 1
+                    if self._clients.get(admin_email) is entry:
+                        self._retire(self._clients.pop(admin_email))
+
+        # Connect outside the lock so one slow tenant doesn't block the others
+        fresh = _PooledClient(self._new_client(mongo_uri), uri_hash)
+        fresh.leases = 1
+        with self._lock:
+            current = self._clients.get(admin_email)
+            if current is not None and current.uri_hash == uri_hash and not current.retired:
+                # Another thread connected first; use its client
+                fresh.client.close()
+                current.leases += 1
+                self._clients.move_to_end(admin_email)
+                return current
+            if current is not None:
+                self._retire(self._clients.pop(admin_email))
+            self._clients[admin_email] = fresh
+            self._evict_locked()
+        return fresh
+
+    def _release(self, entry: _PooledClient):
+        with self._lock:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            if entry.retired and entry.leases == 0:
+                entry.client.close()
+
+    @contextmanager
+    def client(self, admin_email: str, mongo_uri: str) -> Iterator[MongoClient]:
+        """Lease the tenant's client; raises if the server can't be reached."""
+        entry = self._acquire(admin_email, mongo_uri)
+        try:
+            yield entry.client
+        finally:
+            self._release(entry)
+
+    def evict(self, admin_email: str):
+        """Drop a tenant's client, e.g. after its connection settings change."""
+        with self._lock:
+            entry = self._clients.pop(admin_email, None)
+            if entry is not None:
+                self._retire(entry)
+
+    def close_all(self):
+        """Close every pooled client. Called on application shutdown."""
+        with self._lock:
+            while self._clients:
+                _, entry = self._clients.popitem()
+                self._retire(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "leased": sum(1 for e in self._clients.values() if e.leases),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+# Global pool shared by scans and enforcement
+mongo_pool = MongoClientPool()
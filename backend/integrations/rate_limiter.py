@@ -0,0 +1,110 @@
+import time
+import asyncio
+import weakref
+import threading
+from typing import Dict, Any, List
+from config import (GMAIL_CONCURRENCY_INITIAL, GMAIL_CONCURRENCY_MIN, GMAIL_CONCURRENCY_MAX,
+                    GMAIL_LATENCY_TARGET)
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency window for one tenant's Gmail requests on one event loop.
+
+    Each healthy response (below latency_target) grows the window by
+    1/window, i.e. by about one slot per window's worth of requests. A
+    throttled or failed response halves it, at most once per round trip:
+    requests that were already in flight when the window was cut don't cut
+    it again.
+    """
+
+    def __init__(self, initial: float = GMAIL_CONCURRENCY_INITIAL, minimum: float = GMAIL_CONCURRENCY_MIN,
+                 maximum: float = GMAIL_CONCURRENCY_MAX, latency_target: float = GMAIL_LATENCY_TARGET,
+                 decrease: float = 0.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.window = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self._waiters: List[asyncio.Future] = []
+        self._last_decrease = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+
+    async def acquire(self) -> float:
+        """Wait for a free slot; returns the start time to pass to release()."""
+        while self.in_flight >= int(self.window):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+        return time.monotonic()
+
+    def release(self, started: float, throttled: bool = None):
+        """Free a slot and record its outcome (None: cancelled, nothing learned)."""
+        self.in_flight -= 1
+        now = time.monotonic()
+        if throttled:
+            self.throttle(started)
+        elif throttled is not None:
+            self.requests += 1
+            if now - started <= self.latency_target:
+                self.window = min(self.maximum, self.window + 1.0 / self.window)
+        self._wake()
+
+    def throttle(self, started: float):
+        """Record a throttled request that started at started (e.g. a part of a batch response)."""
+        self.throttled += 1
+        if started >= self._last_decrease:
+            self.window = max(self.minimum, self.window * self.decrease)
+            self._last_decrease = time.monotonic()
+
+    def _wake(self):
+        # Waiters re-check the window themselves
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window": round(self.window, 2),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "retries": self.retries,
+        }
+
+class LimiterRegistry:
+    """One AdaptiveLimiter per (event loop, tenant); futures can't cross loops."""
+
+    def __init__(self):
+        self._limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AdaptiveLimiter]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, tenant: str) -> AdaptiveLimiter:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            limiters = self._limiters.setdefault(loop, {})
+            limiter = limiters.get(tenant)
+            if limiter is None:
+                limiter = limiters[tenant] = AdaptiveLimiter()
+            return limiter
+
+    def stats(self, tenant: str = None) -> List[Dict[str, Any]]:
+        """Current window and counters, per loop, optionally for one tenant."""
+        with self._lock:
+            return [
+                {"tenant": name, **limiter.stats()}
+                for limiters in list(self._limiters.values())
+                for name, limiter in limiters.items()
+                if tenant is None or name == tenant
+            ]
+
+# Global registry of Gmail limiters, keyed by admin_email
+gmail_limiters = LimiterRegistry()
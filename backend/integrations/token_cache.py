@@ -0,0 +1,71 @@
+import time
+import asyncio
+import weakref
+import threading
+from typing import Dict, Any, Tuple, Callable, Awaitable
+from config import GMAIL_TOKEN_REFRESH_MARGIN
+
+class AccessTokenCache:
+    """
+    Per-tenant OAuth access tokens, kept until shortly before they expire.
+
+    A token is served while more than refresh_margin seconds of its
+    expires_in remain; after that the next caller refreshes it. Concurrent
+    callers for the same tenant wait on one refresh instead of each hitting
+    the token endpoint. Locks are per event loop (FastAPI and the MCP server
+    run their own), the tokens themselves are shared.
+    """
+
+    def __init__(self, refresh_margin: float = GMAIL_TOKEN_REFRESH_MARGIN):
+        self.refresh_margin = refresh_margin
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]" = weakref.WeakKeyDictionary()
+        self._guard = threading.Lock()
+        self.hits = 0
+        self.refreshes = 0
+
+    def _lock(self, tenant: str) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self._guard:
+            locks = self._locks.setdefault(loop, {})
+            return locks.setdefault(tenant, asyncio.Lock())
+
+    def _fresh(self, tenant: str):
+        entry = self._tokens.get(tenant)
+        if entry and entry[1] - self.refresh_margin > time.monotonic():
+            return entry[0]
+        return None
+
+    def put(self, tenant: str, access_token: str, expires_in: float):
+        """Store a token obtained elsewhere (e.g. the OAuth callback)."""
+        self._tokens[tenant] = (access_token, time.monotonic() + float(expires_in or 0))
+
+    async def get(self, tenant: str, refresh: Callable[[], Awaitable[Tuple[str, float]]]) -> str:
+        """
+        Cached token for tenant, or the result of refresh() -> (access_token, expires_in)
+        if it is missing or about to expire.
+        """
+        token = self._fresh(tenant)
+        if token:
+            self.hits += 1
+            return token
+        async with self._lock(tenant):
+            # Another caller may have refreshed while we waited
+            token = self._fresh(tenant)
+            if token:
+                self.hits += 1
+                return token
+            access_token, expires_in = await refresh()
+            self.refreshes += 1
+            self.put(tenant, access_token, expires_in)
+            return access_token
+
+    def invalidate(self, tenant: str):
+        """Forget a tenant's token, e.g. after a 401 or a reconnect."""
+        self._tokens.pop(tenant, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"tenants": len(self._tokens), "hits": self.hits, "refreshes": self.refreshes}
+
+# Global cache of Gmail access tokens, keyed by admin_email
+gmail_tokens = AccessTokenCache()
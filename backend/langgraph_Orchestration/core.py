@@ -4,7 +4,8 @@ from transformation_and_enforcement.core import (
     extract_dsar_contexts,
     scan_mongo,
     send_dsar_access_email,
-    TargetedScanRequest
+    build_targeted_requests,
+    reveal_tokenized_values
 )
 from transformation_and_enforcement.policy_engine import resolve_dsar
 from transformation_and_enforcement.enforcement_engine import MongoEnforcer, is_enforcement_allowed
@@ -29,55 +30,39 @@ def dsar_branch_condition(state: DSARAccessState):
 def targeted_scan_node(state: DSARAccessState):
     all_findings = []
 
-    for context in state["dsar_contexts"]:
-        targeted_request = TargetedScanRequest(
-            dsar_id=context.dsar_id,
-            subject_identifier=context.subject_identifier,
-            dsar_type=context.dsar_type,
-            sources=["mongo"]
-        )
+    targeted_requests = build_targeted_requests(state["admin_email"], state["dsar_contexts"])
 
-        result = scan_mongo(state["admin_email"], targeted_request)
-        if result.get("success"):
-            mongo_findings = result.get("findings", [])
-            for f in mongo_findings:
-                f["dsar_type"] = context.dsar_type.value
-                f["dsar_id"] = context.dsar_id
-            all_findings.extend(mongo_findings)
+    # Single pass for all DSARs; findings come back tagged with dsar_id/dsar_type
+    result = scan_mongo(state["admin_email"], targeted_requests=targeted_requests) if targeted_requests else {}
+    if result.get("success"):
+        all_findings.extend(result.get("findings", []))
 
     state["targeted_findings"] = all_findings
     return state
 
 
 def resolve_dsar_node(state: DSARAccessState):
-    decisions = resolve_dsar(state.get("targeted_findings", []))
+    findings = state.get("targeted_findings", [])
+    reveal_tokenized_values(state["admin_email"], findings)
+    decisions = resolve_dsar(findings)
     state["dsar_decisions"] = decisions
     return state
 
 
 def apply_transformations_node(state: DSARAccessState):
     results = []
+    enforce_items, enforce_metadata = [], []
 
-    for decision in state.get("dsar_decisions", []):
+    decisions = state.get("dsar_decisions", [])
+    transformed = transformation_engine.transform_batch(decisions, tenant=state["admin_email"])
+    for decision, (transformed_value, confidence, metadata) in zip(decisions, transformed):
         value = decision.finding.get("value", "")
 
-        transformed_value, confidence, metadata = (
-            transformation_engine._apply_transformation(
-                value=value,
-                transformation_type=decision.transformation_type,
-                finding=decision.finding,
-                request=None
-            )
-        )
-
         if is_enforcement_allowed(
             dsar_type=DSARType(decision.finding.get("dsar_type"))
         ):
-            MongoEnforcer.apply(
-                admin_email=state["admin_email"],
-                decision=decision,
-                transformed_value=transformed_value
-            )
+            enforce_items.append((decision, transformed_value))
+            enforce_metadata.append(metadata)
 
         metadata.update({
             "decision_reason": decision.reason,
@@ -96,6 +81,12 @@ def apply_transformations_node(state: DSARAccessState):
             "metadata": metadata
         })
 
+    # One grouped bulk write per collection instead of a round trip per decision
+    if enforce_items:
+        outcomes = MongoEnforcer.apply_batch(admin_email=state["admin_email"], items=enforce_items)
+        for metadata, outcome in zip(enforce_metadata, outcomes):
+            metadata["enforcement"] = outcome
+
     state["results"] = results
     return state
 
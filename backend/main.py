@@ -3,12 +3,16 @@ import uvicorn
 from pathlib import Path
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from config import Secret_key, create_db_indexes
+from config import Secret_key, create_db_indexes, DSAR_WARM_UP
+from integrations.mongo_pool import mongo_pool
+from integrations.gmail_client import close_http_client
+from transformation_and_enforcement.dsar_classifier import warm_up_in_background
 from user_auth.routes import router_auth
 from integrations.routes import router_integrate
 from chat.routes import router_chat
 from auditing_and_reporting.routes import router_audits 
 from langgraph_Orchestration.routes import router_findings
+from transformation_and_enforcement.routes import router_scan
 from starlette.middleware.sessions import SessionMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -20,9 +24,15 @@ sys.path.insert(0, str(project_root))
 async def lifespan(app: FastAPI):
     # Runs once when the server starts — DB connection is live by this point
     create_db_indexes()
+    # Load the DSAR model in the background so startup isn't blocked on it
+    if DSAR_WARM_UP:
+        warm_up_in_background()
     yield
+    # Shutdown: close pooled tenant Mongo clients and the Google API client
+    mongo_pool.close_all()
+    await close_http_client()
 
-app = FastAPI(title="PRISMATIC API", version="1.0.0")
+app = FastAPI(title="PRISMATIC API", version="1.0.0", lifespan=lifespan)
 app.add_middleware(
     SessionMiddleware, 
     secret_key=Secret_key,
@@ -51,6 +61,7 @@ app.include_router(router_integrate, prefix="/integrate", tags=["Integrations"])
 app.include_router(router_chat, prefix="/chat", tags=["Chat"])
 app.include_router(router_audits, prefix="/audits", tags=["Audits"])
 app.include_router(router_findings, prefix="/findings", tags=["Findings"])
+app.include_router(router_scan, prefix="/scan", tags=["Scan"])
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -2,6 +2,8 @@ from mcp.server.fastmcp import FastMCP
 from typing import List, Dict, Any, Optional
 from temp_storage import get_all_findings
 from transformation_and_enforcement.core import scan_mongo, scan_gmail, mask_data
+from transformation_and_enforcement.dsar_classifier import warm_up_in_background
+from config import DSAR_WARM_UP
 from auditing_and_reporting.core import retrieve_audits
 from auditing_and_reporting.data_schema import AuditQuery
 
@@ -9,14 +11,16 @@ app = FastMCP("prismatic-mcp")
 
 # --- Core Scanning Tools ---
 @app.tool()
-def mongo_scan(admin_email: str, session_id: str) -> dict:
-    """Connect and Scan a MongoDB collection for PII/PHI."""
-    return scan_mongo(admin_email)
+def mongo_scan(admin_email: str, session_id: str, incremental: bool = False) -> dict:
+    """Connect and Scan a MongoDB collection for PII/PHI.
+    Set incremental=True to scan only documents added or changed since the last incremental scan."""
+    return scan_mongo(admin_email, incremental=incremental)
 
 @app.tool()
-async def gmail_scan(admin_email: str, session_id: str) -> dict:
-    """Scan Gmail for PII/PHI."""
-    return await scan_gmail(admin_email)
+async def gmail_scan(admin_email: str, session_id: str, full_sync: bool = False) -> dict:
+    """Scan Gmail for PII/PHI.
+    Only mail received since the last scan is read; set full_sync=True to rescan the whole mailbox."""
+    return await scan_gmail(admin_email, full_sync=full_sync)
 
 # --- Data Transformation Tools ---
 @app.tool()
@@ -46,4 +50,7 @@ async def get_audit_logs(
     return retrieve_audits(query)
 
 if __name__ == "__main__":
+    # Tools are served right away; the DSAR model loads alongside
+    if DSAR_WARM_UP:
+        warm_up_in_background()
     app.run()
@@ -0,0 +1,26 @@
+"""
+Per-tenant DSAR cascade counters behind GET /scan/gmail/classifier.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+import asyncio
+
+from transformation_and_enforcement.dsar_classifier import DSARCascade
+
+def test_stats_are_scoped_to_the_tenant():
+    # Neither email reaches the model, so no classifier is needed
+    cascade = DSARCascade(classifier=None, enabled=True)
+
+    async def scan():
+        await cascade.classify("Please delete my data", regex_hit=True, tenant="a@tenant.example")
+        await cascade.classify("Lunch on Friday?", tenant="b@tenant.example")
+        await cascade.classify("Lunch on Monday?", tenant="b@tenant.example")
+
+    asyncio.run(scan())
+    assert cascade.stats("a@tenant.example")["tiers"] == {"regex": 1, "prefilter": 0, "model": 0}
+    assert cascade.stats("b@tenant.example")["tiers"] == {"regex": 0, "prefilter": 2, "model": 0}
+    assert cascade.stats("c@tenant.example")["emails"] == 0
+    assert "inputs" not in cascade.stats("a@tenant.example")
+    assert cascade.stats()["emails"] == 3
@@ -0,0 +1,74 @@
+"""
+Gmail batch fetches against the local stub Gmail server (benchmarks.stub_gmail).
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+import asyncio
+
+import pytest
+
+from benchmarks import stub_gmail
+from integrations import gmail_client
+from integrations.gmail_client import batch_get_messages, close_http_client, fetch_messages, parse_batch_response
+
+@pytest.fixture
+def box(monkeypatch):
+    server, box, base = stub_gmail.start(messages=10)
+    monkeypatch.setattr(gmail_client, "GMAIL_API_BASE", base)
+    yield box
+    server.shutdown()
+
+def _run(coro):
+    async def run():
+        try:
+            return await coro
+        finally:
+            await close_http_client()
+    return asyncio.run(run())
+
+def test_parse_batch_response():
+    body = (
+        "--batch_x\n"
+        "Content-Type: application/http\n"
+        "Content-ID: <response-item-1>\n\n"
+        "HTTP/1.1 404 Not Found\nContent-Type: application/json\n\n"
+        '{"error": {"code": 404}}\n'
+        "--batch_x\r\n"
+        "Content-Type: application/http\r\n"
+        "Content-ID: <response-item-0>\r\n\r\n"
+        "HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n\r\n"
+        '{"id": "m1"}\r\n'
+        "--batch_x--\r\n"
+    )
+    parsed = parse_batch_response('multipart/mixed; boundary="batch_x"', body)
+    assert parsed == {0: (200, {"id": "m1"}), 1: (404, {"error": {"code": 404}})}
+    with pytest.raises(Exception):
+        parse_batch_response("application/json", body)
+
+def test_batch_keeps_per_part_status(box):
+    ids = box.ids[:3]
+    box.ids.remove(ids[1])
+    results = _run(batch_get_messages("stub", ids))
+    assert [results[mid][0] for mid in ids] == [200, 404, 200]
+    assert results[ids[0]][1]["id"] == ids[0]
+    assert box.requests == 1
+
+def test_deleted_parts_are_skipped_without_refetch(box):
+    ids = box.ids[:3]
+    box.ids.remove(ids[1])
+    emails = _run(fetch_messages("stub", ids))
+    assert [e["message_id"] for e in emails] == [ids[0], ids[2]]
+    assert box.requests == 1
+
+def test_throttled_and_failed_parts_are_refetched(box):
+    ids = box.ids[:4]
+    box.part_failures = {ids[1]: 429, ids[2]: 503, ids[3]: 500}
+    # Deleted between the batch call and its refetch
+    box.ids.remove(ids[3])
+    emails = _run(fetch_messages("stub", ids))
+    assert [e["message_id"] for e in emails] == ids[:3]
+    assert all(e["body"] for e in emails)
+    # One batch call, then one GET per failed part
+    assert box.requests == 4
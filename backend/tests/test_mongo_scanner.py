@@ -0,0 +1,31 @@
+"""
+Document-level matching in mongo_scanner.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+import subprocess
+import sys
+
+from transformation_and_enforcement.mongo_scanner import TEXT_PRIOR, profile_fields, pruned_projection, scan_documents
+
+def test_import_stays_light():
+    # Process-pool workers import mongo_scanner; it must not drag in config
+    # (which opens a MongoClient) or pymongo
+    code = ("import sys, transformation_and_enforcement.mongo_scanner; "
+            "print(sorted(m for m in ('config', 'pymongo') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+def test_sparse_field_is_not_pruned():
+    # "notes" is empty or missing in every sampled document, "active" is a flag
+    sample = [{"_id": i, "active": True, "notes": "" if i % 2 else None} for i in range(20)]
+    profile = {p["field"]: p for p in profile_fields(sample)}
+    assert profile["notes"]["likelihood"] == TEXT_PRIOR and profile["notes"]["sampled"] == 0
+    assert pruned_projection(list(profile.values()), 0.05) == {"active": 0}
+
+    # Filled in later in the collection, it is still scanned
+    later = {"_id": 99, "active": True, "notes": "reach me at jane@example.com"}
+    findings = scan_documents("shop.customers", [later])
+    assert [f["field_path"] for f in findings.values()] == ["notes"]
@@ -0,0 +1,53 @@
+"""
+Pushdown plans for targeted (DSAR) Mongo scans.
+
+Mongo can only answer a query from indexes when every $or branch is an
+equality or a case-sensitive, anchored regex on an indexed field, and never
+when a branch is an $expr. These tests pin that shape down.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+from transformation_and_enforcement.mongo_scanner import TargetedScanRequest
+from transformation_and_enforcement.patterns import DSARType
+from transformation_and_enforcement.query_planner import plan_targeted_queries
+
+FIELDS = ["email", "phone", "notes", "address.city"]
+INDEXED = {"email", "phone", "_id"}
+
+def _requests(*subjects):
+    return [TargetedScanRequest(f"dsar-{i}", subject, DSARType.ACCESS, ["mongo"]) for i, subject in enumerate(subjects)]
+
+def _index_servable(branch):
+    [(field, cond)] = branch.items()
+    if field not in INDEXED:
+        return False
+    if not isinstance(cond, dict):
+        return True
+    return set(cond) == {"$regex"} and cond["$regex"].startswith("^")
+
+def test_indexed_query_is_index_servable_and_residual_is_separate():
+    indexed_query, residual_query = plan_targeted_queries(
+        _requests("jane@example.com", "9876543210"), FIELDS, INDEXED)
+
+    assert all(_index_servable(branch) for branch in indexed_query["$or"])
+    assert {"email": {"$regex": "^jane@example\\.com"}} in indexed_query["$or"]
+    assert {"email": {"$regex": "^JANE@EXAMPLE\\.COM"}} in indexed_query["$or"]
+    assert {"phone": 9876543210} in indexed_query["$or"]
+
+    residual_fields = {key for branch in residual_query["$or"] for key in branch}
+    assert residual_fields == {"notes", "address.city", "$expr"}
+    assert {"notes": {"$regex": "jane@example\\.com", "$options": "i"}} in residual_query["$or"]
+
+def test_indexed_only_drops_the_residual_query():
+    [indexed_query] = plan_targeted_queries(_requests("jane@example.com"), FIELDS, INDEXED, indexed_only=True)
+    assert all(_index_servable(branch) for branch in indexed_query["$or"])
+    assert plan_targeted_queries(_requests("jane@example.com"), ["notes"], INDEXED, indexed_only=True) is None
+
+def test_without_indexes_only_the_residual_query_runs():
+    [residual_query] = plan_targeted_queries(_requests("jane@example.com"), FIELDS)
+    assert any("$expr" in branch for branch in residual_query["$or"])
+
+def test_dates_fall_back_to_a_scan():
+    assert plan_targeted_queries(_requests("1990-01-31"), FIELDS, INDEXED) is None
@@ -0,0 +1,23 @@
+"""
+The process pool behind SCAN_USE_PROCESSES.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+from transformation_and_enforcement import core
+from transformation_and_enforcement.mongo_scanner import scan_documents
+
+NAMESPACE = "shop.customers"
+DOCS = [{"_id": 1, "email": "jane@example.com", "note": "call 9876543210"}, {"_id": 2, "flag": True}]
+
+def _untimed(seen):
+    return {key: {k: v for k, v in finding.items() if k != "timestamp"} for key, finding in seen.items()}
+
+def test_pool_workers_match_in_process_and_stay_light():
+    pool = core._get_process_pool()
+    pooled = pool.submit(scan_documents, NAMESPACE, DOCS, None, None).result()
+    assert pooled and _untimed(pooled) == _untimed(scan_documents(NAMESPACE, DOCS))
+    # Workers don't inherit this process's modules (config, its MongoClient)
+    loaded = pool.submit(eval, "sorted(m for m in ('config', 'pymongo') if m in __import__('sys').modules)")
+    assert loaded.result() == []
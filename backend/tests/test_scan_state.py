@@ -0,0 +1,99 @@
+"""
+Incremental Mongo scans: fetch_changed_documents and its watermark.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+import logging
+
+from transformation_and_enforcement import scan_state
+from transformation_and_enforcement.scan_state import fetch_changed_documents, has_modified_index
+
+OPERATORS = {
+    "$gt": lambda value, arg: value is not None and value > arg,
+    "$lte": lambda value, arg: value is not None and value <= arg,
+    "$ne": lambda value, arg: value != arg,
+}
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        if key == "$or":
+            matched = any(_matches(doc, branch) for branch in cond)
+        elif not isinstance(cond, dict):
+            matched = doc.get(key) == cond
+        else:
+            matched = all((key in doc) == arg if op == "$exists" else OPERATORS[op](doc.get(key), arg)
+                          for op, arg in cond.items())
+        if not matched:
+            return False
+    return True
+
+class Cursor:
+    def __init__(self, docs, limit):
+        self.docs, self.limit = docs, limit
+
+    def sort(self, key, direction=1):
+        keys = [(key, direction)] if isinstance(key, str) else key
+        for field, direction in reversed(keys):
+            self.docs.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def __iter__(self):
+        return iter(self.docs[:self.limit or None])
+
+class Collection:
+    """The slice of a pymongo collection fetch_changed_documents reads through."""
+    full_name = "shop.customers"
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.indexes = {"_id_": {"key": [("_id", 1)]}}
+
+    def find(self, query, projection=None, limit=0):
+        return Cursor([dict(doc) for doc in self.docs if _matches(doc, query)], limit)
+
+    def index_information(self):
+        return self.indexes
+
+def _scan(coll, watermark, limit=100):
+    docs, watermark = fetch_changed_documents(coll, watermark, limit, modified_field="updatedAt")
+    return [doc["_id"] for doc in docs], watermark
+
+def test_inserted_documents_are_not_rescanned_as_modified():
+    coll = Collection([{"_id": 1, "updatedAt": 1}, {"_id": 2, "updatedAt": 2}])
+    ids, watermark = _scan(coll, None)
+    assert ids == [1, 2]
+
+    coll.docs.append({"_id": 3, "updatedAt": 5})
+    ids, watermark = _scan(coll, watermark)
+    assert ids == [3] and (watermark["last_modified"], watermark["last_modified_id"]) == (5, 3)
+
+    assert _scan(coll, watermark)[0] == []
+    coll.docs[0]["updatedAt"] = 6
+    assert _scan(coll, watermark)[0] == [1]
+
+def test_watermark_stays_behind_a_modified_backlog():
+    coll = Collection([{"_id": 1, "updatedAt": 1}, {"_id": 2, "updatedAt": 2}])
+    _, watermark = _scan(coll, None)
+    coll.docs[0]["updatedAt"], coll.docs[1]["updatedAt"] = 10, 11
+    coll.docs.append({"_id": 3, "updatedAt": 12})
+
+    seen = []
+    for _ in range(4):
+        ids, watermark = _scan(coll, watermark, limit=1)
+        seen += ids
+    # Document 2 is still picked up although a newer document was inserted first
+    assert set(seen) == {1, 2, 3}
+
+def test_missing_index_is_warned_once(caplog, monkeypatch):
+    monkeypatch.setattr(scan_state, "_unindexed_warned", set())
+    coll = Collection([{"_id": 1, "updatedAt": 1}])
+    _, watermark = _scan(coll, None)
+    with caplog.at_level(logging.WARNING, logger=scan_state.__name__):
+        _scan(coll, watermark)
+        _scan(coll, watermark)
+    assert len([r for r in caplog.records if "no index on (updatedAt, _id)" in r.getMessage()]) == 1
+
+    coll.indexes["updatedAt_1__id_1"] = {"key": [("updatedAt", 1), ("_id", 1)]}
+    assert has_modified_index(coll, "updatedAt")
@@ -0,0 +1,110 @@
+"""
+Tokenize -> enforce -> DSAR access -> reveal, end to end.
+
+A restrict-processing request for a card number is resolved by the DSAR
+policy (PCI-DSS tokenizes financial data) and the token is written back to
+the document by MongoEnforcer.apply_batch. A later access request for the
+card number must find the tokenized record through the subject's token and
+hand the requester the original value.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from config import cipher
+from transformation_and_enforcement import enforcement_engine
+from transformation_and_enforcement.core import build_targeted_requests, reveal_tokenized_values
+from transformation_and_enforcement.enforcement_engine import MongoEnforcer, is_enforcement_allowed
+from transformation_and_enforcement.mongo_scanner import scan_documents
+from transformation_and_enforcement.patterns import COMPLIANCE_MAP
+from transformation_and_enforcement.policy_engine import DSARContext, resolve_dsar
+from transformation_and_enforcement.token_vault import TokenVault
+from transformation_and_enforcement.transformations import (
+    transformation_engine, DSARType, TransformationType
+)
+
+TENANT = "admin@tenant.example"
+NAMESPACE = "shop.customers"
+CARD = "4111 1111 1111 1111"
+SUBJECT = "4111111111111111"
+
+class Collection:
+    """The slice of a pymongo collection apply_batch writes through; records each bulk_write."""
+    def __init__(self, docs):
+        self.docs = docs
+        self.writes = []
+
+    def bulk_write(self, requests, ordered=True):
+        self.writes.append(list(requests))
+
+class Integrations:
+    @staticmethod
+    def find_one(query):
+        return {"MongoConnection": True, "encrypted_mongo_uri": cipher.encrypt(b"mongodb://tenant").decode()}
+
+@pytest.fixture
+def collection(monkeypatch, tmp_path):
+    monkeypatch.setattr(transformation_engine, "_tokens", TokenVault(path=str(tmp_path / "tokens.db"), secret="test"))
+    coll = Collection([{"_id": ObjectId(), "name": "Jane", "billing": {"card": CARD}}])
+
+    @contextmanager
+    def client(admin_email, mongo_uri):
+        yield {"shop": {"customers": coll}}
+
+    monkeypatch.setattr(enforcement_engine, "Integrations", Integrations)
+    monkeypatch.setattr(enforcement_engine.mongo_pool, "client", client)
+    return coll
+
+def _context(dsar_type):
+    return DSARContext(subject_identifier=SUBJECT, requester_email="jane@example.com",
+                       dsar_type=dsar_type, source="gmail", mapped_laws=["GDPR"])
+
+def _scan(collection, tenant, context):
+    requests = build_targeted_requests(tenant, [context])
+    return list(scan_documents(NAMESPACE, collection.docs, targeted_requests=requests).values())
+
+def _tokenize(collection):
+    """Restrict processing of the card, the way mask_data enforces a DSAR; returns the token."""
+    [doc] = collection.docs
+    context = _context(DSARType.RESTRICT_PROCESSING)
+    [finding] = _scan(collection, TENANT, context)
+    assert finding["type"] == "credit_card" and "PCI-DSS" in finding["mapped_laws"]
+
+    [decision] = resolve_dsar([finding])
+    assert decision.transformation_type == TransformationType.TOKENIZATION
+    assert "pci_dss" in decision.derived_from
+    assert is_enforcement_allowed(context.dsar_type)
+
+    [(token, _, _)] = transformation_engine.transform_batch([decision], tenant=TENANT)
+    [outcome] = MongoEnforcer.apply_batch(admin_email=TENANT, items=[(decision, token)])
+    assert outcome["success"] and outcome["action"] == "set"
+    assert collection.writes == [[UpdateOne({"_id": doc["_id"]}, {"$set": {"billing.card": token}})]]
+    assert TokenVault.is_token(token)
+
+    # The write lands
+    doc["billing"]["card"] = token
+    return token
+
+def test_tokenized_record_is_revealed_to_access_request(collection):
+    token = _tokenize(collection)
+
+    # Access request for the (normalized) card number finds the token...
+    context = _context(DSARType.ACCESS)
+    findings = _scan(collection, TENANT, context)
+    assert [(f["field_path"], f["value"], f["dsar_id"]) for f in findings] == [("billing.card", token, context.dsar_id)]
+
+    # ...and the requester gets the original value, typed as what it was
+    assert reveal_tokenized_values(TENANT, findings) == 1
+    [revealed] = findings
+    assert revealed["value"] == CARD and revealed["token_id"] == token
+    assert revealed["type"] == "credit_card" and revealed["mapped_laws"] == COMPLIANCE_MAP["credit_card"]
+
+def test_other_tenants_token_is_not_matched(collection):
+    _tokenize(collection)
+    assert not _scan(collection, "other@tenant.example", _context(DSARType.ACCESS))
@@ -0,0 +1,41 @@
+"""
+When transform_batch splits an encryption/hashing group across the thread pool.
+
+Run from the backend directory:
+    python -m pytest -q tests
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from transformation_and_enforcement.policy_engine import TransformationDecision
+from transformation_and_enforcement.transformations import DataTransformationEngine, TransformationType
+
+class CountingPool(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+def _hash(values):
+    engine = DataTransformationEngine(memo_max_entries=0, workers=2, parallel_min_bytes=64 * 1024,
+                                      parallel_min_value_bytes=2048)
+    pool = engine._executor = CountingPool()
+    decisions = [TransformationDecision({"type": "document", "value": v}, TransformationType.HASHING, "", [])
+                 for v in values]
+    results = engine.transform_batch(decisions)
+    serial = DataTransformationEngine(memo_max_entries=0, workers=1).transform_batch(decisions)
+    assert [r[0] for r in results] == [r[0] for r in serial]
+    return pool.submitted
+
+def test_many_short_values_stay_serial():
+    # 10,000 card numbers: plenty of values, but nothing large enough to release the GIL
+    assert _hash([f"4111 1111 {i:04d} 1111" for i in range(10_000)]) == 0
+
+def test_few_large_values_below_the_total_stay_serial():
+    assert _hash(["x" * 4096, "y" * 4096, "z" * 4096, "w" * 4096]) == 0
+
+def test_large_groups_of_large_values_are_split():
+    assert _hash([f"{i:08d}" + "x" * 4096 for i in range(32)]) == 2
@@ -1,145 +1,91 @@
 import re, json, base64, asyncio, httpx
 import logging
 import smtplib
-from typing import List, Dict, Any
+import threading
+import multiprocessing
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, AsyncIterator
 from config import Integrations, cipher, GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, SMTP_GMAIL_APP_PASSWORD, SENDER_EMAIL
-from integrations.core import MongoConnection
+from config import SCAN_MAX_WORKERS, SCAN_USE_PROCESSES, SCAN_PROCESS_WORKERS, SCAN_INCREMENTAL_LIMIT
+from config import (SCAN_FIELD_PRUNING, SCAN_PROFILE_SAMPLE, SCAN_PROFILE_TTL_HOURS,
+                    SCAN_FIELD_MIN_LIKELIHOOD, SCAN_BLOB_CHARS)
+from config import SCAN_PUSHDOWN, SCAN_PUSHDOWN_INDEXED_ONLY, SCAN_PUSHDOWN_LIMIT
+from config import GOOGLE_TOKEN_URL, GMAIL_BATCH_SIZE, GMAIL_FETCH_AHEAD
+from config import RESULT_CACHE, RESULT_CACHE_MAX_ENTRIES
+from integrations.mongo_pool import mongo_pool
+from integrations.gmail_client import get_http_client, gmail_get, fetch_message, fetch_messages
+from integrations.gmail_sync import GmailSync
+from integrations.token_cache import gmail_tokens
+from integrations.rate_limiter import AdaptiveLimiter, gmail_limiters
 from datetime import datetime
 from pymongo import MongoClient
-from dateutil import parser
 from email.utils import parseaddr
 from datetime import datetime
 from dotenv import load_dotenv
 from auditing_and_reporting.core import extract_and_store
-from transformation_and_enforcement.patterns import COMPLIANCE_MAP, DSAR_PATTERNS, HEALTH_KEYWORDS, PII_PATTERNS, DSAR_LABELS
+from transformation_and_enforcement.patterns import COMPLIANCE_MAP, DSAR_PATTERNS
+from transformation_and_enforcement.detectors import pii_detector
+from transformation_and_enforcement.dsar_classifier import BatchClassifier, DSARCascade, zero_shot_cache
+from transformation_and_enforcement.result_cache import ResultCache, patterns_version, exact
+from transformation_and_enforcement.mongo_scanner import (
+    TargetedScanRequest, normalize_value, scan_documents, score_findings,
+    profile_fields, pruned_projection
+)
+from transformation_and_enforcement.scan_state import (
+    get_watermark, save_watermark, fetch_changed_documents, get_schema_profile, save_schema_profile,
+    get_gmail_history_id, save_gmail_history_id
+)
+from transformation_and_enforcement.query_planner import plan_targeted_queries, candidate_fields, indexed_fields
 from transformation_and_enforcement.policy_engine import resolve, DSARContext, resolve_dsar
 from transformation_and_enforcement.transformations import transformation_engine, DSARType
 from transformation_and_enforcement.enforcement_engine import MongoEnforcer, is_enforcement_allowed
-from transformers import pipeline
 from email.message import EmailMessage
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 load_dotenv()
 
-dsar_classifier = pipeline(
-            "zero-shot-classification", 
-            model="typeform/distilbert-base-uncased-mnli")
-
-def normalize_value(val: str, p_type: str) -> str:
-    """Normalize values for deduplication of PII/PHI."""
-    val = val.strip()
-
-    if p_type == "aadhaar":
-        # Aadhaar = 12 digits
-        return re.sub(r"\D", "", val)
-    
-    if p_type == "pan":
-        # PAN = uppercase for consistency
-        return val.upper()
-    
-    if p_type == "phone":
-        # Keep only digits, last 10
-        return re.sub(r"\D", "", val)[-10:]
-    
-    if p_type == "email":
-        # Lowercase email for uniformity
-        return val.lower()
-    
-    if p_type == "credit_card":
-        # Remove all non-digits, mask spaces/hyphens
-        return re.sub(r"\D", "", val)
-    
-    if p_type == "ssn":
-        # US SSN -> digits only
-        return re.sub(r"\D", "", val)
-    
-    if p_type == "ip_address":
-        # Standardize IP to lowercase (IPv6 can have hex chars)
-        return val.lower()
-    
-    if p_type == "dob":
-        # Normalize date format -> YYYY-MM-DD
-        try:
-            return parser.parse(val, dayfirst=True).strftime("%Y-%m-%d")
-        except Exception:
-            return val  # return raw if parsing fails
-    
-    if p_type == "passport":
-        # Uppercase passport numbers
-        return val.upper()
-    
-    if p_type == "health":
-        # For health conditions -> lowercase and strip spaces
-        return val.lower()
-    
-    return val
-
-def map_to_laws(pii_type: str) -> List[str]:
-    return COMPLIANCE_MAP.get(pii_type, [])
-
-def flatten_doc(doc: dict, parent: str = "") -> Dict[str, Any]:
-    """
-    Flatten nested dict into dotted keys.
-    Always stringifies values for scanning.
-    """
-    out = {}
-    for k, v in doc.items():
-        path = f"{parent}.{k}" if parent else k
-        if isinstance(v, dict):
-            out.update(flatten_doc(v, path))
-        elif isinstance(v, list):
-            out[path] = json.dumps(v, default=str)
-        else:
-            out[path] = str(v) if v is not None else ""
-    return out
-
-# Targetted Scanning Logic
-class TargetedScanRequest:
-    def __init__(
-        self,
-        dsar_id: str,
-        subject_identifier: str,
-        dsar_type: DSARType,
-        sources: List[str]
-    ):
-        self.dsar_id = dsar_id
-        self.subject_identifier = subject_identifier
-        self.dsar_type = dsar_type
-        self.sources = sources
-    def __repr__(self):
-        return (
-        f"TargetedScanRequest("
-        f"dsar_id={self.dsar_id}, "
-        f"subject_identifier={self.subject_identifier}, "
-        f"dsar_type={self.dsar_type.value}, "
-        f"sources={self.sources}"
-        f")"
-        )
+# Emails scanned concurrently share zero-shot forward passes; the cascade
+# keeps emails that regex or vocabulary already settle away from the model.
+# The model itself is loaded on first use (see dsar_classifier.warm_up).
+dsar_batcher = BatchClassifier(cache=zero_shot_cache())
+dsar_cascade = DSARCascade(dsar_batcher)
 
 # Mongo Scanning Logic
-def scan_mongo(admin_email: str, targeted_request: TargetedScanRequest = None):
-    """
-    Scan MongoDB collection for sensitive data (PII/PHI).
-    Returns findings as dict.
-    """
+def _resolve_mongo_uri(admin_email: str):
+    """Return (mongo_uri, None) or (None, error dict) for the admin's Mongo integration."""
     integration = Integrations.find_one({"admin_email": admin_email})
     
     if not integration or not integration.get("MongoConnection", False):
-        return {
+        return None, {
             "success": False,
             "message": "No MongoDB connection found. Please connect via Integrations tab."
         }
     
     encrypted_uri = integration.get("encrypted_mongo_uri")
     if not encrypted_uri:
-        return {"success": False, "message": "Mongo URI not found in database. Please connect via Integrations tab."}
+        return None, {"success": False, "message": "Mongo URI not found in database. Please connect via Integrations tab."}
     try:
-        mongo_uri = cipher.decrypt(encrypted_uri.encode()).decode()
+        return cipher.decrypt(encrypted_uri.encode()).decode(), None
     except Exception as e:
-        return {"success": False, "message": f"Failed to decrypt Mongo URI: {str(e)}"}
+        return None, {"success": False, "message": f"Failed to decrypt Mongo URI: {str(e)}"}
 
-    findings = run_mongo_scan(mongo_uri, admin_email, targeted_request=targeted_request)
+def scan_mongo(admin_email: str, targeted_request: TargetedScanRequest = None, incremental: bool = False,
+               targeted_requests: List[TargetedScanRequest] = None):
+    """
+    Scan MongoDB collection for sensitive data (PII/PHI).
+    incremental=True scans only documents changed since the last incremental scan.
+    targeted_requests runs any number of DSAR lookups in a single pass.
+    Returns findings as dict.
+    """
+    mongo_uri, error = _resolve_mongo_uri(admin_email)
+    if error:
+        return error
+
+    findings = run_mongo_scan(mongo_uri, admin_email, targeted_request=targeted_request,
+                              incremental=incremental, targeted_requests=targeted_requests)
 
     return {
         "success": True,
@@ -147,169 +93,196 @@ def scan_mongo(admin_email: str, targeted_request: TargetedScanRequest = None):
         "findings": findings
     }
 
+def scan_mongo_stream(admin_email: str, targeted_request: TargetedScanRequest = None,
+                      incremental: bool = False) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Streaming variant of scan_mongo: yields each collection's findings as it finishes.
+    Raises if the Mongo integration is missing or unusable.
+    """
+    mongo_uri, error = _resolve_mongo_uri(admin_email)
+    if error:
+        raise Exception(error["message"])
+
+    yield from iter_mongo_scan(mongo_uri, admin_email, targeted_request=targeted_request,
+                               incremental=incremental)
+
 def run_mongo_scan(mongo_uri: str, admin_email: str, db_name: str = None,
                     collections: List[str] = None,
-                    sample_size: int = 50,  targeted_request: TargetedScanRequest = None) -> List[Dict[str, Any]]:
+                    sample_size: int = 50,  targeted_request: TargetedScanRequest = None,
+                    max_workers: int = SCAN_MAX_WORKERS,
+                    use_processes: bool = SCAN_USE_PROCESSES,
+                    incremental: bool = False,
+                    prune_fields: bool = SCAN_FIELD_PRUNING,
+                    targeted_requests: List[TargetedScanRequest] = None) -> List[Dict[str, Any]]:
     """
     Connect to MongoDB and scan collections for PII/PHI.
     Args:
         mongo_uri: decrypted mongo connection string
+        max_workers: collections read concurrently (1 = sequential)
+        use_processes: run the regex matching in the shared process pool
+        incremental: scan only documents inserted/modified since the stored
+            per-collection watermark (up to SCAN_INCREMENTAL_LIMIT each), then advance it
+        prune_fields: skip fields the cached schema profile marks as PII-free (untargeted scans only)
+        targeted_requests: several DSAR lookups answered by one pass over the data
     Returns:
         findings dict
     """
-    
     findings = []
-    seen = {}
+    for batch in iter_mongo_scan(mongo_uri, admin_email, db_name=db_name, collections=collections,
+                                 sample_size=sample_size, targeted_request=targeted_request,
+                                 max_workers=max_workers, use_processes=use_processes,
+                                 incremental=incremental, prune_fields=prune_fields,
+                                 targeted_requests=targeted_requests):
+        findings.extend(batch)
+    return findings
+
+def iter_mongo_scan(mongo_uri: str, admin_email: str, db_name: str = None,
+                    collections: List[str] = None,
+                    sample_size: int = 50,  targeted_request: TargetedScanRequest = None,
+                    max_workers: int = SCAN_MAX_WORKERS,
+                    use_processes: bool = SCAN_USE_PROCESSES,
+                    incremental: bool = False,
+                    prune_fields: bool = SCAN_FIELD_PRUNING,
+                    targeted_requests: List[TargetedScanRequest] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Scan collections for PII/PHI, yielding one batch of findings per collection.
+    Batches come out in namespace order; at most max_workers collections are
+    in flight, so memory stays bounded however many collections there are.
+    With prune_fields, fields the collection's schema profile rules out are
+    projected away server-side before documents are read; targeted scans are
+    never pruned. They are pushed down as a filter on the profile's
+    candidate fields when possible.
+    """
+    # Leased from the tenant's pooled client; released (not closed) when the scan ends
+    lease = ExitStack()
+    try:
+        client: MongoClient = lease.enter_context(mongo_pool.client(admin_email, mongo_uri))
+    except Exception as e:
+        Integrations.update_one({"admin_email": admin_email}, {"$set": {"MongoConnection": False}})
+        raise Exception(f"Failed to connect to MongoDB: MongoDB connection failed: {str(e)}")
+
+    requests = ([targeted_request] if targeted_request else []) + list(targeted_requests or [])
+    # Targeted (DSAR) scans must see every document and every field, never just
+    # the delta or the fields a sample suggested
+    incremental = incremental and not requests
+    prune_fields = prune_fields and not requests
+
+    def scan_collection(namespace):
+        dbn, coll = namespace
+        ns = f"{dbn}.{coll}"
+        watermark = None
+        profile = _schema_profile(admin_email, client[dbn][coll], ns) if (prune_fields or requests) else None
+        projection = pruned_projection(profile, SCAN_FIELD_MIN_LIKELIHOOD) if prune_fields else None
+        pushdown = _pushdown_filters(client[dbn][coll], requests, profile) if requests else None
+        if pushdown is not None:
+            # Only documents that can hold a subject leave the server
+            cursor = _find_any(client[dbn][coll], pushdown, projection, SCAN_PUSHDOWN_LIMIT)
+        elif incremental:
+            cursor, watermark = fetch_changed_documents(
+                client[dbn][coll], get_watermark(admin_email, ns), SCAN_INCREMENTAL_LIMIT,
+                projection=projection
+            )
+        else:
+            cursor = client[dbn][coll].find({}, projection, limit=sample_size)
+        if use_processes:
+            # Cursor is drained on this thread; matching runs in a worker process
+            seen = _get_process_pool().submit(
+                scan_documents, ns, list(cursor), targeted_request, targeted_requests
+            ).result()
+        else:
+            seen = scan_documents(ns, cursor, targeted_request, targeted_requests)
+        if watermark is not None:
+            # Only advanced once the collection's documents were actually scanned
+            save_watermark(admin_email, ns, watermark)
+        # Dedupe keys are collection-scoped, so each batch can be scored on its own
+        score_findings(seen)
+        return list(seen.values())
 
-    connection_result = MongoConnection(mongo_uri, admin_email)
-    if not connection_result.get("success"):
-        raise Exception(f"Failed to connect to MongoDB: {connection_result.get('message')}")
-
-    client: MongoClient = connection_result.get("client") 
-
-    # Get DB list
-    if db_name:
-        db_names = [db_name]
-    else:
-        db_names = [d for d in client.list_database_names()
-                    if d not in ("admin", "local", "config")]
-
-    for dbn in db_names:
-        db = client[dbn]
-        coll_names = collections or db.list_collection_names()
-
-        for coll in coll_names:
-            cursor = db[coll].find({}, limit=sample_size)
-
-            for doc in cursor:
-                doc_id = str(doc.get("_id", ""))
-                flat = flatten_doc(doc)
-
-                for field_path, val_str in flat.items():
-                    if not val_str.strip():
-                        continue
-
-                    lname = field_path.lower()
-                    matched = False
-                    # --- Regex detection ---
-                    for p_type, pattern in PII_PATTERNS.items():
-                        m = pattern.search(val_str)
-                        if m:
-                            norm_val = normalize_value(m.group(0), p_type)
-                            if targeted_request:
-                                if norm_val != targeted_request.subject_identifier:
-                                    continue
-                            key = (f"{dbn}.{coll}", doc_id, field_path, norm_val, p_type)
-                            if key not in seen:
-                                finding = {
-                                "collection": f"{dbn}.{coll}",
-                                "document_id": doc_id,
-                                "field_path": field_path,
-                                "value": m.group(0),
-                                "raw_value_snippet": val_str[:200],
-                                "type": p_type,
-                                "confidence": 0.95,
-                                "mapped_laws": map_to_laws(p_type),
-                                "detectors": ["regex"],
-                                "timestamp": datetime.utcnow(),
-                                }
-                                if targeted_request:
-                                    finding["dsar_id"] = targeted_request.dsar_id
-                                    finding["dsar_type"] = targeted_request.dsar_type.value
-                                    finding["scan_type"] = "TARGETED"
-                                seen[key] = finding
-                                matched = True
-                            else:
-                                seen[key]["detectors"].append("regex")
-
-                    # --- Health keywords ---
-                    if not matched and HEALTH_KEYWORDS.search(val_str):
-                        norm_val = normalize_value(val_str, "health")
-                        if targeted_request:
-                            if norm_val != targeted_request.subject_identifier:
-                                continue
-                        key = (f"{dbn}.{coll}", doc_id, field_path, norm_val, "health")
-                        if key not in seen:
-                            finding = {
-                            "collection": f"{dbn}.{coll}",
-                            "document_id": doc_id,
-                            "field_path": field_path,
-                            "value": val_str[:200],
-                            "raw_value_snippet": val_str[:200],
-                            "type": "health",
-                            "confidence": 0.75,
-                            "mapped_laws": map_to_laws("health"),
-                            "detectors": ["keyword"],
-                            "timestamp": datetime.utcnow(),
-                        }
-                            if targeted_request:
-                                finding["dsar_id"] = targeted_request.dsar_id
-                                finding["dsar_type"] = targeted_request.dsar_type.value
-                                finding["scan_type"] = "TARGETED"
-                            seen[key] = finding
-                            matched = True
-                        else:
-                            seen[key]["detectors"].append("keyword")
-
-                    # --- Field name heuristic ---
-                    heuristics = {
-                        "aadhaar": ["aadhaar", "aadhar"],
-                        "pan": ["pan"],
-                        "email": ["email", "e_mail", "mail"],
-                        "phone": ["phone", "mobile", "contact"],
-                        "dob": ["dob", "birth", "birthday", "birthdate"],
-                        "passport": ["passport"],
-                        "health": ["medical", "health", "diagnosis", "patient"]
-                    }
-                    if targeted_request:
-                        for p_type, keywords in heuristics.items():
-                            if any(k in lname for k in keywords):
-                                norm_val = normalize_value(val_str, p_type)
-                                if targeted_request:
-                                    if norm_val != targeted_request.subject_identifier:
-                                        continue
-                                key = (f"{dbn}.{coll}", doc_id, field_path, norm_val, p_type)
-                                if key not in seen:
-                                    finding = {
-                                    "collection": f"{dbn}.{coll}",
-                                    "document_id": doc_id,
-                                    "field_path": field_path,
-                                    "value": val_str[:200],
-                                    "raw_value_snippet": val_str[:200],
-                                    "type": p_type,
-                                    "confidence": 0.6,
-                                    "mapped_laws": map_to_laws(p_type),
-                                    "detectors": ["field-name-heuristic"],
-                                    "timestamp": datetime.utcnow()
-                                }
-                                    if targeted_request:
-                                        finding["dsar_id"] = targeted_request.dsar_id
-                                        finding["dsar_type"] = targeted_request.dsar_type.value
-                                        finding["scan_type"] = "TARGETED"
-                                    seen[key] = finding
-                                    matched = True
-                                else:
-                                    seen[key]["detectors"].append("field-name-heuristic")
-                                break
-    client.close()
-
-    for finding in seen.values():
-        detectors = set(finding["detectors"])
-        if detectors == {"regex"}:
-            finding["confidence"] = 0.95
-        elif detectors == {"keyword"}:
-            finding["confidence"] = 0.75
-        elif detectors == {"field-name-heuristic"}:
-            finding["confidence"] = 0.60
-        elif detectors == {"regex", "field-name-heuristic"}:
-            finding["confidence"] = 0.97
-        elif detectors == {"regex", "keyword"}:
-            finding["confidence"] = 0.96
-        elif len(detectors) == 3:
-            finding["confidence"] = 0.99
+    try:
+        # Get DB list
+        if db_name:
+            db_names = [db_name]
+        else:
+            db_names = [d for d in client.list_database_names()
+                        if d not in ("admin", "local", "config")]
 
-    findings = list(seen.values())
-    return findings
+        namespaces = [
+            (dbn, coll)
+            for dbn in db_names
+            for coll in (collections or client[dbn].list_collection_names())
+        ]
+
+        if max_workers > 1 and len(namespaces) > 1:
+            workers = min(max_workers, len(namespaces))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for namespace in namespaces:
+                    pending.append(pool.submit(scan_collection, namespace))
+                    if len(pending) >= workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+        else:
+            for namespace in namespaces:
+                yield scan_collection(namespace)
+    finally:
+        lease.close()
+
+def _schema_profile(admin_email: str, collection, namespace: str):
+    """
+    The collection's cached schema profile, rebuilt from
+    SCAN_PROFILE_SAMPLE documents once it expires.
+    """
+    profile = get_schema_profile(admin_email, namespace, SCAN_PROFILE_TTL_HOURS)
+    if profile is None:
+        profile = profile_fields(collection.find({}, limit=SCAN_PROFILE_SAMPLE), SCAN_BLOB_CHARS)
+        save_schema_profile(admin_email, namespace, profile)
+    return profile
+
+def _pushdown_filters(collection, requests: List[TargetedScanRequest], profile):
+    """Server-side filters for a targeted scan, or None to fall back to reading documents."""
+    if not SCAN_PUSHDOWN:
+        return None
+    try:
+        indexed = indexed_fields(collection.index_information())
+    except Exception as e:
+        logger.warning(f"Could not read indexes of {collection.full_name}: {e}")
+        indexed = set()
+    # Targeted scans are never pruned, so every profiled field is searched
+    fields = candidate_fields(profile or [], 0.0)
+    return plan_targeted_queries(requests, fields, indexed, indexed_only=SCAN_PUSHDOWN_INDEXED_ONLY)
+
+def _find_any(collection, queries: List[Dict[str, Any]], projection, limit: int) -> Iterator[dict]:
+    """Documents matching any of the queries, each once; every query is its own find()."""
+    seen_ids = set()
+    for query in queries:
+        for doc in collection.find(query, projection, limit=limit):
+            # repr: _ids may be sub-documents, and 1 and "1" are different ids
+            key = repr(doc["_id"])
+            if key not in seen_ids:
+                seen_ids.add(key)
+                yield doc
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """
+    Shared process pool for CPU-bound matching, created on first use.
+    Workers are never forked from this process, which holds live MongoClients
+    and their monitor threads: they fork from a forkserver that has only
+    imported mongo_scanner, or are spawned where forkserver is unavailable.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload(["transformation_and_enforcement.mongo_scanner"])
+            else:
+                context = multiprocessing.get_context("spawn")
+            _process_pool = ProcessPoolExecutor(max_workers=SCAN_PROCESS_WORKERS, mp_context=context)
+        return _process_pool
 
 # Gmail Scanning Logic
 def get_refresh_token(admin_email: str) -> str:
@@ -326,63 +299,48 @@ def get_refresh_token(admin_email: str) -> str:
     refresh_token = cipher.decrypt(encrypted_refresh_token.encode()).decode()
     return refresh_token
 
-async def get_access_token(refresh_token: str) -> str:
-    """Exchange refresh token for access token using Google OAuth."""
-    token_url = "https://oauth2.googleapis.com/token"
+async def request_access_token(refresh_token: str):
+    """Exchange refresh token for an access token using Google OAuth; returns (token, expires_in)."""
     payload = {
         "client_id": GOOGLE_CLIENT_ID,
         "client_secret": GOOGLE_CLIENT_SECRET,
         "refresh_token": refresh_token,
         "grant_type": "refresh_token"
     }
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(token_url, data=payload, timeout=30.0)
-        resp.raise_for_status()
-        raw_bytes = await resp.aread()          
-        data = json.loads(raw_bytes.decode())
+    resp = await get_http_client().post(GOOGLE_TOKEN_URL, data=payload)
+    resp.raise_for_status()
+    data = resp.json()
     if "access_token" not in data:
         raise Exception(f"Failed to get access token: {data}")
-    return data["access_token"]
+    return data["access_token"], data.get("expires_in", 0)
+
+async def get_access_token(refresh_token: str) -> str:
+    """Exchange refresh token for access token using Google OAuth."""
+    access_token, _ = await request_access_token(refresh_token)
+    return access_token
+
+async def get_tenant_access_token(admin_email: str) -> str:
+    """
+    Cached access token for the admin's Gmail. The refresh token is only
+    decrypted and exchanged when the cached one is missing or about to expire.
+    """
+    async def refresh():
+        return await request_access_token(get_refresh_token(admin_email))
+    return await gmail_tokens.get(admin_email, refresh)
 
 async def list_emails(access_token: str, max_results: int = 5) -> List[Dict[str, Any]]:
     """Get list of emails from Gmail API."""
-    headers = {"Authorization": f"Bearer {access_token}"}
-    url = f"https://gmail.googleapis.com/gmail/v1/users/me/messages?maxResults={max_results}"
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.get(url, headers=headers)
-        resp.raise_for_status()
-        raw_bytes = await resp.aread()           
-        data = json.loads(raw_bytes.decode())
+    data = await gmail_get(access_token, "/gmail/v1/users/me/messages", {"maxResults": max_results})
     return data.get("messages", [])
 
-async def fetch_email(access_token: str, message_id: str) -> Dict[str, Any]:
+async def fetch_email(access_token: str, message_id: str, limiter: AdaptiveLimiter = None) -> Dict[str, Any]:
     """Fetch full email content for a single message."""
-    headers = {"Authorization": f"Bearer {access_token}"}
-    url = f"https://gmail.googleapis.com/gmail/v1/users/me/messages/{message_id}?format=full"
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.get(url, headers=headers)
-        resp.raise_for_status()
-        raw_bytes = await resp.aread() # read the response body asynchronously
-        data = json.loads(raw_bytes.decode())
-    
-    # Extract headers
-    headers_data = {h['name']: h.get('value', '') for h in data.get('payload', {}).get('headers', [])}
-    
-    # Extract body (plain text if available)
-    body = ""
-    for part in data.get('payload', {}).get('parts', []):
-        if part.get('mimeType') == "text/plain":
-            body_data = part.get('body', {}).get('data', "")
-            if body_data:
-                body += base64.urlsafe_b64decode(body_data.encode()).decode()
-    
-    return {
-        "message_id": message_id,
-        "thread_id": data.get("threadId"),
-        "from": headers_data.get("From", ""),
-        "subject": headers_data.get("Subject", ""),
-        "body": body
-    }
+    return await fetch_message(access_token, message_id, limiter)
+
+async def fetch_emails_batch(access_token: str, message_ids: List[str],
+                             limiter: AdaptiveLimiter = None) -> List[Dict[str, Any]]:
+    """Fetch emails through Gmail's batch endpoint, in message_ids order."""
+    return await fetch_messages(access_token, message_ids, limiter)
 
 def extract_email_from_from_field(from_field: str) -> str:
     """
@@ -395,27 +353,48 @@ def extract_email_from_from_field(from_field: str) -> str:
     name, email = parseaddr(from_field)
     return email.lower().strip()
 
-sem = asyncio.Semaphore(5)
+# Request concurrency is governed per tenant by an adaptive limiter (gmail_limiters)
+async def fetch_with_limit(access_token, eid, limiter: AdaptiveLimiter = None):
+    return await fetch_email(access_token, eid, limiter)
 
-async def fetch_with_limit(access_token, eid):
-    async with sem:
-        return await fetch_email(access_token, eid)
+async def fetch_batch_with_limit(access_token, email_ids, limiter: AdaptiveLimiter = None):
+    return await fetch_emails_batch(access_token, email_ids, limiter)
 
-async def fetch_all_emails(access_token: str, email_ids: List[str]) -> List[Dict[str, Any]]:
-    tasks = [fetch_with_limit(access_token, eid) for eid in email_ids]
+async def fetch_all_emails(access_token: str, email_ids: List[str],
+                           limiter: AdaptiveLimiter = None) -> List[Dict[str, Any]]:
+    tasks = [fetch_with_limit(access_token, eid, limiter) for eid in email_ids]
     return await asyncio.gather(*tasks)
 
-async def scan_email_content(email: Dict[str, Any], dsar_classifier=dsar_classifier) -> List[Dict[str, Any]]:
+# Regex findings of repeated email text (memory only: they hold raw values)
+detector_cache = ResultCache("pii_detector", patterns_version(pii_detector.patterns), RESULT_CACHE_MAX_ENTRIES,
+                             normalize=exact) if RESULT_CACHE else None
+
+def _detect_pii(content: str) -> Dict[str, List[str]]:
+    """pii_detector.findall(content), served from detector_cache when the text was seen before."""
+    if detector_cache is None:
+        return pii_detector.findall(content)
+    key = detector_cache.key(content)
+    hits = detector_cache.get(content, key)
+    if hits is None:
+        hits = pii_detector.findall(content)
+        detector_cache.put(content, hits, key)
+    # Callers consume the dict; the cached copy stays intact
+    return {p_type: list(values) for p_type, values in hits.items()}
+
+async def scan_email_content(email: Dict[str, Any], dsar_classifier: DSARCascade = dsar_cascade,
+                             tenant: str = None) -> List[Dict[str, Any]]:
     """Scan a single email's content for PII/PHI/DSAR."""
     findings = []
     seen = {}
     # Combine headers + body
     content = f"{email['from']} {email['subject']} {email['body']}"
     
-    # --- Regex PII/PHI ---
-    for p_type, pattern in PII_PATTERNS.items():
-        for m in pattern.finditer(content):
-            norm_val = normalize_value(m.group(0), p_type)
+    # --- Regex PII/PHI (single pass for all patterns, cached by content) ---
+    hits = _detect_pii(content)
+    health_hits = hits.pop("health", [])
+    for p_type, values in hits.items():
+        for value in values:
+            norm_val = normalize_value(value, p_type)
             key = (email["message_id"], norm_val, p_type)
             if key not in seen:
                 finding = {
@@ -423,7 +402,7 @@ async def scan_email_content(email: Dict[str, Any], dsar_classifier=dsar_classif
                     "thread_id": email["thread_id"],
                     "from": email["from"],
                     "subject": email["subject"],
-                    "value": m.group(0),
+                    "value": value,
                     "normalized_value": norm_val,
                     "type": p_type,
                     "confidence": 0.95,
@@ -434,8 +413,8 @@ async def scan_email_content(email: Dict[str, Any], dsar_classifier=dsar_classif
                 seen[key] = finding
     
     # --- Health keywords ---
-    for m in HEALTH_KEYWORDS.finditer(content):
-        norm_val = normalize_value(m.group(0), "health")
+    for value in health_hits:
+        norm_val = normalize_value(value, "health")
         key = (email["message_id"], norm_val, "health")
         if key not in seen:
             finding = {
@@ -443,7 +422,7 @@ async def scan_email_content(email: Dict[str, Any], dsar_classifier=dsar_classif
                 "thread_id": email["thread_id"],
                 "from": email["from"],
                 "subject": email["subject"],
-                "value": m.group(0),
+                "value": value,
                 "normalized_value": norm_val,
                 "type": "health",
                 "confidence": 0.75,
@@ -454,8 +433,10 @@ async def scan_email_content(email: Dict[str, Any], dsar_classifier=dsar_classif
             seen[key] = finding
     
     # --- DSAR requests ---
+    regex_hit = False
     for dsar_type, pattern in DSAR_PATTERNS.items():
         for m in pattern.finditer(content):
+            regex_hit = True
             norm_val = m.group(0).lower()
             key = (email["message_id"], norm_val, "dsar")
             if key not in seen:
@@ -474,9 +455,9 @@ async def scan_email_content(email: Dict[str, Any], dsar_classifier=dsar_classif
                 "timestamp": datetime.utcnow()
                 }
                 seen[key] = finding
-    # NLP DSAR Detector
-    result = await asyncio.to_thread(dsar_classifier, content, candidate_labels=DSAR_LABELS)
-    for label, score in zip(result["labels"], result["scores"]):
+    # NLP DSAR Detector (only for emails the cheaper cascade tiers left open)
+    result = await dsar_classifier.classify(content, regex_hit=regex_hit, email=email, tenant=tenant)
+    for label, score in (zip(result["labels"], result["scores"]) if result else ()):
         if score > 0.7:  # threshold
             key = (email["message_id"], label, "dsar")
             if key not in seen:
@@ -499,23 +480,83 @@ async def scan_email_content(email: Dict[str, Any], dsar_classifier=dsar_classif
     findings = list(seen.values())
     return findings
 
-async def scan_gmail(admin_email: str) -> List[Dict[str, Any]]:
-    """Scan connected Gmail account for PII/PHI and DSAR requests."""
-    
-    # Get decrypted refresh token
-    refresh_token = get_refresh_token(admin_email)
+def classification_cache_stats() -> Dict[str, Any]:
+    """Hit ratios of the zero-shot and regex result caches."""
+    caches = [c for c in (dsar_batcher.cache, detector_cache) if c is not None]
+    return {cache.namespace: cache.stats()["hit_ratio"] for cache in caches}
+
+async def iter_gmail_scan(admin_email: str, ordered: bool = False,
+                          full_sync: bool = False) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Scan connected Gmail account for PII/PHI and DSAR requests,
+    yielding each email's findings as soon as it is fetched and scanned
+    (or in mailbox order when ordered=True).
+
+    The first scan pages through the whole mailbox; later scans only fetch
+    messages added since the stored historyId. full_sync=True rescans
+    everything. The cursor is saved only once the whole pass was consumed.
+    """
     
-    # Exchange refresh token for access token
-    access_token = await get_access_token(refresh_token)
+    # Cached access token (refreshed from the stored refresh token when needed)
+    access_token = await get_tenant_access_token(admin_email)
     
-    # List emails (first 50 by default)
-    emails = await list_emails(access_token)
-    email_ids = [e["id"] for e in emails]
-    all_emails = await fetch_all_emails(access_token, email_ids)
+    limiter = gmail_limiters.get(admin_email)
+    sync = GmailSync(access_token, None if full_sync else get_gmail_history_id(admin_email), limiter=limiter)
 
-    
-    tasks = [scan_email_content(e, dsar_classifier = dsar_classifier) for e in all_emails]
-    all_findings = await asyncio.gather(*tasks)
+    async def scan_one(email):
+        return await scan_email_content(email, dsar_classifier=dsar_cascade, tenant=admin_email)
+
+    async def fetch_chunk(chunk):
+        # One batch HTTP call per chunk; each email is scanned as soon as the chunk lands
+        emails = await fetch_batch_with_limit(access_token, chunk, limiter)
+        return [asyncio.ensure_future(scan_one(email)) for email in emails]
+
+    # Chunk fetches in flight, bounded so large mailboxes don't buffer in memory
+    pending = deque()
+    scans = []
+
+    async def next_chunk():
+        if ordered:
+            task = pending.popleft()
+        else:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            task = next(iter(done))
+            pending.remove(task)
+        return await task
+
+    try:
+        async for page in sync.pages():
+            for i in range(0, len(page), GMAIL_BATCH_SIZE):
+                pending.append(asyncio.ensure_future(fetch_chunk(page[i:i + GMAIL_BATCH_SIZE])))
+            while len(pending) > GMAIL_FETCH_AHEAD or (not ordered and any(t.done() for t in pending)):
+                scans = await next_chunk()
+                for next_done in (scans if ordered else asyncio.as_completed(scans)):
+                    yield await next_done
+        while pending:
+            scans = await next_chunk()
+            for next_done in (scans if ordered else asyncio.as_completed(scans)):
+                yield await next_done
+        if sync.history_id:
+            save_gmail_history_id(admin_email, sync.history_id)
+        logger.info(f"Gmail {sync.mode} sync for {admin_email}: {sync.messages} messages, "
+                    f"limiter {limiter.stats()}, DSAR cascade {dsar_cascade.stats(admin_email)['fractions']}, "
+                    f"model batching {dsar_batcher.stats()}, cache hit ratios {classification_cache_stats()}")
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 401:
+            # Revoked or expired early; the next scan fetches a new token
+            gmail_tokens.invalidate(admin_email)
+        raise
+    finally:
+        for task in pending:
+            if task.done() and not task.cancelled() and task.exception() is None:
+                scans = scans + task.result()
+            task.cancel()
+        for scan in scans:
+            scan.cancel()
+
+async def scan_gmail(admin_email: str, full_sync: bool = False) -> List[Dict[str, Any]]:
+    """Scan connected Gmail account for PII/PHI and DSAR requests (new mail only after the first scan)."""
+    all_findings = [findings async for findings in iter_gmail_scan(admin_email, ordered=True, full_sync=full_sync)]
     
     return {
     "success": True,
@@ -540,18 +581,11 @@ def mask_data(admin_email, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
         results = []
         if baseline_findings:
             decisions = resolve(baseline_findings)
-            for decision in decisions:
+            # One grouped pass per transformation type
+            transformed = transformation_engine.transform_batch(decisions, tenant=admin_email)
+            for decision, (transformed_value, confidence, metadata) in zip(decisions, transformed):
                 value = decision.finding.get("value", "")
 
-                transformed_value, confidence, metadata = (
-                    transformation_engine._apply_transformation(
-                        value=value,
-                        transformation_type=decision.transformation_type,
-                        finding=decision.finding,
-                        request=None  
-                    )
-                )
-
                 metadata.update({
                     "decision_reason": decision.reason,
                     "derived_laws": decision.derived_from,
@@ -570,37 +604,25 @@ def mask_data(admin_email, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
 
         if dsar_findings:
             dsar_contexts = extract_dsar_contexts(dsar_findings)
+            targeted_requests = build_targeted_requests(admin_email, dsar_contexts)
+            # One pass over the data answers every DSAR
             all_targeted_findings = []
-            for context in dsar_contexts:
-                targeted_request = TargetedScanRequest(
-                    dsar_id=context.dsar_id,
-                    subject_identifier=context.subject_identifier,
-                    dsar_type=context.dsar_type,
-                    sources=["mongo"]
-                )
-                scan_result = scan_mongo(admin_email, targeted_request=targeted_request)
-                all_targeted_findings.extend(scan_result.get("findings", []))
+            if targeted_requests:
+                scan_result = scan_mongo(admin_email, targeted_requests=targeted_requests)
+                all_targeted_findings = scan_result.get("findings", [])
 
+            reveal_tokenized_values(admin_email, all_targeted_findings)
             dsar_decisions = resolve_dsar(all_targeted_findings)
+            # Enforcement is collected and written in grouped bulk batches after the loop
+            enforce_items, enforce_metadata = [], []
 
-            for decision in dsar_decisions:
+            transformed = transformation_engine.transform_batch(dsar_decisions, tenant=admin_email)
+            for decision, (transformed_value, confidence, metadata) in zip(dsar_decisions, transformed):
                 value = decision.finding.get("value", "")
 
-                transformed_value, confidence, metadata = (
-                    transformation_engine._apply_transformation(
-                        value=value,
-                        transformation_type=decision.transformation_type,
-                        finding=decision.finding,
-                        request=None
-                    )
-                )
-                
                 if is_enforcement_allowed(dsar_type = DSARType(decision.finding.get("dsar_type"))):
-                    MongoEnforcer.apply(
-                        admin_email=admin_email,
-                        decision=decision,
-                        transformed_value=transformed_value
-                    )
+                    enforce_items.append((decision, transformed_value))
+                    enforce_metadata.append(metadata)
 
                 metadata.update({
                     "decision_reason": decision.reason,
@@ -618,6 +640,11 @@ def mask_data(admin_email, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
                     "confidence": confidence,
                     "metadata": metadata
                 })
+
+            if enforce_items:
+                outcomes = MongoEnforcer.apply_batch(admin_email=admin_email, items=enforce_items)
+                for metadata, outcome in zip(enforce_metadata, outcomes):
+                    metadata["enforcement"] = outcome
 # Send DSAR access emails with results
             for context in dsar_contexts:
                 if context.dsar_type != "access":
@@ -637,6 +664,8 @@ def mask_data(admin_email, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
                     results=dsar_results
                 )
 
+        if transformation_engine.memo is not None:
+            logger.info(f"Transformation memo: {transformation_engine.memo.stats()}")
         extract_and_store(results, admin_email)
 
         return {
@@ -649,6 +678,52 @@ def mask_data(admin_email, findings: List[Dict[str, Any]]) -> Dict[str, Any]:
             "error": str(e)
         }
 
+def build_targeted_requests(admin_email: str, dsar_contexts) -> List[TargetedScanRequest]:
+    """
+    Targeted Mongo requests for DSAR contexts: one for each subject, and one
+    for the vault token the subject maps to, so records tokenized by an
+    earlier enforcement are found too.
+    """
+    requests = []
+    for context in dsar_contexts:
+        identifiers = [context.subject_identifier]
+        if context.subject_identifier:
+            identifiers.append(transformation_engine.tokens.token_for(admin_email, context.subject_identifier))
+        for identifier in identifiers:
+            requests.append(TargetedScanRequest(
+                dsar_id=context.dsar_id,
+                subject_identifier=identifier,
+                dsar_type=context.dsar_type,
+                sources=["mongo"]
+            ))
+    return requests
+
+def reveal_tokenized_values(admin_email: str, findings: List[Dict[str, Any]]) -> int:
+    """
+    Resolve vault tokens in targeted findings before the DSAR policy runs:
+    every token finding gets the PII type (and laws) of the value it stands
+    for, and access-request findings get the value itself, so the requester
+    gets their data rather than tokens. One vault query for the whole batch;
+    returns how many values were revealed.
+    """
+    tokenized = [f for f in findings if transformation_engine.tokens.is_token(f.get("value"))]
+    if not tokenized:
+        return 0
+    entries = transformation_engine.tokens.reveal_many(admin_email, [f["value"] for f in tokenized])
+    revealed = 0
+    for finding, entry in zip(tokenized, entries):
+        if entry is None:
+            continue
+        original, pii_type = entry
+        if pii_type:
+            finding["type"] = pii_type
+            finding["mapped_laws"] = COMPLIANCE_MAP.get(pii_type, [])
+        if finding.get("dsar_type") == DSARType.ACCESS.value:
+            finding["token_id"] = finding["value"]
+            finding["value"] = original
+            revealed += 1
+    return revealed
+
 # DSAR Transformation/Handling Logic
 def extract_dsar_contexts(gmail_findings):
     """Extract DSAR contexts from Gmail findings."""
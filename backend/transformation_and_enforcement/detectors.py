@@ -0,0 +1,173 @@
+import re
+import string
+from typing import Dict, List, Pattern, Tuple
+from transformation_and_enforcement.patterns import PII_PATTERNS, HEALTH_KEYWORDS, PII_PREFILTERS
+
+# Flags that can be carried into a combined pattern as scoped inline flags
+_INLINE_FLAGS = (
+    (re.IGNORECASE, "i"),
+    (re.MULTILINE, "m"),
+    (re.DOTALL, "s"),
+    (re.VERBOSE, "x"),
+)
+
+# A detector that opens with a greedy character-class run, e.g. "[a-z0-9.]+@..."
+_LEADING_RUN = re.compile(r"^(\[(?:\\.|[^\]\\])+\])\+(?![?+])")
+
+_DIGITS = string.digits.encode()
+_LETTERS = string.ascii_letters.encode()
+
+# Fields of a value signature, in the order value_signature() returns them
+SIGNATURE_FIELDS = ("digits", "letters", "at", "dots", "hyphens")
+
+def value_signature(text: str) -> Tuple[int, ...]:
+    """
+    Cheap character counts used to rule detectors out before any regex runs,
+    in SIGNATURE_FIELDS order. Non-ASCII characters might be Unicode digits
+    or letters, so they are counted as both to keep the signature an upper bound.
+    """
+    raw = text.encode("ascii", "ignore")
+    other = len(text) - len(raw)
+    return (
+        len(raw) - len(raw.translate(None, _DIGITS)) + other,
+        len(raw) - len(raw.translate(None, _LETTERS)) + other,
+        raw.count(b"@"),
+        raw.count(b"."),
+        raw.count(b"-"),
+    )
+
+def _scoped(pattern: Pattern, source: str = None) -> str:
+    """Wrap a pattern's source so its own flags survive being merged."""
+    source = pattern.pattern if source is None else source
+    flags = "".join(c for flag, c in _INLINE_FLAGS if pattern.flags & flag)
+    if flags:
+        return f"(?{flags}:{source})"
+    return f"(?:{source})"
+
+class CombinedDetector:
+    """
+    Merges a dict of regex detectors into one alternation of named groups.
+
+    A single pass of the combined pattern finds the first position where any
+    detector fires (or proves that none does, which is the common case for
+    field values). Detectors are then resumed from that position only, so
+    results are identical to running every pattern over the whole string.
+
+    Two rewrites keep the pass cheap without changing what matches:
+    detectors anchored on a word boundary share a single leading \\b, and a
+    detector opening with a greedy run "[C]+" is only tried where that run
+    starts (its leftmost match can never begin mid-run).
+    """
+
+    def __init__(self, patterns: Dict[str, Pattern]):
+        self.patterns = dict(patterns)
+        self._groups = {f"d{i}": p_type for i, p_type in enumerate(self.patterns)}
+
+        anchored, unanchored = [], []
+        for group, p_type in self._groups.items():
+            pattern = self.patterns[p_type]
+            if pattern.pattern.startswith(r"\b"):
+                anchored.append(f"(?P<{group}>{_scoped(pattern, pattern.pattern[2:])})")
+                continue
+            source = pattern.pattern
+            run = _LEADING_RUN.match(source)
+            if run:
+                source = f"(?<!{run.group(1)}){source}"
+            unanchored.append(f"(?P<{group}>{_scoped(pattern, source)})")
+
+        alternatives = []
+        if anchored:
+            alternatives.append(r"\b(?:" + "|".join(anchored) + ")")
+        alternatives.extend(unanchored)
+        self.pattern = re.compile("|".join(alternatives))
+
+    def search(self, text: str) -> Dict[str, str]:
+        """
+        First match per detector, in detector order.
+        Equivalent to calling pattern.search(text) for every detector.
+        """
+        first = self.pattern.search(text)
+        if first is None:
+            return {}
+
+        pos = first.start()
+        fired = self._groups[first.lastgroup]
+        found = {}
+        for p_type, pattern in self.patterns.items():
+            if p_type == fired:
+                found[p_type] = first.group(first.lastgroup)
+                continue
+            m = pattern.search(text, pos)
+            if m:
+                found[p_type] = m.group(0)
+        return found
+
+    def findall(self, text: str) -> Dict[str, List[str]]:
+        """
+        All non-overlapping matches per detector, in detector order.
+        Equivalent to calling pattern.finditer(text) for every detector.
+        """
+        first = self.pattern.search(text)
+        if first is None:
+            return {}
+
+        pos = first.start()
+        hits = {}
+        for p_type, pattern in self.patterns.items():
+            values = [m.group(0) for m in pattern.finditer(text, pos)]
+            if values:
+                hits[p_type] = values
+        return hits
+
+class PrefilteredDetector:
+    """
+    Routes each value only to the detectors its signature allows.
+
+    Prefilters are minimum counts per signature field (see PII_PREFILTERS).
+    Signatures are clamped to the largest threshold of each field, so the
+    handful of distinct routes are resolved once and cached together with a
+    CombinedDetector built for exactly that subset of detectors. Values
+    shorter than min_length skip the signature, since a combined pass over
+    them is already cheaper than computing it.
+    """
+
+    def __init__(self, patterns: Dict[str, Pattern], prefilters: Dict[str, Dict[str, int]],
+                 min_length: int = 32):
+        self.patterns = dict(patterns)
+        self.prefilters = {p_type: prefilters.get(p_type, {}) for p_type in self.patterns}
+        self.min_length = min_length
+        self._caps = tuple(
+            max([requirement.get(field, 0) for requirement in self.prefilters.values()])
+            for field in SIGNATURE_FIELDS
+        )
+        self._full = CombinedDetector(self.patterns)
+        self._routes: Dict[Tuple[int, ...], CombinedDetector] = {}
+
+    def _route(self, text: str):
+        if len(text) < self.min_length:
+            return self._full
+        key = tuple(map(min, value_signature(text), self._caps))
+        route = self._routes.get(key, False)
+        if route is False:
+            capped = dict(zip(SIGNATURE_FIELDS, key))
+            allowed = {
+                p_type: pattern
+                for p_type, pattern in self.patterns.items()
+                if all(capped[field] >= minimum for field, minimum in self.prefilters[p_type].items())
+            }
+            route = CombinedDetector(allowed) if allowed else None
+            self._routes[key] = route
+        return route
+
+    def search(self, text: str) -> Dict[str, str]:
+        """Same result as CombinedDetector.search over all detectors."""
+        detector = self._route(text)
+        return detector.search(text) if detector else {}
+
+    def findall(self, text: str) -> Dict[str, List[str]]:
+        """Same result as CombinedDetector.findall over all detectors."""
+        detector = self._route(text)
+        return detector.findall(text) if detector else {}
+
+# Global detector for all PII patterns plus health keywords (reported as "health")
+pii_detector = PrefilteredDetector({**PII_PATTERNS, "health": HEALTH_KEYWORDS}, PII_PREFILTERS)
@@ -0,0 +1,287 @@
+import time
+import queue
+import asyncio
+import logging
+import threading
+from typing import List, Dict, Any, Callable, Optional
+from config import DSAR_MODEL, DSAR_BACKEND, DSAR_MICRO_BATCH, DSAR_BATCH_WAIT_MS, DSAR_FORWARD_BATCH, DSAR_CASCADE
+from config import RESULT_CACHE, RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_SQLITE
+from transformation_and_enforcement.result_cache import (
+    ResultCache, version_of, normalize_uncased, normalize_whitespace
+)
+from transformation_and_enforcement.patterns import DSAR_LABELS, DSAR_VOCABULARY
+from transformation_and_enforcement.text_prep import TextPreparer, merge_max
+
+logger = logging.getLogger(__name__)
+
+# Inference backends: name -> loader(model_name) returning a zero-shot pipeline
+def _load_transformers(model_name: str):
+    from transformers import pipeline  # heavy import, deferred with the model
+    return pipeline("zero-shot-classification", model=model_name)
+
+def _load_onnx(model_name: str):
+    from transformation_and_enforcement.onnx_backend import load_onnx_pipeline
+    return load_onnx_pipeline(model_name)
+
+BACKENDS = {
+    "transformers": _load_transformers,   # PyTorch fp32
+    "onnx": _load_onnx,                   # ONNX Runtime, dynamic int8
+}
+
+# Zero-shot pipelines, loaded on first use rather than at import time so that
+# importing the scanners (API, MCP server, LangGraph workflow) stays cheap.
+_pipelines: Dict[str, Callable] = {}
+_pipeline_lock = threading.Lock()
+
+def get_dsar_pipeline(backend: str = None):
+    """
+    The shared zero-shot pipeline for backend (default DSAR_BACKEND); the
+    first caller loads it, concurrent callers wait. A backend whose
+    dependencies are missing falls back to transformers.
+    """
+    backend = backend or DSAR_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown DSAR classifier backend: {backend}")
+    pipe = _pipelines.get(backend)
+    if pipe is None:
+        with _pipeline_lock:
+            pipe = _pipelines.get(backend)
+            if pipe is None:
+                start = time.perf_counter()
+                try:
+                    pipe = BACKENDS[backend](DSAR_MODEL)
+                except ImportError as e:
+                    if backend == "transformers":
+                        raise
+                    logger.warning(f"DSAR backend {backend} unavailable ({e}); using transformers")
+                    pipe = _pipelines.get("transformers") or _load_transformers(DSAR_MODEL)
+                    _pipelines["transformers"] = pipe
+                _pipelines[backend] = pipe
+                logger.info(f"Loaded DSAR classifier {DSAR_MODEL} ({backend}) in {time.perf_counter() - start:.1f}s")
+    return pipe
+
+def is_loaded(backend: str = None) -> bool:
+    return (backend or DSAR_BACKEND) in _pipelines
+
+def warm_up() -> float:
+    """Load the model and run one inference so the first scan doesn't pay for it. Returns seconds taken."""
+    start = time.perf_counter()
+    get_dsar_pipeline()("warm-up", candidate_labels=DSAR_LABELS[:1])
+    return time.perf_counter() - start
+
+def warm_up_in_background() -> threading.Thread:
+    """Start warm_up() on a daemon thread; startup continues while the model loads."""
+    def run():
+        try:
+            logger.info(f"DSAR classifier warm-up finished in {warm_up():.1f}s")
+        except Exception as e:
+            # Scans retry the load on first use
+            logger.warning(f"DSAR classifier warm-up failed: {e}")
+    thread = threading.Thread(target=run, name="dsar-classifier-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+# Zero-shot DSAR classification, batched.
+#
+# Each zero-shot call runs one NLI pass per candidate label. Scanning emails
+# one at a time ran those passes with batch size 1; here concurrent callers
+# (every email of a fetched chunk) queue their texts and a dedicated worker
+# thread sends them to the pipeline together, so the model sees forward
+# batches of DSAR_FORWARD_BATCH (premise, hypothesis) pairs.
+
+class BatchClassifier:
+    """
+    Micro-batching front for a zero-shot classification pipeline
+    (the lazily loaded shared pipeline unless one is passed in).
+
+    await classify(text) from any event loop; the worker collects up to
+    max_batch texts, waiting at most max_wait_ms for the batch to fill, and
+    resolves each caller's future with its {"labels", "scores"} result.
+    Texts already in the cache, or repeated within a batch, aren't inferred again.
+    """
+
+    def __init__(self, pipe: Callable = None, labels: List[str] = DSAR_LABELS,
+                 max_batch: int = DSAR_MICRO_BATCH, max_wait_ms: float = DSAR_BATCH_WAIT_MS,
+                 forward_batch: int = DSAR_FORWARD_BATCH, cache: ResultCache = None):
+        self.pipe = pipe
+        self.cache = cache
+        self.labels = labels
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.forward_batch = forward_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self.inferred = 0
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="dsar-classifier", daemon=True)
+                self._worker.start()
+
+    async def classify(self, text: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._ensure_worker()
+        self._queue.put((text, loop, future))
+        return await future
+
+    def classify_many(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Classify texts in the calling thread (no queueing)."""
+        if not texts:
+            return []
+        keys = [self.cache.key(text) if self.cache else text for text in texts]
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in results or key in pending:
+                continue
+            cached = self.cache.get(text, key) if self.cache else None
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = text
+
+        if pending:
+            pipe = self.pipe or get_dsar_pipeline()
+            outputs = pipe(list(pending.values()), candidate_labels=self.labels, batch_size=self.forward_batch)
+            # Older pipelines unwrap single-item lists
+            outputs = [outputs] if isinstance(outputs, dict) else list(outputs)
+            if len(outputs) != len(pending):
+                raise RuntimeError(f"classifier returned {len(outputs)} results for {len(pending)} texts")
+            self.inferred += len(pending)
+            for (key, text), output in zip(pending.items(), outputs):
+                result = {"labels": list(output["labels"]), "scores": [float(s) for s in output["scores"]]}
+                results[key] = result
+                if self.cache:
+                    self.cache.put(text, result, key)
+        return [results[key] for key in keys]
+
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=max(remaining, 0)) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            # Skip texts whose scan was cancelled while queued
+            batch = [item for item in batch if not item[2].cancelled()]
+            if not batch:
+                continue
+            try:
+                results = self.classify_many([text for text, _, _ in batch])
+                self.batches += 1
+                self.texts += len(batch)
+            except Exception as e:
+                logger.exception("DSAR classification batch failed")
+                for _, loop, future in batch:
+                    loop.call_soon_threadsafe(_resolve, future, None, e)
+                continue
+            for (_, loop, future), result in zip(batch, results):
+                loop.call_soon_threadsafe(_resolve, future, result, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "inferred": self.inferred,
+            "queued": self._queue.qsize(),
+            "cache": self.cache.stats() if self.cache else None,
+        }
+
+def zero_shot_cache() -> Optional[ResultCache]:
+    """Cache of zero-shot outputs for the configured model, backend and labels (None if disabled)."""
+    if not RESULT_CACHE:
+        return None
+    # Uncased models can't tell case apart, so neither does the key
+    normalize = normalize_uncased if "uncased" in DSAR_MODEL.lower() else normalize_whitespace
+    return ResultCache("zero_shot", version_of(DSAR_MODEL, DSAR_BACKEND, DSAR_LABELS),
+                       RESULT_CACHE_MAX_ENTRIES, normalize=normalize, sqlite_path=RESULT_CACHE_SQLITE)
+
+# Detection cascade: each email stops at the first tier that can decide it.
+#   regex      a DSAR_PATTERNS phrase matched -> the keyword findings stand, no model call
+#   prefilter  no privacy vocabulary at all -> not a DSAR, no model call
+#   model      everything else goes to zero-shot inference, on the prepared
+#              text (see text_prep) in a bounded number of chunks
+CASCADE_TIERS = ("regex", "prefilter", "model")
+
+class DSARCascade:
+    """
+    Decides per email whether the zero-shot model has to run, and counts how
+    many emails each tier settled, overall and per tenant. With enabled=False
+    every email reaches the model (the pre-cascade behaviour).
+    """
+
+    def __init__(self, classifier: BatchClassifier, enabled: bool = DSAR_CASCADE,
+                 preparer: TextPreparer = None):
+        self.classifier = classifier
+        self.enabled = enabled
+        self.preparer = preparer or TextPreparer()
+        self.counts = {tier: 0 for tier in CASCADE_TIERS}
+        self.tenant_counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def tier(self, content: str, regex_hit: bool) -> str:
+        if not self.enabled:
+            return "model"
+        if regex_hit:
+            return "regex"
+        if not DSAR_VOCABULARY.search(content):
+            return "prefilter"
+        return "model"
+
+    async def classify(self, content: str, regex_hit: bool = False, email: Dict[str, Any] = None,
+                       tenant: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Zero-shot result for content, or None if a cheaper tier settled it.
+        Given the email, the model sees its prepared text instead of content.
+        """
+        tier = self.tier(content, regex_hit)
+        with self._lock:
+            self.counts[tier] += 1
+            if tenant is not None:
+                counts = self.tenant_counts.setdefault(tenant, {t: 0 for t in CASCADE_TIERS})
+                counts[tier] += 1
+        if tier != "model":
+            return None
+        chunks = self.preparer.email_chunks(email) if email else self.preparer.chunks("", content)
+        # Chunks of one email are queued together and share forward batches
+        results = await asyncio.gather(*(self.classifier.classify(chunk) for chunk in chunks))
+        return results[0] if len(results) == 1 else merge_max(results)
+
+    def stats(self, tenant: str = None) -> Dict[str, Any]:
+        """Tier counts for one tenant, or process-wide (with input stats) when tenant is None."""
+        with self._lock:
+            if tenant is None:
+                counts = dict(self.counts)
+            else:
+                counts = dict(self.tenant_counts.get(tenant) or {tier: 0 for tier in CASCADE_TIERS})
+        total = sum(counts.values())
+        stats = {
+            "emails": total,
+            "tiers": counts,
+            "fractions": {tier: round(n / total, 3) if total else 0.0 for tier, n in counts.items()},
+        }
+        if tenant is None:
+            stats["inputs"] = self.preparer.stats()
+        return stats
+
+def _resolve(future: asyncio.Future, result, error):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -1,7 +1,10 @@
-from pymongo import MongoClient
+from typing import List, Dict, Any, Tuple
 from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from transformation_and_enforcement.transformations import TransformationType, DSARType
 from config import Integrations, cipher
+from integrations.mongo_pool import mongo_pool
 
 def is_enforcement_allowed(dsar_type: DSARType) -> bool: 
     return dsar_type in { DSARType.DELETE, DSARType.RECTIFY, DSARType.RESTRICT_PROCESSING }
@@ -38,26 +41,135 @@ class MongoEnforcer:
         document_id = finding["document_id"]
         field_path = finding["field_path"]
 
-        client = MongoClient(mongo_uri)
-        db = client[db_name]
-        collection = db[collection_name]
-
-        # --- DELETE ---
-        if transformation == TransformationType.DATA_DELETION_HARD:
-            collection.update_one(
-                {"_id": ObjectId(document_id)},
-                {"$unset": {field_path: ""}}
-            )
-
-        # --- RECTIFY / ANONYMIZE / ENCRYPT ---
-        elif transformation in {
-            TransformationType.ANONYMIZATION,
-            TransformationType.DATA_RECTIFICATION,
-            TransformationType.ENCRYPTION_RANDOMIZED
-        }:
-            collection.update_one(
-                {"_id": ObjectId(document_id)},
-                {"$set": {field_path: transformed_value}}
-            )
-
-        client.close()
+        with mongo_pool.client(admin_email, mongo_uri) as client:
+            db = client[db_name]
+            collection = db[collection_name]
+
+            # --- DELETE ---
+            if transformation == TransformationType.DATA_DELETION_HARD:
+                collection.update_one(
+                    {"_id": ObjectId(document_id)},
+                    {"$unset": {field_path: ""}}
+                )
+
+            # --- RECTIFY / ANONYMIZE / ENCRYPT / TOKENIZE ---
+            elif transformation in _SET_TRANSFORMATIONS:
+                collection.update_one(
+                    {"_id": ObjectId(document_id)},
+                    {"$set": {field_path: transformed_value}}
+                )
+
+    @staticmethod
+    def apply_batch(
+        admin_email: str,
+        items: List[Tuple[Any, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Enforce many (decision, transformed_value) pairs with grouped bulk writes.
+
+        Decisions are grouped by collection, and every $set/$unset path for the
+        same _id is merged into one UpdateOne, sent as unordered bulk_write
+        batches. Paths that conflict with one already merged for a document
+        (same field, parent or child) go to a later round, so the outcome
+        matches applying the decisions one by one.
+        Returns one outcome dict per item, in input order.
+        """
+        outcomes = [None] * len(items)
+
+        integration = Integrations.find_one({"admin_email": admin_email})
+        if not integration or not integration.get("MongoConnection", False):
+            failure = {"success": False, "message": "No MongoDB connection found. Please connect via Integrations tab."}
+            return [dict(failure) for _ in items]
+        encrypted_uri = integration.get("encrypted_mongo_uri")
+        if not encrypted_uri:
+            failure = {"success": False, "message": "Mongo URI not found in database. Please connect via Integrations tab."}
+            return [dict(failure) for _ in items]
+        try:
+            mongo_uri = cipher.decrypt(encrypted_uri.encode()).decode()
+        except Exception as e:
+            failure = {"success": False, "message": f"Failed to decrypt Mongo URI: {str(e)}"}
+            return [dict(failure) for _ in items]
+
+        # collection -> rounds; each round maps _id -> {"$set": {...}, "$unset": {...}, "items": [...]}
+        plans: Dict[str, List[Dict[Any, Dict[str, Any]]]] = {}
+        for index, (decision, transformed_value) in enumerate(items):
+            finding = decision.finding
+            transformation = decision.transformation_type
+            outcome = {
+                "collection": finding.get("collection"),
+                "document_id": finding.get("document_id"),
+                "field_path": finding.get("field_path"),
+            }
+            outcomes[index] = outcome
+
+            if transformation == TransformationType.DATA_DELETION_HARD:
+                operator, value = "$unset", ""
+            elif transformation in _SET_TRANSFORMATIONS:
+                operator, value = "$set", transformed_value
+            else:
+                outcome.update({"success": True, "action": "skipped"})
+                continue
+            outcome["action"] = operator.lstrip("$")
+
+            document_id = finding["document_id"]
+            doc_key = ObjectId(document_id) if ObjectId.is_valid(document_id) else document_id
+            field_path = finding["field_path"]
+
+            rounds = plans.setdefault(finding["collection"], [])
+            # Latest round already touching this document, or the first one
+            start = 0
+            for r, ops in enumerate(rounds):
+                if doc_key in ops:
+                    start = r
+            for ops in rounds[start:]:
+                op = ops.get(doc_key)
+                if op is None or not any(_paths_conflict(field_path, p) for p in op["paths"]):
+                    break
+            else:
+                rounds.append({})
+                ops = rounds[-1]
+            op = ops.setdefault(doc_key, {"$set": {}, "$unset": {}, "paths": [], "items": []})
+            op[operator][field_path] = value
+            op["paths"].append(field_path)
+            op["items"].append(index)
+
+        with mongo_pool.client(admin_email, mongo_uri) as client:
+            for namespace, rounds in plans.items():
+                db_name, collection_name = namespace.split(".", 1)
+                collection = client[db_name][collection_name]
+                for ops in rounds:
+                    requests, owners = [], []
+                    for doc_key, op in ops.items():
+                        update = {k: op[k] for k in ("$set", "$unset") if op[k]}
+                        requests.append(UpdateOne({"_id": doc_key}, update))
+                        owners.append(op["items"])
+
+                    failed = {}
+                    try:
+                        collection.bulk_write(requests, ordered=False)
+                    except BulkWriteError as e:
+                        for error in e.details.get("writeErrors", []):
+                            failed[error["index"]] = error.get("errmsg", "write failed")
+                    except Exception as e:
+                        failed = {i: str(e) for i in range(len(requests))}
+
+                    for i, indexes in enumerate(owners):
+                        for index in indexes:
+                            if i in failed:
+                                outcomes[index].update({"success": False, "message": failed[i]})
+                            else:
+                                outcomes[index]["success"] = True
+
+        return outcomes
+
+_SET_TRANSFORMATIONS = {
+    TransformationType.ANONYMIZATION,
+    TransformationType.DATA_RECTIFICATION,
+    TransformationType.ENCRYPTION_RANDOMIZED,
+    # Vault tokens are written back; DSAR scans find them via the subject's token
+    TransformationType.TOKENIZATION
+}
+
+def _paths_conflict(a: str, b: str) -> bool:
+    """Mongo rejects one update touching a path together with its parent or child."""
+    return a == b or a.startswith(b + ".") or b.startswith(a + ".")
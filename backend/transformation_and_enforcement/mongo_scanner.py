@@ -0,0 +1,398 @@
+import re
+import json
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Tuple
+from dateutil import parser
+from transformation_and_enforcement.patterns import COMPLIANCE_MAP, DSARType, TOKEN_PATTERN
+from transformation_and_enforcement.detectors import pii_detector
+
+# Document-level PII/PHI matching for Mongo scans.
+# Kept free of config/model imports so it can run inside worker processes.
+
+# Field names that hint at a PII type (used for targeted scans)
+FIELD_HEURISTICS = {
+    "aadhaar": ["aadhaar", "aadhar"],
+    "pan": ["pan"],
+    "email": ["email", "e_mail", "mail"],
+    "phone": ["phone", "mobile", "contact"],
+    "dob": ["dob", "birth", "birthday", "birthdate"],
+    "passport": ["passport"],
+    "health": ["medical", "health", "diagnosis", "patient"]
+}
+
+def normalize_value(val: str, p_type: str) -> str:
+    """Normalize values for deduplication of PII/PHI."""
+    val = val.strip()
+
+    if p_type == "aadhaar":
+        # Aadhaar = 12 digits
+        return re.sub(r"\D", "", val)
+    
+    if p_type == "pan":
+        # PAN = uppercase for consistency
+        return val.upper()
+    
+    if p_type == "phone":
+        # Keep only digits, last 10
+        return re.sub(r"\D", "", val)[-10:]
+    
+    if p_type == "email":
+        # Lowercase email for uniformity
+        return val.lower()
+    
+    if p_type == "credit_card":
+        # Remove all non-digits, mask spaces/hyphens
+        return re.sub(r"\D", "", val)
+    
+    if p_type == "ssn":
+        # US SSN -> digits only
+        return re.sub(r"\D", "", val)
+    
+    if p_type == "ip_address":
+        # Standardize IP to lowercase (IPv6 can have hex chars)
+        return val.lower()
+    
+    if p_type == "dob":
+        # Normalize date format -> YYYY-MM-DD
+        try:
+            return parser.parse(val, dayfirst=True).strftime("%Y-%m-%d")
+        except Exception:
+            return val  # return raw if parsing fails
+    
+    if p_type == "passport":
+        # Uppercase passport numbers
+        return val.upper()
+    
+    if p_type == "health":
+        # For health conditions -> lowercase and strip spaces
+        return val.lower()
+    
+    return val
+
+def map_to_laws(pii_type: str) -> List[str]:
+    return COMPLIANCE_MAP.get(pii_type, [])
+
+def flatten_doc(doc: dict, parent: str = "") -> Dict[str, Any]:
+    """
+    Flatten nested dict into dotted keys.
+    Always stringifies values for scanning.
+    """
+    out = {}
+    for k, v in doc.items():
+        path = f"{parent}.{k}" if parent else k
+        if isinstance(v, dict):
+            out.update(flatten_doc(v, path))
+        elif isinstance(v, list):
+            out[path] = json.dumps(v, default=str)
+        else:
+            out[path] = str(v) if v is not None else ""
+    return out
+
+# Schema profiling (field pruning)
+# Prior for fields with no detector or name evidence that could still hold PII
+TEXT_PRIOR = 0.1
+
+def _walk(doc: dict, parent: str = ""):
+    """(dotted path, raw value) pairs, with the same paths flatten_doc produces."""
+    for k, v in doc.items():
+        path = f"{parent}.{k}" if parent else k
+        if isinstance(v, dict):
+            yield from _walk(v, path)
+        else:
+            yield path, v
+
+def _is_empty(value: Any) -> bool:
+    """Unset values (None, blank strings, empty lists): no evidence either way."""
+    return value is None or (isinstance(value, str) and not value.strip()) or (isinstance(value, list) and not value)
+
+def _is_inert(value: Any, blob_chars: int) -> bool:
+    """Values whose shape rules out PII: flags, ids, binary blobs, small numbers."""
+    if isinstance(value, (bool, datetime, bytes, bytearray)):
+        return True
+    if isinstance(value, (int, float)):
+        return abs(value) < 100000
+    if isinstance(value, str):
+        # Encoded blobs (base64, hashes) have no whitespace
+        return len(value) > blob_chars and not any(c.isspace() for c in value)
+    if isinstance(value, list):
+        return False
+    return type(value).__name__ in ("ObjectId", "Binary", "Timestamp")
+
+def profile_fields(docs: Iterable[dict], blob_chars: int = 4096) -> List[Dict[str, Any]]:
+    """
+    Field-level PII likelihood map built from a sample of one collection.
+    Evidence, strongest first: field name (FIELD_HEURISTICS), detector hits
+    in sampled values, and value shape. A field only scores 0 when none of
+    its sampled values could have held PII. Empty values don't count as
+    samples, so an optional field that was empty throughout the sample
+    keeps TEXT_PRIOR rather than being pruned.
+    """
+    stats = {}
+    for doc in docs:
+        for path, value in _walk(doc):
+            if path == "_id":
+                continue
+            s = stats.setdefault(path, {"sampled": 0, "hits": 0, "inert": 0})
+            if _is_empty(value):
+                continue
+            s["sampled"] += 1
+            text = json.dumps(value, default=str) if isinstance(value, list) else str(value)
+            if pii_detector.search(text):
+                s["hits"] += 1
+            elif _is_inert(value, blob_chars):
+                s["inert"] += 1
+
+    profile = []
+    for path, s in sorted(stats.items()):
+        lname = path.lower()
+        if any(k in lname for keywords in FIELD_HEURISTICS.values() for k in keywords):
+            likelihood, evidence = 1.0, "field-name"
+        elif s["hits"]:
+            likelihood, evidence = max(s["hits"] / s["sampled"], TEXT_PRIOR), "detector"
+        elif not s["sampled"]:
+            likelihood, evidence = TEXT_PRIOR, "empty"
+        elif s["inert"] == s["sampled"]:
+            likelihood, evidence = 0.0, "shape"
+        else:
+            likelihood, evidence = TEXT_PRIOR, "shape"
+        profile.append({"field": path, "likelihood": round(likelihood, 3),
+                        "evidence": evidence, "sampled": s["sampled"]})
+    return profile
+
+def pruned_projection(profile: List[Dict[str, Any]], min_likelihood: float) -> Dict[str, int]:
+    """
+    Mongo exclusion projection dropping fields below min_likelihood.
+    Exclusion (not inclusion) keeps fields the sample never saw in the scan.
+    Returns None when nothing can be pruned.
+    """
+    kept = [p["field"] for p in profile if p["likelihood"] >= min_likelihood]
+    projection = {}
+    for p in profile:
+        path = p["field"]
+        if p["likelihood"] >= min_likelihood or "$" in path:
+            continue
+        # Never drop a parent of a kept field, and skip children of dropped ones
+        if any(k.startswith(path + ".") for k in kept):
+            continue
+        if any(path.startswith(d + ".") for d in projection):
+            continue
+        projection[path] = 0
+    return projection or None
+
+# Targetted Scanning Logic
+class TargetedScanRequest:
+    def __init__(
+        self,
+        dsar_id: str,
+        subject_identifier: str,
+        dsar_type: DSARType,
+        sources: List[str]
+    ):
+        self.dsar_id = dsar_id
+        self.subject_identifier = subject_identifier
+        self.dsar_type = dsar_type
+        self.sources = sources
+    def __repr__(self):
+        return (
+        f"TargetedScanRequest("
+        f"dsar_id={self.dsar_id}, "
+        f"subject_identifier={self.subject_identifier}, "
+        f"dsar_type={self.dsar_type.value}, "
+        f"sources={self.sources}"
+        f")"
+        )
+
+def _scan_field(seen: Dict[Tuple, Dict[str, Any]], namespace: str, doc_id: str, field_path: str,
+                val_str: str, hits: Dict[str, str], health_hit: str,
+                targeted_request: TargetedScanRequest = None) -> None:
+    """Record one field's findings, for a full scan or for one targeted request."""
+    lname = field_path.lower()
+    matched = False
+    # Targeted findings are kept per DSAR, so one batch can serve several requests
+    scope = (targeted_request.dsar_id,) if targeted_request else ()
+    # --- Vault token (a field tokenized by enforcement; the request holds the subject's token) ---
+    if targeted_request and TOKEN_PATTERN.fullmatch(val_str.strip()):
+        token = val_str.strip()
+        if token != targeted_request.subject_identifier:
+            return
+        key = (namespace, doc_id, field_path, token, "token") + scope
+        if key not in seen:
+            seen[key] = {
+            "collection": namespace,
+            "document_id": doc_id,
+            "field_path": field_path,
+            "value": token,
+            "raw_value_snippet": token,
+            # The vault knows the original type; set when the token is revealed
+            "type": "token",
+            "confidence": 0.95,
+            "mapped_laws": [],
+            "detectors": ["token-vault"],
+            "timestamp": datetime.utcnow(),
+            "dsar_id": targeted_request.dsar_id,
+            "dsar_type": targeted_request.dsar_type.value,
+            "scan_type": "TARGETED",
+            }
+        return
+
+    # --- Regex detection (single pass for all patterns) ---
+    for p_type, value in hits.items():
+        if value:
+            norm_val = normalize_value(value, p_type)
+            if targeted_request:
+                if norm_val != targeted_request.subject_identifier:
+                    continue
+            key = (namespace, doc_id, field_path, norm_val, p_type) + scope
+            if key not in seen:
+                finding = {
+                "collection": namespace,
+                "document_id": doc_id,
+                "field_path": field_path,
+                "value": value,
+                "raw_value_snippet": val_str[:200],
+                "type": p_type,
+                "confidence": 0.95,
+                "mapped_laws": map_to_laws(p_type),
+                "detectors": ["regex"],
+                "timestamp": datetime.utcnow(),
+                }
+                if targeted_request:
+                    finding["dsar_id"] = targeted_request.dsar_id
+                    finding["dsar_type"] = targeted_request.dsar_type.value
+                    finding["scan_type"] = "TARGETED"
+                seen[key] = finding
+                matched = True
+            else:
+                seen[key]["detectors"].append("regex")
+
+    # --- Health keywords ---
+    if not matched and health_hit:
+        norm_val = normalize_value(val_str, "health")
+        if targeted_request:
+            if norm_val != targeted_request.subject_identifier:
+                return
+        key = (namespace, doc_id, field_path, norm_val, "health") + scope
+        if key not in seen:
+            finding = {
+            "collection": namespace,
+            "document_id": doc_id,
+            "field_path": field_path,
+            "value": val_str[:200],
+            "raw_value_snippet": val_str[:200],
+            "type": "health",
+            "confidence": 0.75,
+            "mapped_laws": map_to_laws("health"),
+            "detectors": ["keyword"],
+            "timestamp": datetime.utcnow(),
+        }
+            if targeted_request:
+                finding["dsar_id"] = targeted_request.dsar_id
+                finding["dsar_type"] = targeted_request.dsar_type.value
+                finding["scan_type"] = "TARGETED"
+            seen[key] = finding
+            matched = True
+        else:
+            seen[key]["detectors"].append("keyword")
+
+    # --- Field name heuristic ---
+    if targeted_request:
+        for p_type, keywords in FIELD_HEURISTICS.items():
+            if any(k in lname for k in keywords):
+                norm_val = normalize_value(val_str, p_type)
+                if targeted_request:
+                    if norm_val != targeted_request.subject_identifier:
+                        continue
+                key = (namespace, doc_id, field_path, norm_val, p_type) + scope
+                if key not in seen:
+                    finding = {
+                    "collection": namespace,
+                    "document_id": doc_id,
+                    "field_path": field_path,
+                    "value": val_str[:200],
+                    "raw_value_snippet": val_str[:200],
+                    "type": p_type,
+                    "confidence": 0.6,
+                    "mapped_laws": map_to_laws(p_type),
+                    "detectors": ["field-name-heuristic"],
+                    "timestamp": datetime.utcnow()
+                }
+                    if targeted_request:
+                        finding["dsar_id"] = targeted_request.dsar_id
+                        finding["dsar_type"] = targeted_request.dsar_type.value
+                        finding["scan_type"] = "TARGETED"
+                    seen[key] = finding
+                    matched = True
+                else:
+                    seen[key]["detectors"].append("field-name-heuristic")
+                break
+
+def _candidate_values(field_path: str, val_str: str, hits: Dict[str, str], health_hit: str) -> set:
+    """Every normalized value a targeted request could be matched against for this field."""
+    if TOKEN_PATTERN.fullmatch(val_str.strip()):
+        return {val_str.strip()}
+    candidates = {normalize_value(value, p_type) for p_type, value in hits.items() if value}
+    if health_hit:
+        candidates.add(normalize_value(val_str, "health"))
+    lname = field_path.lower()
+    for p_type, keywords in FIELD_HEURISTICS.items():
+        if any(k in lname for k in keywords):
+            candidates.add(normalize_value(val_str, p_type))
+    return candidates
+
+def scan_documents(namespace: str, docs: Iterable[dict],
+                   targeted_request: TargetedScanRequest = None,
+                   targeted_requests: List[TargetedScanRequest] = None) -> Dict[Tuple, Dict[str, Any]]:
+    """
+    Scan documents of one collection ("db.collection") for PII/PHI.
+    With targeted requests, each field's normalized values are looked up in a
+    hash map of subject identifiers, so any number of DSARs costs one pass;
+    findings carry the dsar_id of the request they matched.
+    Returns the collection's findings keyed for deduplication.
+    """
+    requests = list(targeted_requests or [])
+    if targeted_request:
+        requests.insert(0, targeted_request)
+    subjects = {}
+    for order, request in enumerate(requests):
+        subjects.setdefault(request.subject_identifier, []).append((order, request))
+
+    seen = {}
+    for doc in docs:
+        doc_id = str(doc.get("_id", ""))
+        flat = flatten_doc(doc)
+
+        for field_path, val_str in flat.items():
+            if not val_str.strip():
+                continue
+
+            hits = pii_detector.search(val_str)
+            health_hit = hits.pop("health", None)
+            if not subjects:
+                _scan_field(seen, namespace, doc_id, field_path, val_str, hits, health_hit)
+                continue
+
+            matching = {}
+            for norm_val in _candidate_values(field_path, val_str, hits, health_hit):
+                matching.update(subjects.get(norm_val, ()))
+            for order in sorted(matching):
+                _scan_field(seen, namespace, doc_id, field_path, val_str, hits, health_hit,
+                            targeted_request=matching[order])
+
+    return seen
+
+def score_findings(seen: Dict[Tuple, Dict[str, Any]]) -> None:
+    """Set each finding's confidence from the combination of detectors that hit it."""
+    for finding in seen.values():
+        detectors = set(finding["detectors"])
+        if detectors == {"regex"}:
+            finding["confidence"] = 0.95
+        elif detectors == {"keyword"}:
+            finding["confidence"] = 0.75
+        elif detectors == {"field-name-heuristic"}:
+            finding["confidence"] = 0.60
+        elif detectors == {"regex", "field-name-heuristic"}:
+            finding["confidence"] = 0.97
+        elif detectors == {"regex", "keyword"}:
+            finding["confidence"] = 0.96
+        elif len(detectors) == 3:
+            finding["confidence"] = 0.99
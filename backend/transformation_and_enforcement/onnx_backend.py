@@ -0,0 +1,52 @@
+import logging
+from pathlib import Path
+from config import DSAR_ONNX_DIR
+
+logger = logging.getLogger(__name__)
+
+# ONNX Runtime backend for the zero-shot DSAR classifier.
+#
+# The Hugging Face model is exported to ONNX once, quantized with dynamic
+# int8 weights (activations stay fp32, so no calibration data is needed)
+# and cached under DSAR_ONNX_DIR. Later loads reuse the quantized file. The
+# result is wrapped in a regular transformers zero-shot pipeline, so callers
+# can't tell the backends apart. Needs optimum[onnxruntime].
+
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+QUANTIZED_FILE = "model_quantized.onnx"
+
+def quantized_model_dir(model_name: str, base_dir: str = DSAR_ONNX_DIR) -> Path:
+    return Path(base_dir) / model_name.replace("/", "__")
+
+def export_quantized(model_name: str, base_dir: str = DSAR_ONNX_DIR) -> Path:
+    """Export model_name to ONNX and quantize it to dynamic int8; returns the output directory."""
+    from transformers import AutoTokenizer
+
+    out_dir = quantized_model_dir(model_name, base_dir)
+    logger.info(f"Exporting {model_name} to ONNX and quantizing to int8 in {out_dir}")
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    quantizer = ORTQuantizer.from_pretrained(model)
+    # avx2 kernels run on any x86-64 CPU we deploy to; per-tensor keeps parity closest
+    qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=out_dir, quantization_config=qconfig)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(out_dir)
+    return out_dir
+
+def load_onnx_pipeline(model_name: str, base_dir: str = DSAR_ONNX_DIR):
+    """Zero-shot pipeline backed by the quantized ONNX model, exporting it on first use."""
+    if not ONNX_AVAILABLE:
+        raise ImportError("The onnx DSAR backend needs optimum[onnxruntime]")
+    from transformers import AutoTokenizer, pipeline
+
+    out_dir = quantized_model_dir(model_name, base_dir)
+    if not (out_dir / QUANTIZED_FILE).exists():
+        export_quantized(model_name, base_dir)
+    model = ORTModelForSequenceClassification.from_pretrained(out_dir, file_name=QUANTIZED_FILE)
+    tokenizer = AutoTokenizer.from_pretrained(out_dir)
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
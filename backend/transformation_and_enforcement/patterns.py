@@ -1,4 +1,5 @@
 import re
+from enum import Enum
 
 DSAR_PATTERNS = {
     "access": re.compile(
@@ -68,10 +69,35 @@ DSAR_PATTERNS = {
     )
 }
 
+# Privacy vocabulary: an email mentioning none of these can't be a DSAR, so the
+# zero-shot model is skipped for it (first tier of the DSAR cascade)
+DSAR_VOCABULARY = re.compile(
+    r"\b("
+    r"data|information|personal|details|records|privacy|private|"
+    r"gdpr|ccpa|dpdp|dsar|consent|"
+    r"delet\w*|eras\w*|remov\w*|wip\w*|forget|forgotten|trace of me|about me|"
+    r"rectif\w*|correct\w*|amend\w*|portab\w*|export\w*|transfer\w*|hand\w* over|my history|database|"
+    r"object\w*|restrict\w*|complain\w*|"
+    r"unsubscrib\w*|opt[- ]?out|marketing|newsletter|mailing list|"
+    r"stop (?:sending|emailing|contacting|tracking|processing|using)|"
+    r"tracking|cookies|policy|my account"
+    r")\b",
+    re.IGNORECASE
+)
+
 DSAR_LABELS = ["access", "delete", "rectify", "portability", "object", 
     "withdraw_consent", "restrict_processing", "complaint", 
     "transparency", "marketing_opt_out", "unsubscribe", "privacy_policy_info"]    
 
+class DSARType(str, Enum):
+    """DSAR request types"""
+    ACCESS = "access"
+    DELETE = "delete"
+    RECTIFY = "rectify"
+    RESTRICT_PROCESSING = "restrict_processing"
+    PORTABILITY = "portability"
+    OBJECT_TO_PROCESSING = "object_to_processing"
+
 # --- Regex patterns for PII/PHI (MVP) ---
 PII_PATTERNS = {
     "aadhaar": re.compile(r"\b[2-9][0-9]{3}[\s-]?[0-9]{4}[\s-]?[0-9]{4}\b"),
@@ -87,6 +113,24 @@ PII_PATTERNS = {
 }
 HEALTH_KEYWORDS = re.compile(r"\b(diabetes|cancer|asthma|blood sugar|diagnosis|patient|prescription|treatment|allergy)\b", re.IGNORECASE)
 
+# Minimum character counts a value must contain before a detector can possibly match.
+# Keys are fields of detectors.value_signature(); missing fields are unconstrained.
+PII_PREFILTERS = {
+    "aadhaar": {"digits": 12},
+    "pan": {"digits": 4, "letters": 6},
+    "email": {"at": 1, "dots": 1},
+    "phone": {"digits": 10},
+    "credit_card": {"digits": 13},
+    "ssn": {"digits": 9, "hyphens": 2},
+    "ip_address": {"digits": 4, "dots": 3},
+    "dob": {"digits": 6},
+    "passport": {"digits": 7, "letters": 1},
+    "health": {"letters": 6},
+}
+
+# Tokens minted by the token vault (TOKEN_ + 20 hex digits of a tenant HMAC)
+TOKEN_PATTERN = re.compile(r"TOKEN_[0-9A-F]{20}")
+
 COMPLIANCE_MAP = {
     "aadhaar": ["DPDP"],
     "pan": ["DPDP", "GDPR"],
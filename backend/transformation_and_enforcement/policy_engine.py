@@ -1,6 +1,6 @@
 from enum import Enum
 from typing import List, Dict, Any
-from transformation_and_enforcement.transformations import TransformationType, DSARType, DataType, ComplianceLaw, DSAR_POLICY_MAP, LAW_OVERRIDES
+from transformation_and_enforcement.transformations import TransformationType, DSARType, DataType, ComplianceLaw, DSAR_POLICY_MAP, LAW_OVERRIDES, compliance_laws
 from datetime import datetime
 import uuid
 
@@ -84,11 +84,7 @@ def resolve(findings: List[Dict[str, Any]]) -> List[TransformationDecision]:
     for finding in findings:
         pii_type = finding.get("type", "")
 
-        mapped_laws = [
-            ComplianceLaw(l.lower())
-            for l in finding.get("mapped_laws", [])
-            if l.lower() in ComplianceLaw._value2member_map_
-        ]
+        mapped_laws = compliance_laws(finding.get("mapped_laws", []))
 
         # PII → DataType mapping
         data_type = {
@@ -138,11 +134,7 @@ def resolve_dsar(findings: List[Dict[str, Any]]) -> List[TransformationDecision]
         pii_type = finding.get("type", "")
         dsar_type = DSARType(finding.get("dsar_type"))
 
-        mapped_laws = [
-            ComplianceLaw(l.lower())
-            for l in finding.get("mapped_laws", [])
-            if l.lower() in ComplianceLaw._value2member_map_
-        ]
+        mapped_laws = compliance_laws(finding.get("mapped_laws", []))
 
         data_type = {
             "email": DataType.IDENTIFIERS,
@@ -0,0 +1,164 @@
+import hmac
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from config import PSEUDONYM_VAULT_PATH, PSEUDONYM_VAULT_SECRET, PSEUDONYM_CACHE_MAX_ENTRIES
+
+# Pseudonym vault: value -> pseudonym, the same in every process.
+#
+# Mappings live in a SQLite file (WAL mode), so uvicorn workers and the MCP
+# server share them and they survive restarts; a bounded LRU in front of it
+# answers repeats without touching the file. Values are never stored: rows
+# and cache entries are keyed by an HMAC of the value, so the vault can hand
+# out a value's pseudonym but can't be read back into the originals.
+#
+# get_or_create_many resolves a whole batch in one write transaction: it
+# reads the existing mappings and inserts the missing ones while holding the
+# database write lock, so two processes can't mint different pseudonyms for
+# the same value.
+
+_SQLITE_MAX_PARAMS = 500
+
+class PseudonymVault:
+    """
+    get_or_create_many([(value, pii_type), ...], generate) returns one
+    (pseudonym, created) pair per item; generate(pii_type, n) makes the
+    pseudonym for the n-th mapping in the vault.
+    """
+
+    def __init__(self, path: str = PSEUDONYM_VAULT_PATH, secret: str = PSEUDONYM_VAULT_SECRET,
+                 max_entries: int = PSEUDONYM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._secret = secret.encode()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.store_hits = 0
+        self.created = 0
+        self.round_trips = 0
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; isolation_level=None so transactions are explicit
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        self._conn().execute("""
+        CREATE TABLE IF NOT EXISTS pseudonyms (
+            id INTEGER PRIMARY KEY,
+            value_key TEXT UNIQUE NOT NULL,
+            pseudonym TEXT NOT NULL,
+            pii_type TEXT,
+            created_at INTEGER
+        )
+        """)
+
+    def key(self, value: str) -> str:
+        return hmac.new(self._secret, value.encode("utf-8", "surrogatepass"), hashlib.sha256).hexdigest()
+
+    def get_or_create_many(self, items: List[Tuple[str, str]],
+                           generate: Callable[[str, int], str]) -> List[Tuple[str, bool]]:
+        keys = [self.key(value) for value, _ in items]
+        found: Dict[str, str] = {}
+        with self._lock:
+            for key in keys:
+                pseudonym = self._entries.get(key)
+                if pseudonym is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = pseudonym
+            self.hits += len(found)
+
+        missing: Dict[str, str] = {}
+        for key, (_, pii_type) in zip(keys, items):
+            if key not in found and key not in missing:
+                missing[key] = pii_type
+        created = set()
+        if missing:
+            stored, created = self._resolve(missing, generate)
+            found.update(stored)
+            with self._lock:
+                self.store_hits += len(stored) - len(created)
+                self.created += len(created)
+                for key, pseudonym in stored.items():
+                    self._entries[key] = pseudonym
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        results, first_seen = [], set()
+        for key in keys:
+            # Only the first occurrence of a value minted in this call counts as created
+            is_new = key in created and key not in first_seen
+            first_seen.add(key)
+            results.append((found[key], is_new))
+        return results
+
+    def _resolve(self, missing: Dict[str, str], generate: Callable[[str, int], str]) -> Tuple[Dict[str, str], set]:
+        """Read, and insert where absent, the mappings for missing in one write transaction."""
+        conn = self._conn()
+        stored: Dict[str, str] = {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            keys = list(missing)
+            for i in range(0, len(keys), _SQLITE_MAX_PARAMS):
+                chunk = keys[i:i + _SQLITE_MAX_PARAMS]
+                rows = conn.execute(
+                    f"SELECT value_key, pseudonym FROM pseudonyms WHERE value_key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                stored.update(rows)
+
+            new_keys = [key for key in keys if key not in stored]
+            if new_keys:
+                # The write lock is held, so these ids can't be taken by another process
+                next_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM pseudonyms").fetchone()[0] + 1
+                now = int(time.time())
+                rows = []
+                for n, key in enumerate(new_keys, start=next_id):
+                    pseudonym = generate(missing[key], n)
+                    stored[key] = pseudonym
+                    rows.append((n, key, pseudonym, missing[key], now))
+                conn.executemany(
+                    "INSERT INTO pseudonyms (id, value_key, pseudonym, pii_type, created_at) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self.round_trips += 1
+        return stored, set(new_keys)
+
+    def get(self, value: str) -> Optional[str]:
+        """The pseudonym for value, if one was ever created."""
+        key = self.key(value)
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+        row = self._conn().execute("SELECT pseudonym FROM pseudonyms WHERE value_key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM pseudonyms").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cached": len(self._entries),
+                "hits": self.hits,
+                "store_hits": self.store_hits,
+                "created": self.created,
+                "round_trips": self.round_trips,
+            }
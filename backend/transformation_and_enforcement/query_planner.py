@@ -0,0 +1,123 @@
+import re
+from typing import List, Dict, Any, Iterable, Optional
+from transformation_and_enforcement.mongo_scanner import TargetedScanRequest, FIELD_HEURISTICS
+
+# Pushdown planning for targeted (DSAR) Mongo scans.
+#
+# The planner turns subject identifiers into server-side filters that
+# documents able to produce a targeted finding satisfy; the fetched documents
+# still go through scan_documents, so findings keep their exact client-side
+# semantics while non-matching documents never leave Mongo. It emits up to two
+# queries, run separately so the first can be answered from indexes alone:
+#   indexed   equality and case-sensitive anchored-prefix branches on indexed
+#             fields (the subject as given, lower- and upper-cased)
+#   residual  unanchored case-insensitive regexes on the other profiled
+#             fields, plus documents with fields the profile never saw,
+#             sub-documents or arrays (a collection scan)
+# Together they cover every document that can match, except subjects
+# mentioned mid-value or in mixed case in an indexed field. indexed_only
+# drops the residual query, trading recall for index-only lookups.
+
+# Normalized DOBs (YYYY-MM-DD) can come from any date spelling, so they can't be pushed down
+_NORMALIZED_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Longest digit string that still fits a Mongo long
+_MAX_INT_DIGITS = 18
+
+def subject_regex(subject: str) -> Optional[str]:
+    """
+    Regex matching every raw value that can normalize to subject, or None.
+    Digit-only subjects come from digit-stripping normalizers (phone, aadhaar,
+    card, ssn), so any characters may sit between the digits; everything else
+    is normalized by case only and appears as a case-insensitive substring.
+    """
+    subject = (subject or "").strip()
+    if not subject or _NORMALIZED_DATE.match(subject):
+        return None
+    if subject.isdigit():
+        return r"\D*".join(subject)
+    return re.escape(subject)
+
+def candidate_fields(profile: List[Dict[str, Any]], min_likelihood: float) -> List[str]:
+    """Field paths the schema profile keeps for scanning (see pruned_projection)."""
+    return [p["field"] for p in profile
+            if p["likelihood"] >= min_likelihood and "$" not in p["field"]]
+
+def indexed_fields(index_information: Dict[str, Dict[str, Any]]) -> set:
+    """Leading key of every index, from Collection.index_information()."""
+    return {info["key"][0][0] for info in index_information.values() if info.get("key")}
+
+def _name_matches(field: str) -> bool:
+    lname = field.lower()
+    return any(k in lname for keywords in FIELD_HEURISTICS.values() for k in keywords)
+
+def _residual_branch(fields: List[str]) -> Dict[str, Any]:
+    """
+    Documents holding anything the field branches can't vouch for: a
+    top-level key that isn't a profiled scalar field (unseen in the sample,
+    or a parent of nested fields), or any sub-document or array value.
+    """
+    closed = sorted({f for f in fields if "." not in f} | {"_id"})
+    return {"$expr": {"$anyElementTrue": [{"$map": {
+        "input": {"$objectToArray": "$$ROOT"},
+        "in": {"$or": [
+            {"$not": [{"$in": ["$$this.k", closed]}]},
+            {"$in": [{"$type": "$$this.v"}, ["object", "array"]]},
+        ]},
+    }}]}}
+
+def _case_variants(subject: str) -> List[str]:
+    """Stored spellings an indexed branch matches exactly: as given, lower and upper case."""
+    return sorted({subject, subject.lower(), subject.upper()})
+
+def _indexed_branches(field: str, subject: str) -> List[Dict[str, Any]]:
+    """Branches Mongo answers from an index on field: equality and prefix ranges."""
+    if subject.isdigit():
+        branches = [{field: {"$regex": "^" + subject}}]
+        if len(subject) <= _MAX_INT_DIGITS:
+            branches.append({field: int(subject)})
+        return branches
+    # No $options: a case-insensitive regex can't be turned into index bounds
+    return [{field: {"$regex": "^" + re.escape(variant)}} for variant in _case_variants(subject)]
+
+def plan_targeted_queries(requests: Iterable[TargetedScanRequest], fields: List[str],
+                          indexed: Iterable[str] = (), indexed_only: bool = False) -> Optional[List[Dict[str, Any]]]:
+    """
+    Mongo filters whose results together hold every document that can match
+    any of the requests, or None when some subject can't be pushed down (the
+    caller then scans). The caller runs each filter and merges the results.
+
+    The first filter, when any field is indexed, only has branches on
+    indexed fields that the index serves (see _indexed_branches). The
+    residual filter has an unanchored case-insensitive regex per subject on
+    every other field (plus an equality branch for digit subjects stored as
+    numbers) and the _residual_branch; with indexed_only it is omitted.
+    """
+    subjects = {(r.subject_identifier or "").strip() for r in requests}
+    patterns = {}
+    for subject in subjects:
+        pattern = subject_regex(subject)
+        if pattern is None:
+            return None
+        patterns[subject] = pattern
+    if not patterns or not fields:
+        return None
+
+    indexed = set(indexed) & set(fields)
+    queries = []
+    index_branches = [branch for field in sorted(indexed) for subject in sorted(patterns)
+                      for branch in _indexed_branches(field, subject)]
+    if index_branches:
+        queries.append({"$or": index_branches})
+    if indexed_only:
+        return queries or None
+
+    branches = []
+    for field in sorted(set(fields) - indexed, key=lambda f: (not _name_matches(f), f)):
+        for subject, pattern in sorted(patterns.items()):
+            branches.append({field: {"$regex": pattern, "$options": "i"}})
+            if subject.isdigit() and len(subject) <= _MAX_INT_DIGITS:
+                branches.append({field: int(subject)})
+    branches.append(_residual_branch(fields))
+    queries.append({"$or": branches})
+    return queries
@@ -0,0 +1,159 @@
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Pattern
+from config import RESULT_CACHE_SQLITE_MAX_ROWS
+
+# Content-addressed cache for classifier and detector outputs.
+#
+# Reply chains, newsletters and forwarded threads repeat the same text on
+# every scan. Results are keyed by a hash of the normalized text plus a
+# version string naming whatever produced them (model, backend, label set,
+# pattern sources), so changing any of those simply stops old entries from
+# matching. Only derived results are stored, never the text itself.
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_whitespace(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+def exact(text: str) -> str:
+    """For results that depend on every character (e.g. regex findings)."""
+    return text
+
+def normalize_uncased(text: str) -> str:
+    """For uncased models, where case can't change the output."""
+    return normalize_whitespace(text).lower()
+
+def version_of(*parts: Any) -> str:
+    """Short stable digest of whatever determines a cached result."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+def patterns_version(patterns: Dict[str, Pattern]) -> str:
+    return version_of([(name, p.pattern, p.flags) for name, p in patterns.items()])
+
+class ResultCache:
+    """
+    Bounded LRU of JSON-serializable results, optionally backed by a SQLite
+    table that survives restarts. Memory misses fall through to SQLite and
+    are promoted on a hit. Thread-safe; one instance per kind of result.
+    """
+
+    def __init__(self, namespace: str, version: str, max_entries: int,
+                 normalize: Callable[[str], str] = normalize_whitespace,
+                 sqlite_path: str = None, sqlite_max_rows: int = RESULT_CACHE_SQLITE_MAX_ROWS):
+        self.namespace = namespace
+        self.version = version
+        self.max_entries = max_entries
+        self.normalize = normalize
+        self.sqlite_path = sqlite_path or None
+        self.sqlite_max_rows = sqlite_max_rows
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self.hits = 0
+        self.sqlite_hits = 0
+        self.misses = 0
+        if self.sqlite_path:
+            self._init_sqlite()
+
+    # SQLite tier
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread (scans run on the event loop and worker threads)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.sqlite_path, timeout=5)
+            self._local.conn = conn
+        return conn
+
+    def _init_sqlite(self):
+        conn = self._conn()
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS result_cache (
+            namespace TEXT,
+            key TEXT,
+            value TEXT,
+            created_at INTEGER,
+            PRIMARY KEY (namespace, key)
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS result_cache_age ON result_cache (namespace, created_at)")
+        conn.commit()
+
+    def _sqlite_get(self, key: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT value FROM result_cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _sqlite_put(self, key: str, value: Any):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO result_cache (namespace, key, value, created_at) VALUES (?, ?, ?, ?)",
+            (self.namespace, key, json.dumps(value), int(time.time())),
+        )
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            # Keep the newest sqlite_max_rows rows of this namespace
+            conn.execute("""
+            DELETE FROM result_cache WHERE namespace = ? AND key NOT IN (
+                SELECT key FROM result_cache WHERE namespace = ?
+                ORDER BY created_at DESC LIMIT ?
+            )
+            """, (self.namespace, self.namespace, self.sqlite_max_rows))
+        conn.commit()
+
+    # Public API
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256(self.normalize(text).encode("utf-8", "surrogatepass")).hexdigest()
+        return f"{self.version}:{digest}"
+
+    def get(self, text: str, key: str = None) -> Optional[Any]:
+        key = key or self.key(text)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        value = self._sqlite_get(key) if self.sqlite_path else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.sqlite_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, text: str, value: Any, key: str = None):
+        key = key or self.key(text)
+        with self._lock:
+            self._remember(key, value)
+        if self.sqlite_path:
+            self._sqlite_put(key, value)
+
+    def _remember(self, key: str, value: Any):
+        """Caller holds the lock."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.sqlite_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "sqlite_hits": self.sqlite_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.sqlite_hits) / lookups, 3) if lookups else 0.0,
+            }
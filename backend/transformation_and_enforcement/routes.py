@@ -0,0 +1,111 @@
+import json
+from typing import Optional, List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from user_auth.core import extract_and_verify_token
+from temp_storage import store_data, init_db
+from chat.routes import _sessions
+from transformation_and_enforcement.core import scan_mongo_stream, iter_gmail_scan, dsar_cascade
+from integrations.rate_limiter import gmail_limiters
+
+router_scan = APIRouter()
+
+# Raw matched values never leave the backend in streamed events
+SENSITIVE_FIELDS = {"value", "raw_value_snippet", "normalized_value"}
+
+def _event(payload: Dict[str, Any]) -> str:
+    """One NDJSON line."""
+    return json.dumps(payload, default=str) + "\n"
+
+def _public(findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{k: v for k, v in f.items() if k not in SENSITIVE_FIELDS} for f in findings]
+
+def _check_session(session_id: Optional[str], admin_email: str):
+    """Findings are appended to the chat session only if it is live and belongs to this admin."""
+    if not session_id:
+        return
+    state = _sessions.get(session_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="No active session found. Run a scan first.")
+    if state.get("admin_email") != admin_email:
+        raise HTTPException(status_code=403, detail="Unauthorized session access")
+    init_db()
+
+def _store(session_id: Optional[str], findings: List[Dict[str, Any]], source: str):
+    if session_id and findings:
+        # Same JSON shape the MCP tools produce (timestamps as strings)
+        store_data(session_id, json.loads(json.dumps(findings, default=str)), source)
+
+# ─────────────────────────────────────────────
+# GET /scan/mongo/stream  (NDJSON)
+# ─────────────────────────────────────────────
+@router_scan.get("/mongo/stream")
+def stream_mongo_scan(
+    session_id: Optional[str] = None,
+    incremental: bool = False,
+    admin_email: str = Depends(extract_and_verify_token),
+):
+    _check_session(session_id, admin_email)
+
+    def events():
+        total = 0
+        try:
+            for batch in scan_mongo_stream(admin_email, incremental=incremental):
+                if not batch:
+                    continue
+                total += len(batch)
+                _store(session_id, batch, "mongo_scan")
+                yield _event({"event": "findings", "source": "mongo", "findings": _public(batch)})
+        except Exception as e:
+            yield _event({"event": "error", "source": "mongo", "message": str(e)})
+            return
+        yield _event({"event": "done", "source": "mongo", "total": total})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+# ─────────────────────────────────────────────
+# GET /scan/gmail/stream  (NDJSON)
+# ─────────────────────────────────────────────
+@router_scan.get("/gmail/stream")
+async def stream_gmail_scan(
+    session_id: Optional[str] = None,
+    full_sync: bool = False,
+    admin_email: str = Depends(extract_and_verify_token),
+):
+    _check_session(session_id, admin_email)
+
+    async def events():
+        total = 0
+        try:
+            async for batch in iter_gmail_scan(admin_email, full_sync=full_sync):
+                if not batch:
+                    continue
+                total += len(batch)
+                _store(session_id, batch, "gmail_scan")
+                yield _event({"event": "findings", "source": "gmail", "findings": _public(batch)})
+        except Exception as e:
+            yield _event({"event": "error", "source": "gmail", "message": str(e)})
+            return
+        yield _event({"event": "done", "source": "gmail", "total": total})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+# ─────────────────────────────────────────────
+# GET /scan/gmail/limits
+# ─────────────────────────────────────────────
+@router_scan.get("/gmail/limits")
+async def gmail_limits(admin_email: str = Depends(extract_and_verify_token)):
+    """Current adaptive concurrency window and throttle counters for this admin's Gmail scans."""
+    return {"success": True, "limiters": gmail_limiters.stats(admin_email)}
+
+# ─────────────────────────────────────────────
+# GET /scan/gmail/classifier
+# ─────────────────────────────────────────────
+@router_scan.get("/gmail/classifier")
+async def gmail_classifier_stats(admin_email: str = Depends(extract_and_verify_token)):
+    """
+    Fraction of this admin's scanned emails settled by each DSAR cascade tier.
+    Model batching and result caches are shared by all tenants, so their
+    stats are only logged (see iter_gmail_scan), never served.
+    """
+    return {"success": True, "cascade": dsar_cascade.stats(admin_email)}
@@ -0,0 +1,174 @@
+import logging
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from pymongo.collection import Collection
+from config import ScanState, SCAN_MODIFIED_FIELD
+
+logger = logging.getLogger(__name__)
+
+# Per-tenant, per-collection watermarks for incremental Mongo scans.
+#   last_id           highest _id scanned so far (new documents are those above it)
+#   last_modified     highest SCAN_MODIFIED_FIELD value scanned among older documents,
+#                     as stored (datetime, string or number: BSON only compares like types)
+#   last_modified_id  _id of the document holding last_modified, the tiebreaker for
+#                     documents sharing that value
+# Modified documents are read in (SCAN_MODIFIED_FIELD, _id) order, which only an
+# index on {SCAN_MODIFIED_FIELD: 1, _id: 1} serves without scanning and sorting
+# the whole collection; fetch_changed_documents warns once per collection without it.
+# The same document caches the collection's schema profile (field pruning).
+# Gmail keeps its mailbox history cursor under the GMAIL_NAMESPACE document.
+
+GMAIL_NAMESPACE = "gmail:me"
+
+# Collections already warned about a missing modified-field index
+_unindexed_warned = set()
+
+def get_watermark(admin_email: str, namespace: str) -> Optional[Dict[str, Any]]:
+    """Stored watermark for one collection, or None if it was never scanned incrementally."""
+    return ScanState.find_one(
+        {"admin_email": admin_email, "namespace": namespace},
+        {"_id": 0, "last_id": 1, "last_modified": 1, "last_modified_id": 1},
+    )
+
+def save_watermark(admin_email: str, namespace: str, watermark: Dict[str, Any]):
+    ScanState.update_one(
+        {"admin_email": admin_email, "namespace": namespace},
+        {"$set": {**watermark, "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+def reset_watermarks(admin_email: str, namespaces: List[str] = None):
+    """Forget watermarks so the next incremental scan starts from scratch."""
+    query = {"admin_email": admin_email}
+    if namespaces:
+        query["namespace"] = {"$in": namespaces}
+    ScanState.update_many(query, {"$unset": {"last_id": "", "last_modified": "", "last_modified_id": "",
+                                              "history_id": ""}})
+
+def get_gmail_history_id(admin_email: str) -> Optional[str]:
+    """historyId the last completed Gmail sync ended at, or None."""
+    state = ScanState.find_one({"admin_email": admin_email, "namespace": GMAIL_NAMESPACE},
+                               {"_id": 0, "history_id": 1})
+    return state.get("history_id") if state else None
+
+def save_gmail_history_id(admin_email: str, history_id: str):
+    ScanState.update_one(
+        {"admin_email": admin_email, "namespace": GMAIL_NAMESPACE},
+        {"$set": {"history_id": history_id, "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+def get_schema_profile(admin_email: str, namespace: str, ttl_hours: float) -> Optional[List[Dict[str, Any]]]:
+    """Cached field profile for one collection, or None if missing or older than ttl_hours."""
+    state = ScanState.find_one(
+        {"admin_email": admin_email, "namespace": namespace,
+         "profiled_at": {"$gte": datetime.utcnow() - timedelta(hours=ttl_hours)}},
+        {"_id": 0, "schema_profile": 1},
+    )
+    return state.get("schema_profile") if state else None
+
+def save_schema_profile(admin_email: str, namespace: str, profile: List[Dict[str, Any]]):
+    # Stored as a list: field paths contain dots, which Mongo keys should not
+    ScanState.update_one(
+        {"admin_email": admin_email, "namespace": namespace},
+        {"$set": {"schema_profile": profile, "profiled_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+def has_modified_index(collection: Collection, modified_field: str) -> bool:
+    """True if an index leads with (modified_field, _id), in either direction."""
+    for info in collection.index_information().values():
+        key = [tuple(k) for k in info.get("key", [])[:2]]
+        if key in ([(modified_field, 1), ("_id", 1)], [(modified_field, -1), ("_id", -1)]):
+            return True
+    return False
+
+def _warn_unindexed(collection: Collection, modified_field: str):
+    name = collection.full_name
+    if name in _unindexed_warned:
+        return
+    _unindexed_warned.add(name)
+    if not has_modified_index(collection, modified_field):
+        logger.warning(f"Incremental scan of {name} has no index on ({modified_field}, _id): every run "
+                       f"scans and sorts the whole collection. Create it with "
+                       f"createIndex({{{modified_field}: 1, _id: 1}}).")
+
+def _later(doc: dict, modified_field: str, watermark: Dict[str, Any]) -> bool:
+    """doc's (modified_field, _id) is past the watermark's, compared within the stored types."""
+    value, last = doc.get(modified_field), watermark["last_modified"]
+    if value is None or type(value) is not type(last):
+        return False
+    if value != last:
+        return value > last
+    last_id = watermark.get("last_modified_id")
+    return last_id is None or (type(doc["_id"]) is type(last_id) and doc["_id"] > last_id)
+
+def fetch_changed_documents(collection: Collection, watermark: Optional[Dict[str, Any]],
+                            limit: int, modified_field: str = SCAN_MODIFIED_FIELD,
+                            projection: Dict[str, int] = None) -> Tuple[List[dict], Dict[str, Any]]:
+    """
+    Documents inserted or modified since the watermark, plus the advanced watermark.
+
+    New documents are read in _id order above last_id (served by the _id index).
+    Older documents are re-read only if their modified_field moved past
+    (last_modified, last_modified_id), in (modified_field, _id) order, so
+    documents sharing a value at the limit boundary are picked up next run.
+    Each side is capped at limit and resumes from where it stopped, so a
+    backlog is worked off over consecutive runs. Once the modified side is
+    caught up, the modified watermark also moves past the newest inserted
+    document, so new documents aren't rescanned as modified next run.
+
+    The modified watermark always comes from values read from the
+    collection, never the app server's clock: writers' clocks may differ,
+    and the field may be stored as a string or number.
+    """
+    watermark = dict(watermark or {})
+    last_id = watermark.get("last_id")
+    last_modified = watermark.get("last_modified")
+    docs = []
+    if projection and modified_field in projection:
+        # The watermark is read back from the documents themselves
+        projection = {k: v for k, v in projection.items() if k != modified_field} or None
+
+    caught_up = True
+    if modified_field and last_id is not None and last_modified is not None:
+        _warn_unindexed(collection, modified_field)
+        after = [{modified_field: {"$gt": last_modified}}]
+        if watermark.get("last_modified_id") is not None:
+            after.append({modified_field: last_modified, "_id": {"$gt": watermark["last_modified_id"]}})
+        modified = list(collection.find(
+            {"_id": {"$lte": last_id}, "$or": after},
+            projection, limit=limit,
+        ).sort([(modified_field, 1), ("_id", 1)]))
+        if modified:
+            watermark["last_modified"] = modified[-1].get(modified_field)
+            watermark["last_modified_id"] = modified[-1]["_id"]
+        caught_up = len(modified) < limit
+        docs.extend(modified)
+
+    query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+    inserted = list(collection.find(query, projection, limit=limit).sort("_id", 1))
+    if inserted:
+        watermark["last_id"] = inserted[-1]["_id"]
+    docs.extend(inserted)
+
+    if modified_field and watermark.get("last_modified") is not None and caught_up:
+        # Inserted documents were just scanned in full; with older modified
+        # documents still pending, the watermark must stay behind those
+        for doc in inserted:
+            if _later(doc, modified_field, watermark):
+                watermark["last_modified"] = doc[modified_field]
+                watermark["last_modified_id"] = doc["_id"]
+
+    if modified_field and watermark.get("last_modified") is None and watermark.get("last_id") is not None:
+        # Until documents carry the field: start from the highest value among
+        # those read so far, in its stored type
+        latest = list(collection.find(
+            {"_id": {"$lte": watermark["last_id"]}, modified_field: {"$exists": True, "$ne": None}},
+            {modified_field: 1}, limit=1,
+        ).sort([(modified_field, -1), ("_id", -1)]))
+        if latest:
+            watermark["last_modified"] = latest[0][modified_field]
+            watermark["last_modified_id"] = latest[0]["_id"]
+
+    return docs, watermark
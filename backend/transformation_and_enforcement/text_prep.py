@@ -0,0 +1,147 @@
+import re
+import threading
+from typing import Any, Dict, List, Tuple
+from config import DSAR_MAX_TOKENS, DSAR_MAX_CHUNKS, DSAR_CHUNK_OVERLAP
+from transformation_and_enforcement.patterns import DSAR_VOCABULARY
+
+# Classifier input preparation.
+#
+# The zero-shot model only needs what the sender wrote in this message:
+# quoted replies, signatures and legal footers add tokens (and cost, one NLI
+# pass per label) without adding intent. What's left is split into chunks
+# of at most DSAR_MAX_TOKENS tokens, each prefixed with the sender and
+# subject, and at most DSAR_MAX_CHUNKS of them are classified, so the model
+# cost of an email is bounded no matter how long it is. When there are more,
+# chunks mentioning privacy vocabulary are preferred. Chunk scores are
+# combined by taking each label's maximum.
+#
+# Tokens are estimated with a word/punctuation split rather than the model's
+# tokenizer: it is cheap, needs no model, and keeps chunk boundaries (and so
+# cache keys) stable across backends. Word-piece tokenizers produce somewhat
+# more tokens for rare words; the pipeline still truncates as a last resort.
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# Start of the quoted message in a reply; everything from here on is dropped
+_REPLY_HEADERS = [
+    re.compile(r"^\s*On\b[^\n]{0,300}\n?[^\n]{0,200}\bwrote:\s*$", re.IGNORECASE | re.MULTILINE),
+    re.compile(r"^\s*-{2,}\s*Original Message\s*-{2,}\s*$", re.IGNORECASE | re.MULTILINE),
+    re.compile(r"^\s*From:[^\n]*\n\s*(Sent|Date):", re.IGNORECASE | re.MULTILINE),
+]
+# Start of the signature or footer
+_SIGNATURE = [
+    re.compile(r"^--\s*$", re.MULTILINE),
+    re.compile(r"^\s*Sent from my \w+", re.IGNORECASE | re.MULTILINE),
+    re.compile(r"^\s*(CONFIDENTIALITY NOTICE|DISCLAIMER)\b", re.IGNORECASE | re.MULTILINE),
+    re.compile(r"^\s*This (e-?mail|message) (and any attachments )?(is|are|may be) confidential", re.IGNORECASE | re.MULTILINE),
+]
+_QUOTED_LINE = re.compile(r"^\s*>.*$\n?", re.MULTILINE)
+_FORWARD_SUBJECT = re.compile(r"^\s*(fwd?|fw)\s*:", re.IGNORECASE)
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+def count_tokens(text: str) -> int:
+    return len(_TOKEN.findall(text))
+
+def _cut_at_first(text: str, patterns: List[re.Pattern]) -> str:
+    cut = len(text)
+    for pattern in patterns:
+        m = pattern.search(text)
+        if m:
+            cut = min(cut, m.start())
+    return text[:cut]
+
+def strip_quoted(body: str) -> str:
+    """Drop the quoted message of a reply and any '>'-quoted lines."""
+    return _QUOTED_LINE.sub("", _cut_at_first(body, _REPLY_HEADERS))
+
+def strip_signature(body: str) -> str:
+    return _cut_at_first(body, _SIGNATURE)
+
+def clean_body(body: str, subject: str = "") -> str:
+    """
+    The part of body the sender wrote. Forwards keep their quoted content
+    (it is what's being forwarded, often the request itself), and a body
+    that would be left empty is kept as is.
+    """
+    cleaned = body if _FORWARD_SUBJECT.match(subject or "") else strip_quoted(body)
+    cleaned = _BLANK_LINES.sub("\n", strip_signature(cleaned)).strip()
+    return cleaned or body.strip()
+
+class TextPreparer:
+    """
+    Turns an email into at most max_chunks classifier inputs of at most
+    max_tokens estimated tokens each, consecutive chunks overlapping by
+    overlap tokens so a sentence on a boundary is seen whole at least once.
+    """
+
+    def __init__(self, max_tokens: int = DSAR_MAX_TOKENS, max_chunks: int = DSAR_MAX_CHUNKS,
+                 overlap: int = DSAR_CHUNK_OVERLAP):
+        self.max_tokens = max_tokens
+        self.max_chunks = max_chunks
+        self.overlap = min(overlap, max_tokens // 2)
+        self._lock = threading.Lock()
+        self.emails = 0
+        self.chunks_total = 0
+        self.truncated = 0
+
+    def chunks(self, header: str, body: str) -> List[str]:
+        """Chunks of body, each prefixed with header (sender and subject)."""
+        header = " ".join(header.split())
+        header_spans = [m.span() for m in _TOKEN.finditer(header)]
+        if len(header_spans) > self.max_tokens // 2:
+            header_spans = header_spans[:self.max_tokens // 2]
+            header = header[:header_spans[-1][1]]
+        budget = self.max_tokens - len(header_spans)
+
+        spans = [m.span() for m in _TOKEN.finditer(body)]
+        windows: List[Tuple[int, int]] = []
+        step = max(budget - self.overlap, 1)
+        for start in range(0, len(spans), step):
+            end = min(start + budget, len(spans))
+            windows.append((spans[start][0], spans[end - 1][1]))
+            if end == len(spans):
+                break
+        truncated = len(windows) > self.max_chunks
+        if truncated:
+            windows = self._select(body, windows)
+
+        chunks = [f"{header} {body[s:e]}".strip() for s, e in windows] or [header]
+        with self._lock:
+            self.emails += 1
+            self.chunks_total += len(chunks)
+            self.truncated += truncated
+        return chunks
+
+    def _select(self, body: str, windows: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """
+        max_chunks of windows, in body order: the first one (the opening
+        usually states the request), then those with privacy vocabulary,
+        then the earliest of the rest.
+        """
+        keep = [0]
+        keep += [i for i, (s, e) in enumerate(windows) if i and DSAR_VOCABULARY.search(body, s, e)]
+        keep += [i for i in range(len(windows)) if i not in keep]
+        return [windows[i] for i in sorted(keep[:self.max_chunks])]
+
+    def email_chunks(self, email: Dict[str, Any]) -> List[str]:
+        subject = email.get("subject") or ""
+        return self.chunks(f"{email.get('from') or ''} {subject}", clean_body(email.get("body") or "", subject))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "emails": self.emails,
+                "chunks": self.chunks_total,
+                "avg_chunks": round(self.chunks_total / self.emails, 2) if self.emails else 0.0,
+                "truncated": self.truncated,
+            }
+
+def merge_max(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-chunk zero-shot results: each label keeps its highest score."""
+    best: Dict[str, float] = {}
+    for result in results:
+        for label, score in zip(result["labels"], result["scores"]):
+            if score > best.get(label, float("-inf")):
+                best[label] = score
+    ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+    return {"labels": [label for label, _ in ranked], "scores": [score for _, score in ranked]}
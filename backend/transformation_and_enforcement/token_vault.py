@@ -0,0 +1,187 @@
+import hmac
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import cipher, TOKEN_VAULT_PATH, TOKEN_VAULT_SECRET, TOKEN_CACHE_MAX_ENTRIES
+from transformation_and_enforcement.patterns import TOKEN_PATTERN
+
+# Token vault: reversible tokens for values (PCI data is tokenized by policy).
+#
+# A token is derived from the value (or a normalized key for it) with a
+# per-tenant HMAC key, so repeated values get the same token without a lookup,
+# the same value gets unrelated tokens in different tenants, and a DSAR
+# subject can be turned into the token its records hold. The vault stores each
+# (tenant, token) once with the value encrypted with the app's Fernet key,
+# so storage grows with distinct values, not occurrences. Lookups go through
+# the (tenant, token) primary key; LRUs of recently seen values and tokens
+# skip the HMAC and the store for hot values on tokenize and detokenize.
+
+_SQLITE_MAX_PARAMS = 500
+
+class TokenVault:
+    def __init__(self, path: str = TOKEN_VAULT_PATH, secret: str = TOKEN_VAULT_SECRET,
+                 max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._secret = secret.encode()
+        self._tenant_keys: Dict[str, bytes] = {}
+        # Hot values, both ways: (tenant, token) -> (value, pii_type) and
+        # (tenant, key) -> token, for tokens known to be stored
+        self._values: "OrderedDict[tuple, str]" = OrderedDict()
+        self._tokens: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.stored = 0
+        self.store_lookups = 0
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        self._conn().execute("""
+        CREATE TABLE IF NOT EXISTS tokens (
+            tenant TEXT NOT NULL,
+            token TEXT NOT NULL,
+            value_enc TEXT NOT NULL,
+            pii_type TEXT,
+            created_at INTEGER,
+            PRIMARY KEY (tenant, token)
+        ) WITHOUT ROWID
+        """)
+
+    def _tenant_key(self, tenant: str) -> bytes:
+        key = self._tenant_keys.get(tenant)
+        if key is None:
+            key = hmac.new(self._secret, f"token:{tenant}".encode(), hashlib.sha256).digest()
+            self._tenant_keys[tenant] = key
+        return key
+
+    def token_for(self, tenant: str, value: str) -> str:
+        """The token value has (or will have) in tenant; doesn't store anything."""
+        digest = hmac.new(self._tenant_key(tenant), value.encode("utf-8", "surrogatepass"), hashlib.sha256).hexdigest()
+        return f"TOKEN_{digest[:20].upper()}"
+
+    @staticmethod
+    def is_token(value) -> bool:
+        return isinstance(value, str) and TOKEN_PATTERN.fullmatch(value) is not None
+
+    def tokenize_many(self, tenant: str, values: List[str], pii_types: List[str] = None,
+                      keys: List[str] = None) -> List[str]:
+        """
+        Tokens for values (one per value, in order), storing the ones not seen
+        before in one transaction. keys (e.g. normalized values) decide the
+        token instead of the raw values; the first value stored for a key is
+        the one detokenized.
+        """
+        keys = keys or values
+        tokens: List[Optional[str]] = [None] * len(values)
+        with self._lock:
+            for i, key in enumerate(keys):
+                token = self._tokens.get((tenant, key))
+                if token is not None:
+                    self._tokens.move_to_end((tenant, key))
+                    tokens[i] = token
+                    self.hits += 1
+
+        new: Dict[str, tuple] = {}
+        computed: Dict[str, str] = {}
+        for i, key in enumerate(keys):
+            if tokens[i] is None:
+                token = computed.get(key)
+                if token is None:
+                    token = computed[key] = self.token_for(tenant, key)
+                    new[token] = (values[i], pii_types[i] if pii_types else None, key)
+                tokens[i] = token
+
+        if new:
+            now = int(time.time())
+            rows = [(tenant, token, cipher.encrypt(value.encode()).decode(), pii_type, now)
+                    for token, (value, pii_type, _) in new.items()]
+            conn = self._conn()
+            conn.execute("BEGIN")
+            try:
+                # Deterministic tokens: a row that already exists holds the same value
+                inserted = conn.executemany(
+                    "INSERT OR IGNORE INTO tokens (tenant, token, value_enc, pii_type, created_at) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                ).rowcount
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            with self._lock:
+                self.stored += inserted
+                for token, (value, pii_type, key) in new.items():
+                    self._remember(tenant, token, (value, pii_type), key)
+        return tokens
+
+    def detokenize_many(self, tenant: str, tokens: List[str]) -> List[Optional[str]]:
+        """Original values for tokens (None for tokens this tenant never issued)."""
+        return [entry[0] if entry else None for entry in self.reveal_many(tenant, tokens)]
+
+    def reveal_many(self, tenant: str, tokens: List[str]) -> List[Optional[Tuple[str, Optional[str]]]]:
+        """(value, pii_type) for tokens (None for tokens this tenant never issued)."""
+        values: Dict[str, Tuple[str, Optional[str]]] = {}
+        with self._lock:
+            for token in tokens:
+                entry = self._values.get((tenant, token))
+                if entry is not None:
+                    self._values.move_to_end((tenant, token))
+                    values[token] = entry
+                    self.hits += 1
+
+        missing = list({token for token in tokens if token not in values})
+        if missing:
+            conn = self._conn()
+            found = {}
+            for i in range(0, len(missing), _SQLITE_MAX_PARAMS):
+                chunk = missing[i:i + _SQLITE_MAX_PARAMS]
+                rows = conn.execute(
+                    f"SELECT token, value_enc, pii_type FROM tokens WHERE tenant = ? AND token IN ({','.join('?' * len(chunk))})",
+                    [tenant, *chunk],
+                ).fetchall()
+                found.update((token, (cipher.decrypt(value_enc.encode()).decode(), pii_type))
+                             for token, value_enc, pii_type in rows)
+            values.update(found)
+            with self._lock:
+                self.store_lookups += 1
+                for token, entry in found.items():
+                    # Only the token -> value side: the key it was made from isn't stored
+                    self._remember(tenant, token, entry)
+        return [values.get(token) for token in tokens]
+
+    def _remember(self, tenant: str, token: str, entry: tuple, key: str = None):
+        """Caller holds the lock."""
+        pairs = [(self._values, (tenant, token), entry)]
+        if key is not None:
+            pairs.append((self._tokens, (tenant, key), token))
+        for entries, cache_key, item in pairs:
+            entries[cache_key] = item
+            entries.move_to_end(cache_key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def count(self, tenant: str = None) -> int:
+        if tenant is None:
+            return self._conn().execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+        return self._conn().execute("SELECT COUNT(*) FROM tokens WHERE tenant = ?", (tenant,)).fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cached": len(self._values),
+                "hits": self.hits,
+                "stored": self.stored,
+                "store_lookups": self.store_lookups,
+            }
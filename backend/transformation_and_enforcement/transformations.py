@@ -1,13 +1,24 @@
+import os
+import time
 import hashlib
 import base64
 import json
 import re
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional
 from enum import Enum
 from cryptography.fernet import Fernet
 import uuid
 import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import TRANSFORM_MEMO_MAX_ENTRIES, TRANSFORM_WORKERS
+from config import TRANSFORM_PARALLEL_MIN_BYTES, TRANSFORM_PARALLEL_MIN_VALUE_BYTES
+from transformation_and_enforcement.patterns import DSARType
+from transformation_and_enforcement.mongo_scanner import normalize_value
+from transformation_and_enforcement.pseudonym_vault import PseudonymVault
+from transformation_and_enforcement.token_vault import TokenVault
 
 class TransformationType(str, Enum):
     """Available transformation types"""
@@ -28,15 +39,6 @@ class TransformationType(str, Enum):
     SUPPRESSION = "suppression"
     PERTURBATION = "perturbation"
 
-class DSARType(str, Enum):
-    """DSAR request types"""
-    ACCESS = "access"
-    DELETE = "delete"
-    RECTIFY = "rectify"
-    RESTRICT_PROCESSING = "restrict_processing"
-    PORTABILITY = "portability"
-    OBJECT_TO_PROCESSING = "object_to_processing"
-
 class DataType(str, Enum):
     """Data categories for transformation rules"""
     IDENTIFIERS = "identifiers"  
@@ -100,6 +102,15 @@ class ComplianceLaw(str, Enum):
     HIPAA = "hipaa"
     PCI_DSS = "pci_dss"
 
+def compliance_laws(names: List[str]) -> List[ComplianceLaw]:
+    """Known laws among mapped_laws names, any case or separator ("PCI-DSS" -> pci_dss)."""
+    laws = []
+    for name in names:
+        value = name.lower().replace("-", "_").replace(" ", "_")
+        if value in ComplianceLaw._value2member_map_:
+            laws.append(ComplianceLaw(value))
+    return laws
+
 LAW_OVERRIDES = {
     ComplianceLaw.GDPR: {
         DSARType.DELETE: TransformationType.DATA_DELETION_HARD
@@ -142,10 +153,133 @@ class TransformationResult:
         self.metadata = metadata or {}
         self.timestamp = datetime.utcnow()
 
+# Tenant for tokens issued without one (e.g. direct _apply_transformation calls)
+DEFAULT_TENANT = "default"
+
+# Transformations whose output depends only on (type, PII type, value) and
+# costs more to compute than a memo lookup. Hashing is deterministic too, but
+# SHA-256 of a short value is as cheap as the lookup. Encryption,
+# tokenization, pseudonymization (random pseudonyms) and perturbation are
+# never memoized.
+MEMOIZED_TRANSFORMATIONS = frozenset({
+    TransformationType.MASKING_STATIC,
+    TransformationType.MASKING_DYNAMIC,
+    TransformationType.ANONYMIZATION,
+    TransformationType.AGGREGATION,
+})
+
+# Kernels whose work is mostly inside OpenSSL/hashlib, which release the GIL,
+# so a large group can be split across threads. They only release it for
+# inputs over ~2 KB, and per-value Python overhead dominates short values, so
+# groups run in parallel only when they are large both in total
+# (TRANSFORM_PARALLEL_MIN_BYTES) and per value (TRANSFORM_PARALLEL_MIN_VALUE_BYTES).
+PARALLEL_TRANSFORMATIONS = frozenset({
+    TransformationType.ENCRYPTION_DETERMINISTIC,
+    TransformationType.ENCRYPTION_RANDOMIZED,
+    TransformationType.HASHING,
+})
+
+_UNKEYED = object()
+
+class TransformationMemo:
+    """
+    Bounded LRU of deterministic transformation results, keyed by
+    (transformation_type, pii_type, digest of the value). The same email,
+    phone or PAN shows up in many documents; repeats are answered from here.
+
+    No raw values are kept: the digest is a keyed BLAKE2b under a random
+    per-process key, and entries hold only the transformed output. Results
+    are stored and handed out as copies, since callers update the metadata
+    in place.
+    """
+
+    def __init__(self, max_entries: int = TRANSFORM_MEMO_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # Keyed once; copying the keyed state is cheaper than re-keying per value
+        self._hasher = hashlib.blake2b(key=os.urandom(32), digest_size=16)
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def digests(self, values: List[Any]) -> List[Optional[bytes]]:
+        """Memo digests of values (None for non-strings, which aren't memoized)."""
+        copy = self._hasher.copy
+        digests = []
+        for value in values:
+            if isinstance(value, str):
+                hasher = copy()
+                hasher.update(value.encode("utf-8", "surrogatepass"))
+                digests.append(hasher.digest())
+            else:
+                digests.append(None)
+        return digests
+
+    def get_many(self, keys: List[tuple]) -> List[tuple]:
+        """Copies of the cached results for keys (None where missing)."""
+        results = [None] * len(keys)
+        get, touch = self._entries.get, self._entries.move_to_end
+        hits = 0
+        with self._lock:
+            for i, key in enumerate(keys):
+                result = get(key)
+                if result is not None:
+                    touch(key)
+                    results[i] = (result[0], result[1], {**result[2], "memoized": True})
+                    hits += 1
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return results
+
+    def put_many(self, items: List[tuple], repeats: int = 0):
+        """
+        Store (key, result) pairs. repeats: lookups that missed but were
+        answered by another miss of the same batch, counted as hits.
+        """
+        with self._lock:
+            self.hits += repeats
+            self.misses -= repeats
+            for key, result in items:
+                transformed_value, confidence, metadata = result
+                self._entries[key] = (transformed_value, confidence, dict(metadata))
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+def _memo_copy(result: tuple, memoized: bool) -> tuple:
+    transformed_value, confidence, metadata = result
+    return transformed_value, confidence, {**metadata, "memoized": memoized}
+
 class DataTransformationEngine:
-    def __init__(self):
+    def __init__(self, memo_max_entries: int = TRANSFORM_MEMO_MAX_ENTRIES,
+                 workers: int = TRANSFORM_WORKERS, parallel_min_bytes: int = TRANSFORM_PARALLEL_MIN_BYTES,
+                 parallel_min_value_bytes: int = TRANSFORM_PARALLEL_MIN_VALUE_BYTES):
         # Initialize encryption keys (in production, use proper key management)
         self._init_encryption_keys()
+        self.memo = TransformationMemo(memo_max_entries) if memo_max_entries > 0 else None
+        self.workers = max(1, workers)
+        self.parallel_min_bytes = parallel_min_bytes
+        self.parallel_min_value_bytes = parallel_min_value_bytes
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._kernels = self._build_kernels()
 
     def _init_encryption_keys(self):
         """Initialize encryption keys for deterministic and randomized encryption"""
@@ -155,77 +289,155 @@ class DataTransformationEngine:
         self.deterministic_cipher = Fernet(self.deterministic_key)
         self.randomized_cipher = Fernet(self.randomized_key)
         
-        # Pseudonymization mapping (in production, use secure database)
-        self.pseudonym_map = {}
+        # Pseudonym and token vaults, opened on first use
+        self._pseudonyms = None
+        self._tokens = None
+        self._vaults_lock = threading.Lock()
 
     def _extract_laws_from_findings(self, findings: List[Dict[str, Any]]) -> List[ComplianceLaw]:
         laws = set()
 
         for finding in findings:
-            for law in finding.get("mapped_laws", []):
-                law_lower = law.lower()
-                if law_lower in ComplianceLaw._value2member_map_:
-                    laws.add(ComplianceLaw(law_lower))
+            laws.update(compliance_laws(finding.get("mapped_laws", [])))
 
         return list(laws)
 
     def _apply_transformation(self, value: str, transformation_type: TransformationType, 
-                            finding: Dict[str, Any], request: TransformationRequest) -> tuple:
+                            finding: Dict[str, Any], request: TransformationRequest,
+                            tenant: str = None) -> tuple:
         """Apply specific transformation to a value"""
-        
-        if transformation_type == TransformationType.MASKING_STATIC:
-            return self._static_masking(value, finding)
-        
-        elif transformation_type == TransformationType.MASKING_DYNAMIC:
-            return self._dynamic_masking(value, finding)
-        
-        elif transformation_type == TransformationType.REDACTION:
-            return self._redaction(value, finding)
-        
-        elif transformation_type == TransformationType.ENCRYPTION_DETERMINISTIC:
-            return self._deterministic_encryption(value, finding)
-        
-        elif transformation_type == TransformationType.ENCRYPTION_RANDOMIZED:
-            return self._randomized_encryption(value, finding)
-        
-        elif transformation_type == TransformationType.HASHING:
-            return self._hashing(value, finding)
-        
-        elif transformation_type == TransformationType.PSEUDONYMIZATION:
-            return self._pseudonymization(value, finding)
-        
-        elif transformation_type == TransformationType.ANONYMIZATION:
-            return self._anonymization(value, finding)
-        
-        elif transformation_type == TransformationType.TOKENIZATION:
-            return self._tokenization(value, finding)
-        
-        elif transformation_type == TransformationType.DATA_DELETION_HARD:
-            return self._hard_deletion(value, finding)
-        
-        elif transformation_type == TransformationType.DATA_DELETION_SOFT:
-            return self._soft_deletion(value, finding)
-        
-        elif transformation_type == TransformationType.DATA_PORTABILITY:
-            return self._data_portability(value, finding)
-        
-        elif transformation_type == TransformationType.DATA_RECTIFICATION:
-            return self._data_rectification(value, finding, request)
-        
-        elif transformation_type == TransformationType.AGGREGATION:
-            return self._aggregation(value, finding)
-        
-        elif transformation_type == TransformationType.SUPPRESSION:
-            return self._suppression(value, finding)
-        
-        elif transformation_type == TransformationType.PERTURBATION:
-            return self._perturbation(value, finding)
-        
-        else:
-            # Default to dynamic masking
-            return self._dynamic_masking(value, finding)
+        return self._kernel(transformation_type)([value], [finding], request, tenant)[0]
+
+    def transform_batch(self, decisions: List[Any], request: TransformationRequest = None,
+                        tenant: str = None) -> List[tuple]:
+        """
+        Apply each decision's transformation to its finding's value.
+
+        Decisions (anything with .finding and .transformation_type, e.g. policy
+        TransformationDecisions) are grouped by transformation type and each
+        group runs through that type's kernel in one call. tenant (the admin
+        email) scopes tokens. Returns one (transformed_value, confidence,
+        metadata) tuple per decision, in input order.
+        """
+        groups: Dict[TransformationType, List[int]] = {}
+        for index, decision in enumerate(decisions):
+            groups.setdefault(decision.transformation_type, []).append(index)
+
+        results = [None] * len(decisions)
+        for transformation_type, indices in groups.items():
+            findings = [decisions[i].finding for i in indices]
+            values = [finding.get("value", "") for finding in findings]
+            outputs = self._kernel(transformation_type)(values, findings, request, tenant)
+            for i, output in zip(indices, outputs):
+                results[i] = output
+        return results
+
+    def _kernel(self, transformation_type: TransformationType) -> Callable:
+        # Default to dynamic masking
+        return self._kernels.get(transformation_type, self._kernels[TransformationType.MASKING_DYNAMIC])
+
+    def _build_kernels(self) -> Dict[TransformationType, Callable]:
+        """TransformationType -> kernel(values, findings, request, tenant) returning one result tuple per value."""
+        def each(handler):
+            def kernel(values, findings, request, tenant):
+                return [handler(value, finding) for value, finding in zip(values, findings)]
+            return kernel
+
+        def rectification(values, findings, request, tenant):
+            return [self._data_rectification(value, finding, request) for value, finding in zip(values, findings)]
+
+        kernels = {
+            TransformationType.MASKING_STATIC: each(self._static_masking),
+            TransformationType.MASKING_DYNAMIC: each(self._dynamic_masking),
+            TransformationType.REDACTION: self._redaction_batch,
+            TransformationType.ENCRYPTION_DETERMINISTIC: self._encryption_batch(self.deterministic_cipher, "deterministic"),
+            TransformationType.ENCRYPTION_RANDOMIZED: self._encryption_batch(self.randomized_cipher, "randomized"),
+            TransformationType.HASHING: self._hashing_batch,
+            TransformationType.PSEUDONYMIZATION: self._pseudonymization_batch,
+            TransformationType.ANONYMIZATION: each(self._anonymization),
+            TransformationType.TOKENIZATION: self._tokenization_batch,
+            TransformationType.DATA_DELETION_HARD: self._hard_deletion_batch,
+            TransformationType.DATA_DELETION_SOFT: self._soft_deletion_batch,
+            TransformationType.DATA_PORTABILITY: each(self._data_portability),
+            TransformationType.DATA_RECTIFICATION: rectification,
+            TransformationType.AGGREGATION: each(self._aggregation),
+            TransformationType.SUPPRESSION: self._suppression_batch,
+            TransformationType.PERTURBATION: each(self._perturbation),
+        }
+        if self.memo is not None:
+            for transformation_type in MEMOIZED_TRANSFORMATIONS:
+                kernels[transformation_type] = self._memoized(transformation_type, kernels[transformation_type])
+        if self.workers > 1:
+            for transformation_type in PARALLEL_TRANSFORMATIONS:
+                kernels[transformation_type] = self._parallel(kernels[transformation_type])
+        return kernels
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                        thread_name_prefix="transform")
+        return self._executor
+
+    def _parallel(self, kernel: Callable) -> Callable:
+        """
+        Run kernel on the thread pool, splitting groups of at least
+        parallel_min_bytes, averaging parallel_min_value_bytes per value, into
+        one contiguous chunk per worker. Results keep input order.
+        """
+        workers, min_bytes, min_value_bytes = self.workers, self.parallel_min_bytes, self.parallel_min_value_bytes
+
+        def run(values, findings, request, tenant):
+            size = sum(len(value) for value in values if isinstance(value, (str, bytes)))
+            if len(values) < 2 * workers or size < min_bytes or size < min_value_bytes * len(values):
+                return kernel(values, findings, request, tenant)
+            size = -(-len(values) // workers)
+            futures = [
+                self._pool().submit(kernel, values[i:i + size], findings[i:i + size], request, tenant)
+                for i in range(0, len(values), size)
+            ]
+            return [result for future in futures for result in future.result()]
+        return run
+
+    def _memoized(self, transformation_type: TransformationType, kernel: Callable) -> Callable:
+        """
+        kernel, answering repeated values from the memo. Misses (each distinct
+        value once) still go through kernel in one call. Results carry
+        metadata["memoized"].
+        """
+        memo = self.memo
+        tag = transformation_type.value  # plain str: Enum members hash in Python code
+
+        def run(values, findings, request, tenant):
+            keys = [
+                (tag, finding.get("type", ""), digest) if digest is not None else None
+                for digest, finding in zip(memo.digests(values), findings)
+            ]
+            results = memo.get_many(keys)
+            misses: Dict[Any, List[int]] = {}
+            for i, result in enumerate(results):
+                if result is None:
+                    # Non-string values aren't memoized; each is its own miss
+                    misses.setdefault(keys[i] if keys[i] is not None else (_UNKEYED, i), []).append(i)
+            if not misses:
+                return results
+
+            first = [indices[0] for indices in misses.values()]
+            outputs = kernel([values[i] for i in first], [findings[i] for i in first], request, tenant)
+            memo.put_many([(key, output) for key, output in zip(misses, outputs) if key[0] is not _UNKEYED],
+                          repeats=sum(len(indices) - 1 for indices in misses.values()))
+            for indices, output in zip(misses.values(), outputs):
+                results[indices[0]] = _memo_copy(output, False)
+                for i in indices[1:]:
+                    results[i] = _memo_copy(output, True)
+            return results
+        return run
 
 # Transformation implementations
+# The *_batch ones transform a whole group in one tight loop, with per-call
+# work (method lookups, timestamps) hoisted out of it. Every result gets its
+# own metadata dict, since callers update it in place.
     def _static_masking(self, value: str, finding: Dict[str, Any]) -> tuple:
         """Replace sensitive values with fixed patterns"""
         pii_type = finding.get("type", "")
@@ -271,62 +483,53 @@ class DataTransformationEngine:
         metadata["masking_type"] = "dynamic"
         return masked_value, confidence, metadata
 
-    def _redaction(self, value: str, finding: Dict[str, Any]) -> tuple:
+    def _redaction_batch(self, values: List[str], findings: List[Dict[str, Any]], request, tenant) -> List[tuple]:
         """Remove or black out entire data fields"""
-        return "[REDACTED]", 1.0, {"redaction_reason": "sensitive_data"}
-
-    def _deterministic_encryption(self, value: str, finding: Dict[str, Any]) -> tuple:
-        """Same input → same encrypted output (useful for indexing)"""
-        try:
-            encrypted = self.deterministic_cipher.encrypt(value.encode())
-            encrypted_str = base64.urlsafe_b64encode(encrypted).decode()
-            return encrypted_str, 0.95, {"encryption_type": "deterministic", "reversible": True}
-        except Exception as e:
-            return f"ENCRYPTION_ERROR: {str(e)}", 0.0, {"error": str(e)}
-
-    def _randomized_encryption(self, value: str, finding: Dict[str, Any]) -> tuple:
-        """Input → different output each time (more secure)"""
-        try:
-            encrypted = self.randomized_cipher.encrypt(value.encode())
-            encrypted_str = base64.urlsafe_b64encode(encrypted).decode()
-            return encrypted_str, 0.95, {"encryption_type": "randomized", "reversible": True}
-        except Exception as e:
-            return f"ENCRYPTION_ERROR: {str(e)}", 0.0, {"error": str(e)}
-
-    def _hashing(self, value: str, finding: Dict[str, Any]) -> tuple:
+        return [("[REDACTED]", 1.0, {"redaction_reason": "sensitive_data"}) for _ in values]
+
+    def _encryption_batch(self, cipher: Fernet, encryption_type: str) -> Callable:
+        """
+        Deterministic: same input → same encrypted output (useful for indexing).
+        Randomized: input → different output each time (more secure).
+        """
+        def kernel(values: List[str], findings: List[Dict[str, Any]], request, tenant) -> List[tuple]:
+            # One timestamp for the whole batch; each token still gets its own IV
+            encrypt_at_time, b64encode, now = cipher.encrypt_at_time, base64.urlsafe_b64encode, int(time.time())
+            results = []
+            for value in values:
+                try:
+                    encrypted_str = b64encode(encrypt_at_time(value.encode(), now)).decode()
+                    results.append((encrypted_str, 0.95, {"encryption_type": encryption_type, "reversible": True}))
+                except Exception as e:
+                    results.append((f"ENCRYPTION_ERROR: {str(e)}", 0.0, {"error": str(e)}))
+            return results
+        return kernel
+
+    def _hashing_batch(self, values: List[str], findings: List[Dict[str, Any]], request, tenant) -> List[tuple]:
         """Irreversible one-way conversion"""
         # Use SHA-256 for consistent hashing
-        hashed = hashlib.sha256(value.encode()).hexdigest()
-        return hashed, 1.0, {"hash_algorithm": "SHA-256", "reversible": False}
-
-    def _pseudonymization(self, value: str, finding: Dict[str, Any]) -> tuple:
+        sha256 = hashlib.sha256
+        return [
+            (sha256(value.encode()).hexdigest(), 1.0, {"hash_algorithm": "SHA-256", "reversible": False})
+            for value in values
+        ]
+
+    @property
+    def pseudonyms(self) -> PseudonymVault:
+        if self._pseudonyms is None:
+            with self._vaults_lock:
+                if self._pseudonyms is None:
+                    self._pseudonyms = PseudonymVault()
+        return self._pseudonyms
+
+    def _pseudonymization_batch(self, values: List[str], findings: List[Dict[str, Any]], request, tenant) -> List[tuple]:
         """Replace identifiers with consistent fake values"""
-        pii_type = finding.get("type", "")
-        
-        # Check if we already have a pseudonym for this value
-        if value in self.pseudonym_map:
-            return self.pseudonym_map[value], 1.0, {"pseudonym_type": "existing"}
-        
-        # Generate new pseudonym based on type
-        if pii_type == "email":
-            domains = ["example.com", "test.org", "demo.net"]
-            pseudonym = f"user{len(self.pseudonym_map) + 1}@{random.choice(domains)}"
-        elif pii_type in ["phone", "aadhaar"]:
-            pseudonym = f"+91-{random.randint(6000000000, 9999999999)}"
-        elif pii_type == "pan":
-            letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-            numbers = "0123456789"
-            pseudonym = ''.join(random.choices(letters, k=5)) + ''.join(random.choices(numbers, k=4)) + random.choice(letters)
-        elif pii_type == "name":
-            first_names = ["John", "Jane", "Alex", "Sam", "Taylor", "Casey"]
-            last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones"]
-            pseudonym = f"{random.choice(first_names)} {random.choice(last_names)}"
-        else:
-            pseudonym = f"pseudo_{uuid.uuid4().hex[:8]}"
-        
-        # Store mapping
-        self.pseudonym_map[value] = pseudonym
-        return pseudonym, 1.0, {"pseudonym_type": "generated"}
+        # One vault transaction for every value not already cached
+        items = [(str(value), finding.get("type", "")) for value, finding in zip(values, findings)]
+        return [
+            (pseudonym, 1.0, {"pseudonym_type": "generated" if created else "existing"})
+            for pseudonym, created in self.pseudonyms.get_or_create_many(items, _new_pseudonym)
+        ]
 
     def _anonymization(self, value: str, finding: Dict[str, Any]) -> tuple:
         """Strip data so it cannot be re-identified"""
@@ -351,32 +554,44 @@ class DataTransformationEngine:
         else:
             return "ANONYMIZED", 1.0, {"anonymization_type": "complete"}
 
-    def _tokenization(self, value: str, finding: Dict[str, Any]) -> tuple:
-        """Replace sensitive values with tokens (mappable back to originals)"""
-        # Generate unique token
-        token = f"TOKEN_{uuid.uuid4().hex[:12].upper()}"
-        
-        # In production, store mapping in secure database
-        metadata = {
-            "token_type": "reversible",
-            "token_id": token,
-            "original_length": len(value),
-            "mapping_stored": True
-        }
-        
-        return token, 1.0, metadata
+    @property
+    def tokens(self) -> TokenVault:
+        if self._tokens is None:
+            with self._vaults_lock:
+                if self._tokens is None:
+                    self._tokens = TokenVault()
+        return self._tokens
 
-    def _hard_deletion(self, value: str, finding: Dict[str, Any]) -> tuple:
+    def _tokenization_batch(self, values: List[str], findings: List[Dict[str, Any]], request, tenant) -> List[tuple]:
+        """Replace sensitive values with tokens (mappable back to originals)"""
+        # Same normalized value, same tenant -> same token (the one a DSAR subject
+        # maps to); new ones are stored in one transaction
+        values = [str(value) for value in values]
+        pii_types = [finding.get("type", "") for finding in findings]
+        tokens = self.tokens.tokenize_many(tenant or DEFAULT_TENANT, values, pii_types,
+                                           keys=[normalize_value(v, t) for v, t in zip(values, pii_types)])
+        return [
+            (token, 1.0, {
+                "token_type": "reversible",
+                "token_id": token,
+                "original_length": len(value),
+                "mapping_stored": True
+            })
+            for value, token in zip(values, tokens)
+        ]
+
+    def _hard_deletion_batch(self, values: List[str], findings: List[Dict[str, Any]], request, tenant) -> List[tuple]:
         """Remove permanently"""
-        return "", 1.0, {"deletion_type": "hard", "deleted_at": datetime.utcnow().isoformat()}
+        deleted_at = datetime.utcnow().isoformat()
+        return [("", 1.0, {"deletion_type": "hard", "deleted_at": deleted_at}) for _ in values]
 
-    def _soft_deletion(self, value: str, finding: Dict[str, Any]) -> tuple:
+    def _soft_deletion_batch(self, values: List[str], findings: List[Dict[str, Any]], request, tenant) -> List[tuple]:
         """Mark as deleted but keep internally (audit purposes)"""
-        return "[DELETED]", 1.0, {
-            "deletion_type": "soft", 
-            "deleted_at": datetime.utcnow().isoformat(),
-            "original_preserved": True
-        }
+        deleted_at = datetime.utcnow().isoformat()
+        return [
+            ("[DELETED]", 1.0, {"deletion_type": "soft", "deleted_at": deleted_at, "original_preserved": True})
+            for _ in values
+        ]
 
     def _data_portability(self, value: str, finding: Dict[str, Any]) -> tuple:
         """Transform data into machine-readable structured format"""
@@ -398,7 +613,8 @@ class DataTransformationEngine:
     def _data_rectification(self, value: str, finding: Dict[str, Any], request: TransformationRequest) -> tuple:
         """Update incorrect data entries"""
         # For rectification, we need the corrected value from user context
-        corrected_value = request.user_context.get("corrected_value", value)
+        user_context = request.user_context if request else {}
+        corrected_value = user_context.get("corrected_value", value)
         
         return corrected_value, 1.0, {
             "rectification_type": "data_update",
@@ -428,9 +644,10 @@ class DataTransformationEngine:
         else:
             return f"AGGREGATED_{pii_type.upper()}", 1.0, {"granularity": "type_based"}
 
-    def _suppression(self, value: str, finding: Dict[str, Any]) -> tuple:
+    def _suppression_batch(self, values: List[str], findings: List[Dict[str, Any]], request, tenant) -> List[tuple]:
         """Omit fields entirely from results"""
-        return None, 1.0, {"suppression_reason": "field_omitted", "suppressed_at": datetime.utcnow().isoformat()}
+        suppressed_at = datetime.utcnow().isoformat()
+        return [(None, 1.0, {"suppression_reason": "field_omitted", "suppressed_at": suppressed_at}) for _ in values]
 
     def _perturbation(self, value: str, finding: Dict[str, Any]) -> tuple:
         """Add small statistical noise to values"""
@@ -459,5 +676,23 @@ class DataTransformationEngine:
         else:
             return value, 0.5, {"noise_type": "none_applicable"}
 
+def _new_pseudonym(pii_type: str, n: int) -> str:
+    """Pseudonym for the n-th value added to the vault, shaped like pii_type"""
+    if pii_type == "email":
+        domains = ["example.com", "test.org", "demo.net"]
+        return f"user{n}@{random.choice(domains)}"
+    elif pii_type in ["phone", "aadhaar"]:
+        return f"+91-{random.randint(6000000000, 9999999999)}"
+    elif pii_type == "pan":
+        letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        numbers = "0123456789"
+        return ''.join(random.choices(letters, k=5)) + ''.join(random.choices(numbers, k=4)) + random.choice(letters)
+    elif pii_type == "name":
+        first_names = ["John", "Jane", "Alex", "Sam", "Taylor", "Casey"]
+        last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones"]
+        return f"{random.choice(first_names)} {random.choice(last_names)}"
+    else:
+        return f"pseudo_{uuid.uuid4().hex[:8]}"
+
 # Global transformation engine instance
 transformation_engine = DataTransformationEngine()